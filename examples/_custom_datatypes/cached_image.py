@@ -72,6 +72,19 @@ class CachedImageDataModel(CachedDataWrapper):
         except Exception as e:
             raise ValueError(f"Failed to deserialize CachedImageDataModel: {str(e)}")
 
+    def write_checkpoint(self, path: str) -> str:
+        """Images are checkpointed as PNG files instead of being pickled"""
+        path = f"{path}.png"
+        self.value.save(path, format="PNG")
+        return path
+
+    @classmethod
+    def read_checkpoint(cls, path: str) -> Image:
+        img = ImageLibrary.open(path)
+        # Read the pixels now, the file may be gone by the time the image is used
+        img.load()
+        return img
+
     @computed_field
     @property
     def preview(self) -> str:
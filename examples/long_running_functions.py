@@ -1,8 +1,12 @@
 import time
 
+from python_node_editor.execution.cancellation import raise_if_cancelled
+
 
 def slow_add(a: int, b: int) -> int:
     for remaining in range(5, 0, -1):
+        # Stop early if the execution gets cancelled
+        raise_if_cancelled()
         print(f"Adding {a} and {b} in {remaining} seconds")
         time.sleep(1)
     result = a + b
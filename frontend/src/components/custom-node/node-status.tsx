@@ -1,4 +1,10 @@
-import { CircleDashed, CircleAlert, CircleCheck, Loader2 } from "lucide-react";
+import {
+  CircleDashed,
+  CircleAlert,
+  CircleCheck,
+  CircleSlash,
+  Loader2,
+} from "lucide-react";
 import { memo } from "react";
 import {
   Tooltip,
@@ -9,7 +15,13 @@ import {
 import { Button } from "@/components/ui/button";
 
 type NodeStatusProps = {
-  status: "not-executed" | "executed" | "error" | "executing";
+  status:
+    | "not-executed"
+    | "executed"
+    | "error"
+    | "executing"
+    | "cancelled"
+    | "skipped";
   onToggleDrawer?: () => void;
   hasTerminalOutput?: boolean;
   isDrawerOpen?: boolean;
@@ -27,6 +39,14 @@ export default memo(function NodeStatus({
   if (status === "not-executed") {
     icon = <CircleDashed className="w-4 h-4" />;
     tooltipText = "Not Executed";
+  } else if (status === "skipped") {
+    icon = <CircleDashed className="w-4 h-4 text-amber-500" />;
+    tooltipText = "Skipped (an upstream node failed)";
+  } else if (status === "cancelled") {
+    icon = <CircleSlash className="w-4 h-4 text-muted-foreground" />;
+    tooltipText = hasTerminalOutput
+      ? "Cancelled (terminal output available)"
+      : "Cancelled";
   } else if (status === "executing") {
     icon = <Loader2 className="w-4 h-4 animate-spin" />;
     tooltipText = "Executing";
@@ -43,7 +63,8 @@ export default memo(function NodeStatus({
   }
 
   const isClickable =
-    (status === "error" || status === "executed") && hasTerminalOutput;
+    (status === "error" || status === "executed" || status === "cancelled") &&
+    hasTerminalOutput;
 
   const handleClick = () => {
     if (isClickable && onToggleDrawer) {
@@ -67,7 +67,7 @@ export default memo(function OutputRenderer({
         const { itemsType, structureType } = outputData.type;
         const itemTypeName = typeof itemsType === "string" ? itemsType : "Any";
 
-        if (structureType === "list") {
+        if (structureType === "list" || structureType === "iterator") {
           return formatStructuredValue(outputData.value, itemTypeName);
         } else if (structureType === "dict") {
           return formatStructuredValue(outputData.value, itemTypeName);
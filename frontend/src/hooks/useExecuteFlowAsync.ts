@@ -1,6 +1,7 @@
 import { useCallback, useRef } from "react";
 import { stripGraphForExecute, type Graph } from "../utils/strip-graph";
 import { preserveUIData } from "../utils/preserve-ui-data";
+import { getSessionId } from "../utils/session-id";
 import useFlowStore from "../stores/flowStore";
 import type { NodeUpdate } from "../types/types";
 
@@ -56,7 +57,22 @@ export function useExecuteFlowAsync() {
             // Get existing node data and merge while preserving ui only-data
             // eslint-disable-next-line @typescript-eslint/no-explicit-any
             const existingNodeData = getNodeData([nodeId]) as any;
-            const { nodeId: _nodeId, ...updateData } = update; // Remove nodeId from update
+            const {
+              nodeId: _nodeId,
+              newTerminalOutput,
+              ...updateData
+            } = update; // Remove nodeId from update
+
+            // A running node streams its output in chunks, append them to what's shown so far
+            // (starting over from a previous execution's output when the node starts executing)
+            if (update.status === "executing") {
+              const previousOutput =
+                existingNodeData?.status === "executing"
+                  ? (existingNodeData.terminalOutput ?? "")
+                  : "";
+              updateData.terminalOutput = previousOutput + (newTerminalOutput ?? "");
+            }
+
             const mergedNodeData = preserveUIData(existingNodeData, updateData);
 
             // Update the entire node data at once
@@ -105,13 +121,17 @@ export function useExecuteFlowAsync() {
       lastSeenIndexRef.current = -1;
 
       console.log("Submitting graph for async execution:", executeMessage);
-      const response = await fetch("http://localhost:8000/execution_submit", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
+      const params = new URLSearchParams({ session_id: getSessionId() });
+      const response = await fetch(
+        `http://localhost:8000/execution_submit?${params}`,
+        {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify(executeMessage),
         },
-        body: JSON.stringify(executeMessage),
-      });
+      );
 
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
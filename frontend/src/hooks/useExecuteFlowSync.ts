@@ -1,6 +1,7 @@
 import { useCallback } from "react";
 import { stripGraphForExecute, type Graph } from "../utils/strip-graph";
 import { preserveUIData } from "../utils/preserve-ui-data";
+import { getSessionId } from "../utils/session-id";
 import useFlowStore from "../stores/flowStore";
 
 export function useExecuteFlowSync() {
@@ -12,13 +13,17 @@ export function useExecuteFlowSync() {
       const executeMessage = stripGraphForExecute(graph);
 
       console.log("Executing graph (sync):", executeMessage);
-      const response = await fetch("http://localhost:8000/graph_execute", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
+      const params = new URLSearchParams({ session_id: getSessionId() });
+      const response = await fetch(
+        `http://localhost:8000/graph_execute?${params}`,
+        {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify(executeMessage),
         },
-        body: JSON.stringify(executeMessage),
-      });
+      );
 
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
@@ -11,7 +11,7 @@ export interface ImageData {
 export type BaseDataTypes = number | string | ImageData;
 
 export interface StructDescr {
-  structureType: "list" | "dict";
+  structureType: "list" | "dict" | "iterator";
   itemsType: string | UnionDescr;
 }
 
@@ -52,15 +52,41 @@ export interface FrontendNodeData extends FunctionSchema {
     _expanded?: boolean;
     _expandedHeight?: number;
   };
-  status?: "not-executed" | "executed" | "error" | "executing";
+  status?:
+    | "not-executed"
+    | "executed"
+    | "error"
+    | "executing"
+    | "cancelled"
+    | "skipped";
 }
 
 export type FunctionNode = Node<FrontendNodeData, "customNode">;
 
+export interface NodeProfile {
+  wallSeconds: number;
+  // Not measured for nodes that ran on the event loop or in another process
+  cpuSeconds?: number;
+  // Only with memory tracing on
+  peakMemoryBytes?: number;
+  outputBytes: number;
+  serializationSeconds: number;
+  // Download from /call_profile/{callProfileId} when the node was profiled
+  callProfileId?: string;
+}
+
 export interface NodeUpdate {
   nodeId: string;
-  status?: "executing" | "executed" | "error";
+  status?: "executing" | "executed" | "error" | "cancelled" | "skipped";
   outputs?: Record<string, FrontendFieldDataWrapper>;
   arguments?: Record<string, FrontendFieldDataWrapper>;
   terminalOutput?: string;
+  // Output printed by a still running node since the previous poll
+  newTerminalOutput?: string;
+  // Number of items a generator node has yielded so far
+  itemsProduced?: number;
+  // The node this node's output went straight into when they ran fused, it isn't kept
+  fusedInto?: string;
+  // Measurements of the execution, on the final update of an executed node
+  profile?: NodeProfile;
 }
@@ -0,0 +1,15 @@
+const SESSION_STORAGE_KEY = "pneSessionId";
+
+/**
+ * Returns the id this browser tab sends along with every execution, so the backend can
+ * answer nodes that didn't change since the tab's last execution with their previous outputs.
+ * It's kept in sessionStorage, which is per tab and survives a reload of the page.
+ */
+export function getSessionId(): string {
+  let sessionId = sessionStorage.getItem(SESSION_STORAGE_KEY);
+  if (!sessionId) {
+    sessionId = crypto.randomUUID();
+    sessionStorage.setItem(SESSION_STORAGE_KEY, sessionId);
+  }
+  return sessionId;
+}
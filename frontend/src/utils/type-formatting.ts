@@ -21,6 +21,11 @@ export function formatTypeForDisplay(type: any): string {
       const itemsType = type.itemsType || "unknown";
       return `dict[str, ${formatTypeForDisplay(itemsType)}]`;
     }
+    // Handle streams of items from generator nodes
+    if (type.structureType === "iterator") {
+      const itemsType = type.itemsType || "unknown";
+      return `Iterator[${formatTypeForDisplay(itemsType)}]`;
+    }
   }
   // Fallback for unknown types
   return JSON.stringify(type);
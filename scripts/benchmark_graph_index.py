@@ -0,0 +1,129 @@
+"""
+Benchmark for graph ordering and edge propagation on large graphs.
+
+Builds layered graphs of increasing size and times GraphIndex construction, topological
+ordering and output propagation, next to the previous edge scanning implementation.
+With the index the time per node stays flat as the graph grows, the edge scanning
+implementation grows with the number of edges.
+
+Run with: uv run python scripts/benchmark_graph_index.py
+"""
+
+import sys
+import time
+
+from python_node_editor.execution.exec_utils import propagate_outputs
+from python_node_editor.execution.graph_index import GraphIndex
+from python_node_editor.schema import (
+    DataWrapper,
+    Edge,
+    Graph,
+    NodeDataFromFrontend,
+    NodeFromFrontend,
+    NodeUpdate,
+)
+
+LAYER_WIDTH = 10
+SIZES = [1000, 2000, 4000, 8000]
+LEGACY_MAX_SIZE = 4000
+
+
+def build_layered_graph(num_nodes: int) -> Graph:
+    """Each node takes inputs from two nodes in the previous layer"""
+    nodes = []
+    edges = []
+    for i in range(num_nodes):
+        layer, slot = divmod(i, LAYER_WIDTH)
+        nodes.append(
+            NodeFromFrontend(
+                id=f"n{i}",
+                position={"x": layer * 200, "y": slot * 100},
+                data=NodeDataFromFrontend(
+                    callable_id="bench",
+                    arguments={
+                        "a": DataWrapper(type="int", value=0),
+                        "b": DataWrapper(type="int", value=0),
+                    },
+                    outputs={"return": DataWrapper(type="int")},
+                ),
+            )
+        )
+        if layer == 0:
+            continue
+        for argument, offset in (("a", 0), ("b", 1)):
+            source = (layer - 1) * LAYER_WIDTH + (slot + offset) % LAYER_WIDTH
+            edges.append(
+                Edge(
+                    id=f"e{i}{argument}",
+                    source=f"n{source}",
+                    source_handle=f"n{source}:outputs:return:handle",
+                    target=f"n{i}",
+                    target_handle=f"n{i}:inputs:{argument}:handle",
+                )
+            )
+    return Graph(nodes=nodes, edges=edges)
+
+
+def indexed_run(graph: Graph) -> None:
+    index = GraphIndex(graph)
+    for node in index.topological_order():
+        node_update = NodeUpdate(
+            node_id=node.id,
+            status="executed",
+            outputs={"return": DataWrapper(type="int", value=1)},
+        )
+        propagate_outputs(index, node_update)
+
+
+def legacy_run(graph: Graph) -> None:
+    """The previous implementation: DFS ordering and propagation that rescan every edge"""
+    result = []
+    visited = set()
+    node_map = {node.id: node for node in graph.nodes}
+
+    def visit(node_id):
+        if node_id in visited:
+            return
+        visited.add(node_id)
+        for edge in graph.edges:
+            if edge.target == node_id:
+                visit(edge.source)
+        result.append(node_map[node_id])
+
+    for node in sorted(graph.nodes, key=lambda n: n.position["x"]):
+        visit(node.id)
+
+    for node in result:
+        output = DataWrapper(type="int", value=1)
+        for edge in graph.edges:
+            if edge.source == node.id:
+                argument_name = edge.target_handle.split(":")[-2]
+                target = next(n for n in result if n.id == edge.target)
+                target.data.arguments[argument_name] = output.model_copy()
+
+
+def time_call(func, graph: Graph) -> float:
+    start = time.perf_counter()
+    func(graph)
+    return time.perf_counter() - start
+
+
+def main():
+    sys.setrecursionlimit(100_000)
+    print(f"{'nodes':>6} {'edges':>6} {'indexed':>10} {'per node':>10} {'legacy':>10}")
+    for size in SIZES:
+        graph = build_layered_graph(size)
+        indexed = time_call(indexed_run, graph)
+        legacy = (
+            f"{time_call(legacy_run, build_layered_graph(size)):9.3f}s"
+            if size <= LEGACY_MAX_SIZE
+            else f"{'-':>10}"
+        )
+        print(
+            f"{size:>6} {len(graph.edges):>6} {indexed:9.3f}s"
+            f" {indexed / size * 1e6:8.1f}us {legacy}"
+        )
+
+
+if __name__ == "__main__":
+    main()
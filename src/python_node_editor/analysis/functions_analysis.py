@@ -201,6 +201,8 @@ def analyze_function(
             output_style=output_style,
             outputs=outputs,
             dynamic_input_type=dynamic_input_type,
+            is_async=inspect.iscoroutinefunction(original_func)
+            or inspect.isasyncgenfunction(original_func),
         ),
         func_obj,
         found_types,
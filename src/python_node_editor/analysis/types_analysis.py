@@ -1,3 +1,4 @@
+import collections.abc
 import inspect
 import os
 import types
@@ -15,6 +16,18 @@ from python_node_editor.schema_base import (
 )
 
 
+# Generic origins of the return types of generator nodes and the arguments that consume them.
+# The first type argument is always the type of the items.
+ITERATOR_ORIGINS = (
+    collections.abc.Iterator,
+    collections.abc.Iterable,
+    collections.abc.Generator,
+    collections.abc.AsyncIterator,
+    collections.abc.AsyncIterable,
+    collections.abc.AsyncGenerator,
+)
+
+
 def merge_types_dict(master_types, incoming_types):
     """Merge incoming types into a master types dictionary."""
     for type_name, type_schema in incoming_types.items():
@@ -64,6 +77,11 @@ def get_type_repr(tp, module_ns, short_repr=True):
                 structure_type="dict",
                 items_type=get_type_repr(tp.__args__[1], module_ns, short_repr),
             )
+        elif origin in ITERATOR_ORIGINS:
+            return StructDescr(
+                structure_type="iterator",
+                items_type=get_type_repr(tp.__args__[0], module_ns, short_repr),
+            )
         else:
             raise ValueError("Unknown origin", tp)
     if hasattr(tp, "__name__"):
@@ -212,6 +230,9 @@ def analyze_type(
             elif origin in (dict, typing.Dict):
                 for arg in getattr(t, "__args__", ()):
                     _add_type_recursive(arg)
+            elif origin in ITERATOR_ORIGINS:
+                # Only the items matter, not the send and return types of a Generator
+                _add_type_recursive(t.__args__[0])
             else:
                 raise ValueError(f"No way to build a schema for this type: {origin}")
 
@@ -13,6 +13,87 @@ def _parse_backend_args(builds_frontend):
         action="store_true",
         help="Do not ignore files and folders starting with underscore",
     )
+    parser.add_argument(
+        "--max_concurrent_nodes",
+        type=int,
+        default=8,
+        help="Maximum number of independent nodes an execution runs at the same time",
+    )
+    parser.add_argument(
+        "--max_concurrent_async_nodes",
+        type=int,
+        default=256,
+        help="Maximum number of async def nodes an execution runs at the same time",
+    )
+    parser.add_argument(
+        "--max_concurrent_variants",
+        type=int,
+        default=8,
+        help="Maximum number of variants a parameter sweep executes at the same time",
+    )
+    parser.add_argument(
+        "--execution_workers",
+        type=int,
+        default=4,
+        help="Number of graph executions that may run at the same time",
+    )
+    parser.add_argument(
+        "--execution_queue_depth",
+        type=int,
+        default=64,
+        help="Number of executions of each priority that may wait for a free worker "
+        "before new ones are rejected",
+    )
+    parser.add_argument(
+        "--batch_max_wait",
+        type=float,
+        default=10.0,
+        help="Seconds a batch priority execution waits for interactive ones before going ahead",
+    )
+    parser.add_argument(
+        "--process_workers",
+        type=int,
+        default=0,
+        help="Run nodes in a pool of this many worker processes instead of threads",
+    )
+    parser.add_argument(
+        "--node_timeout",
+        type=float,
+        default=None,
+        help="Seconds a node may run before it's reported as timed out (no limit by default)",
+    )
+    parser.add_argument(
+        "--check_input_mutation",
+        action="store_true",
+        help="Report nodes that change their arguments in place as errors (for development)",
+    )
+    parser.add_argument(
+        "--checkpoint_dir",
+        default=None,
+        help="Checkpoint the outputs of executed nodes to this directory, "
+        "so executions can be resumed after a restart",
+    )
+    parser.add_argument(
+        "--worker_token",
+        default=None,
+        help="Accept pne-worker processes that present this token and run nodes on them",
+    )
+    parser.add_argument(
+        "--trace_memory",
+        action="store_true",
+        help="Report the peak Python memory of every node (slows down allocations)",
+    )
+    parser.add_argument(
+        "--no_result_cache",
+        action="store_true",
+        help="Always re-run nodes instead of reusing results for identical arguments",
+    )
+    parser.add_argument(
+        "--result_cache_mb",
+        type=int,
+        default=512,
+        help="Approximate memory in megabytes the reused node results may take up",
+    )
     if builds_frontend:
         parser.add_argument(
             "-bf",
@@ -74,7 +155,14 @@ def _run_backend(args):
 
     import uvicorn
 
+    import python_node_editor.execution.checkpoints as checkpoints
+    import python_node_editor.execution.distributed as distributed
+    import python_node_editor.execution.exec_async as exec_async
     import python_node_editor.execution.exec_utils as exec_utils
+    import python_node_editor.execution.profiling as profiling
+    import python_node_editor.execution.result_cache as result_cache
+    import python_node_editor.execution.scheduler as scheduler
+    import python_node_editor.execution.sweep as sweep
     import python_node_editor.server as server_module
 
     if args.frontend:
@@ -96,8 +184,22 @@ def _run_backend(args):
     # Store verbose flag globally for server and execution modules to access
     server_module.VERBOSE = args.verbose
     exec_utils.VERBOSE = args.verbose
+    exec_utils.DEFAULT_NODE_TIMEOUT = args.node_timeout
+    exec_utils.CHECK_INPUT_MUTATION = args.check_input_mutation
     server_module.IGNORE_UNDERSCORE_PREFIX = not args.do_not_ignore_underscore_prefix
     server_module.SERVE_FRONTEND = args.frontend
+    exec_async.MAX_CONCURRENT_NODES = args.max_concurrent_nodes
+    exec_async.MAX_CONCURRENT_ASYNC_NODES = args.max_concurrent_async_nodes
+    sweep.MAX_CONCURRENT_VARIANTS = args.max_concurrent_variants
+    server_module.PROCESS_WORKERS = args.process_workers
+    scheduler.SCHEDULER.max_running = args.execution_workers
+    scheduler.SCHEDULER.max_queued = args.execution_queue_depth
+    scheduler.BATCH_MAX_WAIT = args.batch_max_wait
+    result_cache.RESULT_CACHE_ENABLED = not args.no_result_cache
+    result_cache.RESULT_CACHE_MAX_BYTES = args.result_cache_mb * 1024 * 1024
+    checkpoints.CHECKPOINT_DIR = args.checkpoint_dir
+    distributed.WORKER_TOKEN = args.worker_token
+    profiling.TRACE_MEMORY = args.trace_memory
 
     # Reconstruct sys.argv for the lifespan handler to read the paths
     sys.argv = [sys.argv[0], args.path]
@@ -175,3 +277,209 @@ def analyze():
         d(function_schemas)
         print("\nTYPES:")
         d(types)
+
+
+def run():
+    import argparse
+    import os
+    import sys
+    import time
+
+    import python_node_editor.execution.checkpoints as checkpoints
+    import python_node_editor.execution.exec_async as exec_async
+    import python_node_editor.execution.exec_utils as exec_utils
+    import python_node_editor.execution.profiling as profiling
+    import python_node_editor.server as server_module
+    from python_node_editor.analysis.utils import analyze_file_structure
+    from python_node_editor.execution import process_pool
+    from python_node_editor.execution.runner import (
+        format_timings,
+        run_graph,
+        run_id,
+        write_results,
+    )
+    from python_node_editor.schema import Graph
+
+    parser = argparse.ArgumentParser(
+        description="Execute a saved graph without starting the server"
+    )
+    parser.add_argument(
+        "path", help="Comma-separated paths to analyze for functions and types"
+    )
+    parser.add_argument("graph", help="Path of the graph JSON file to execute")
+    parser.add_argument(
+        "-o",
+        "--output_dir",
+        default="pne_output",
+        help="Directory to write the results to",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Enable verbose output"
+    )
+    parser.add_argument(
+        "--do_not_ignore_underscore_prefix",
+        action="store_true",
+        help="Do not ignore files and folders starting with underscore",
+    )
+    parser.add_argument(
+        "--max_concurrent_nodes",
+        type=int,
+        default=8,
+        help="Maximum number of independent nodes to run at the same time",
+    )
+    parser.add_argument(
+        "--process_workers",
+        type=int,
+        default=0,
+        help="Run nodes in a pool of this many worker processes instead of threads",
+    )
+    parser.add_argument(
+        "--node_timeout",
+        type=float,
+        default=None,
+        help="Seconds a node may run before it's reported as timed out (no limit by default)",
+    )
+    parser.add_argument(
+        "--keep_going",
+        action="store_true",
+        help="When a node fails, only skip the nodes that depend on it",
+    )
+    parser.add_argument(
+        "--checkpoint_dir",
+        default=None,
+        help="Checkpoint the outputs of executed nodes to this directory. Running the "
+        "same graph again continues where the previous run stopped",
+    )
+    parser.add_argument(
+        "--trace_memory",
+        action="store_true",
+        help="Report the peak Python memory of every node (slows down allocations)",
+    )
+
+    args = parser.parse_args()
+
+    search_paths = [p.strip() for p in args.path.split(",")]
+
+    for search_path in search_paths:
+        if not os.path.exists(search_path):
+            print(f"The path {search_path} does not exist")
+            sys.exit(1)
+
+    exec_utils.VERBOSE = args.verbose
+    exec_utils.DEFAULT_NODE_TIMEOUT = args.node_timeout
+    exec_async.MAX_CONCURRENT_NODES = args.max_concurrent_nodes
+    checkpoints.CHECKPOINT_DIR = args.checkpoint_dir
+    profiling.TRACE_MEMORY = args.trace_memory
+
+    ignore_underscore = not args.do_not_ignore_underscore_prefix
+    function_schemas, callables, types = analyze_file_structure(
+        search_paths, ignore_underscore_prefix=ignore_underscore
+    )
+    server_module.FUNCTION_SCHEMAS.extend(function_schemas)
+    server_module.CALLABLES.update(callables)
+    server_module.TYPES.update(types)
+
+    # Types have to be loaded before the graph's cached arguments can be reconstructed
+    with open(args.graph) as f:
+        graph_json = f.read()
+    graph = Graph.model_validate_json(graph_json)
+
+    if args.process_workers > 0:
+        process_pool.start_process_pool(
+            args.process_workers, search_paths, ignore_underscore
+        )
+
+    started_at = time.perf_counter()
+    try:
+        state = run_graph(
+            graph, keep_going=args.keep_going, execution_id=run_id(graph_json)
+        )
+    finally:
+        process_pool.stop_process_pool()
+    elapsed = time.perf_counter() - started_at
+
+    results_path = write_results(graph, state, args.output_dir)
+
+    print(format_timings(graph, state))
+    print(f"\nExecuted {len(state._node_timings)} nodes in {elapsed:.3f}s")
+    print(f"Results written to {results_path}")
+
+    failed = [
+        node_id
+        for node_id, node_update in state.node_updates.items()
+        if node_update.status in ("error", "cancelled")
+    ]
+    for node_id in failed:
+        print(f"\nNode {node_id} failed:\n{state.node_updates[node_id].terminal_output}")
+    if failed:
+        sys.exit(1)
+
+
+def worker():
+    import argparse
+    import os
+    import sys
+
+    import python_node_editor.execution.exec_utils as exec_utils
+    from python_node_editor.execution.worker import run_worker
+
+    parser = argparse.ArgumentParser(
+        description="Run nodes for a Python Node Editor server started with --worker_token"
+    )
+    parser.add_argument(
+        "path", help="Comma-separated paths to analyze for functions and types"
+    )
+    parser.add_argument(
+        "--server",
+        default="http://127.0.0.1:8000",
+        help="URL of the server to run nodes for",
+    )
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("PNE_WORKER_TOKEN"),
+        help="The server's worker token (defaults to the PNE_WORKER_TOKEN environment variable)",
+    )
+    parser.add_argument(
+        "--name", default=None, help="Name of the worker (defaults to the host name)"
+    )
+    parser.add_argument(
+        "--store_size",
+        type=int,
+        default=32,
+        help="Number of values to keep for later nodes instead of receiving them again",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Enable verbose output"
+    )
+    parser.add_argument(
+        "--do_not_ignore_underscore_prefix",
+        action="store_true",
+        help="Do not ignore files and folders starting with underscore",
+    )
+
+    args = parser.parse_args()
+
+    if args.token is None:
+        print("A worker token is required, pass --token or set PNE_WORKER_TOKEN")
+        sys.exit(1)
+
+    search_paths = [p.strip() for p in args.path.split(",")]
+
+    for search_path in search_paths:
+        if not os.path.exists(search_path):
+            print(f"The path {search_path} does not exist")
+            sys.exit(1)
+
+    exec_utils.VERBOSE = args.verbose
+
+    try:
+        run_worker(
+            args.server,
+            args.token,
+            search_paths,
+            ignore_underscore_prefix=not args.do_not_ignore_underscore_prefix,
+            name=args.name,
+            store_size=args.store_size,
+        )
+    except KeyboardInterrupt:
+        pass
@@ -1,3 +1,4 @@
+import inspect
 from functools import wraps
 from typing import Any, Callable, TypeVar, cast
 
@@ -10,11 +11,24 @@ def add_node_options(
     list_inputs: bool = False,
     dict_inputs: bool = False,
     cached_types: list | None = None,
+    pure: bool = True,
+    timeout: float | None = None,
+    mutates_inputs: bool = False,
+    profile: bool = False,
 ):
     def decorator(func: F) -> F:
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
+        # Keep async def functions awaitable so they still run on the event loop
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):  # type: ignore[misc]
+                return await func(*args, **kwargs)
+
+        else:
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                return func(*args, **kwargs)
 
         # Add the name attribute to the wrapper function if provided
         if node_name is not None:
@@ -27,6 +41,18 @@ def add_node_options(
             wrapper.dict_inputs = dict_inputs  # type: ignore
         if cached_types is not None:
             wrapper._type_datamodel_mappings = cached_types  # type: ignore
+        # Impure functions (randomness, side effects) are never answered from the result cache
+        if not pure:
+            wrapper.pure = pure  # type: ignore
+        # Overrides the server's default number of seconds the node may run
+        if timeout is not None:
+            wrapper.timeout = timeout  # type: ignore
+        # Functions that change their arguments in place get copies, the originals may be shared
+        if mutates_inputs:
+            wrapper.mutates_inputs = mutates_inputs  # type: ignore
+        # Every run is profiled, for finding out where a slow function spends its time
+        if profile:
+            wrapper.profile = profile  # type: ignore
 
         return cast(F, wrapper)
 
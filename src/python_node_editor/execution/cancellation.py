@@ -0,0 +1,63 @@
+"""
+Cooperative cancellation checks for long running node callables.
+
+When an execution is cancelled through /execution_cancel, no further nodes are scheduled,
+but a node that is already running in a thread can't be stopped from the outside.
+Long running functions can poll is_cancelled() or call raise_if_cancelled() to stop early:
+
+    from python_node_editor.execution.cancellation import raise_if_cancelled
+
+    def slow_add(a: int, b: int) -> int:
+        for _ in range(5):
+            raise_if_cancelled()
+            time.sleep(1)
+        return a + b
+
+In process pool mode a node that doesn't stop on its own is killed along with its worker.
+The same checks also report a node that ran out of its time budget as cancelled.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Protocol
+
+
+class _Event(Protocol):
+    # Satisfied by both threading.Event and multiprocessing.Event
+    def is_set(self) -> bool: ...
+
+
+# The events of every enclosing cancellation scope, innermost last
+_CANCEL_EVENTS: ContextVar[tuple[_Event, ...]] = ContextVar(
+    "pne_cancel_events", default=()
+)
+
+
+class ExecutionCancelled(Exception):
+    pass
+
+
+def is_cancelled() -> bool:
+    """Whether the current node has been cancelled or ran out of time"""
+    return any(event.is_set() for event in _CANCEL_EVENTS.get())
+
+
+def raise_if_cancelled() -> None:
+    """Raises ExecutionCancelled if the current node has been cancelled or ran out of time"""
+    if is_cancelled():
+        raise ExecutionCancelled("Execution was cancelled")
+
+
+@contextmanager
+def cancellation_scope(event: _Event | None) -> Iterator[None]:
+    """Adds the event to the ones checked by is_cancelled() in the current context.
+    Scopes nest, so a node is cancelled as soon as any enclosing scope's event is set."""
+    if event is None:
+        yield
+        return
+
+    token = _CANCEL_EVENTS.set(_CANCEL_EVENTS.get() + (event,))
+    try:
+        yield
+    finally:
+        _CANCEL_EVENTS.reset(token)
@@ -0,0 +1,131 @@
+"""
+Per-node capture of stdout and stderr that is safe with many nodes running at once.
+
+Swapping sys.stdout for every node breaks as soon as two nodes run in parallel threads:
+they overwrite each other's streams and mix their output. Instead, sys.stdout and sys.stderr
+are replaced once by dispatching streams, and every write is routed to the buffer of the node
+running in the current context. asyncio.to_thread copies the context into the worker thread,
+so each node only ever sees its own buffer. Writes outside of a node go to the original streams.
+
+A node's output can additionally be teed into a LiveOutput, which the execution drains
+while the node is still running to stream its progress to the frontend.
+"""
+
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+_CURRENT_BUFFER: ContextVar[io.StringIO | None] = ContextVar(
+    "pne_capture_buffer", default=None
+)
+_INSTALL_LOCK = threading.Lock()
+
+# Characters of not yet streamed output kept per running node, older output gets dropped
+MAX_LIVE_OUTPUT = 64 * 1024
+
+
+class LiveOutput:
+    """Output a running node has printed that hasn't been streamed yet.
+    Written from the node's thread and drained from the event loop."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chunks: list[str] = []
+        self._size = 0
+        self._skipped = 0
+
+    def write(self, text: str) -> None:
+        with self._lock:
+            self._chunks.append(text)
+            self._size += len(text)
+
+            if self._size > MAX_LIVE_OUTPUT:
+                # Keep only the most recent output, the full output still arrives with the result
+                joined = "".join(self._chunks)
+                excess = len(joined) - MAX_LIVE_OUTPUT
+                self._skipped += excess
+                self._chunks = [joined[excess:]]
+                self._size = MAX_LIVE_OUTPUT
+
+    @property
+    def pending(self) -> bool:
+        return self._size > 0
+
+    def drain(self) -> str:
+        """Returns the output written since the last drain"""
+        with self._lock:
+            text = "".join(self._chunks)
+            if self._skipped:
+                text = f"[... {self._skipped} characters skipped ...]\n{text}"
+            self._chunks = []
+            self._size = 0
+            self._skipped = 0
+        return text
+
+
+class _TeeBuffer(io.StringIO):
+    """A capture buffer that also forwards every write to a LiveOutput"""
+
+    def __init__(self, live_output: LiveOutput):
+        super().__init__()
+        self._live_output = live_output
+
+    def write(self, text: str) -> int:
+        self._live_output.write(text)
+        return super().write(text)
+
+
+class _DispatchingStream:
+    """Stands in for sys.stdout or sys.stderr and writes to the current node's buffer if there is one"""
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+
+    def write(self, text: str) -> int:
+        buffer = _CURRENT_BUFFER.get()
+        if buffer is None:
+            return self._fallback.write(text)
+        return buffer.write(text)
+
+    def flush(self) -> None:
+        if _CURRENT_BUFFER.get() is None:
+            self._fallback.flush()
+
+    def __getattr__(self, name: str):
+        # Everything else (encoding, fileno, isatty...) behaves like the original stream
+        return getattr(self._fallback, name)
+
+
+def install_capture_streams() -> None:
+    """Install the dispatching streams, unless they are already in place.
+
+    This runs before every capture, so streams replaced in the meantime
+    (by pytest for example) get wrapped again.
+    """
+    if isinstance(sys.stdout, _DispatchingStream) and isinstance(
+        sys.stderr, _DispatchingStream
+    ):
+        return
+
+    with _INSTALL_LOCK:
+        if not isinstance(sys.stdout, _DispatchingStream):
+            sys.stdout = _DispatchingStream(sys.stdout)
+        if not isinstance(sys.stderr, _DispatchingStream):
+            sys.stderr = _DispatchingStream(sys.stderr)
+
+
+@contextmanager
+def capture_output(live_output: LiveOutput | None = None) -> Iterator[io.StringIO]:
+    """Captures everything printed in the current context (thread or task) into a buffer,
+    and into the live_output as well if one is given"""
+    install_capture_streams()
+
+    buffer = io.StringIO() if live_output is None else _TeeBuffer(live_output)
+    token = _CURRENT_BUFFER.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _CURRENT_BUFFER.reset(token)
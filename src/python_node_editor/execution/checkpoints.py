@@ -0,0 +1,254 @@
+"""
+On-disk checkpoints of running executions, so they can be resumed after a server restart.
+
+When CHECKPOINT_DIR is set, every execution gets a directory named after its execution id:
+
+    meta.json           how the execution was submitted, and the graph's cached inputs
+    graph.json          the graph as it was submitted
+    data/<cache_key>.*  values of cached types (like images), written by their write_checkpoint
+    nodes/<node_id>.pkl the outputs of every node that executed successfully
+
+A node's record is only written once its cached values are on disk, so a record that exists
+is always complete. Resuming answers the recorded nodes with their outputs and runs the rest.
+The directory is removed once every node of the graph has executed.
+"""
+
+import json
+import os
+import pickle
+import shutil
+from typing import Any
+from urllib.parse import quote, unquote
+
+from python_node_editor.large_data.base import LARGE_DATA_CACHE, CachedDataWrapper
+from python_node_editor.schema import Graph, NodeUpdate
+
+# Directory to checkpoint executions in, checkpointing is off when this is None
+CHECKPOINT_DIR: str | None = None
+
+META_FILENAME = "meta.json"
+GRAPH_FILENAME = "graph.json"
+
+
+class CheckpointNotFound(Exception):
+    pass
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Writes to a temporary file first, so a crash never leaves half a file behind"""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(data)
+    os.replace(temporary_path, path)
+
+
+def _node_filename(node_id: str) -> str:
+    return f"{quote(node_id, safe='')}.pkl"
+
+
+def checkpoint_path(execution_id: str) -> str:
+    """The directory of an execution's checkpoint. Execution ids come from URLs,
+    so they're refused if they could point anywhere else"""
+    if CHECKPOINT_DIR is None:
+        raise CheckpointNotFound("Checkpointing is not enabled")
+    if (
+        not execution_id
+        or execution_id != os.path.basename(execution_id)
+        or execution_id.startswith(".")
+    ):
+        raise CheckpointNotFound(f"Invalid execution id {execution_id!r}")
+    return os.path.join(CHECKPOINT_DIR, execution_id)
+
+
+class Checkpoint:
+    """Writes the checkpoint of one execution. The methods do blocking file I/O,
+    the execution runs them in threads"""
+
+    def __init__(self, execution_id: str):
+        self.directory = checkpoint_path(execution_id)
+        self.data_directory = os.path.join(self.directory, "data")
+        self.nodes_directory = os.path.join(self.directory, "nodes")
+        os.makedirs(self.data_directory, exist_ok=True)
+        os.makedirs(self.nodes_directory, exist_ok=True)
+
+        # Nodes recorded by an earlier run of a resumed execution don't have to be written again
+        self.completed = {
+            unquote(filename.removesuffix(".pkl"))
+            for filename in os.listdir(self.nodes_directory)
+            if filename.endswith(".pkl")
+        }
+
+    def write_value(self, wrapper: CachedDataWrapper) -> str:
+        """Writes a cached value with its own hook and returns the file name"""
+        path = wrapper.write_checkpoint(
+            os.path.join(self.data_directory, wrapper.cache_key)
+        )
+        return os.path.basename(path)
+
+    def _write_meta(self, meta: dict[str, Any]) -> None:
+        _write_atomic(
+            os.path.join(self.directory, META_FILENAME), json.dumps(meta).encode()
+        )
+
+    def _read_meta(self) -> dict[str, Any]:
+        with open(os.path.join(self.directory, META_FILENAME)) as f:
+            return json.load(f)
+
+    def start(
+        self,
+        graph_json: str,
+        inputs: list[CachedDataWrapper],
+        session_id: str | None,
+        keep_going: bool,
+    ) -> None:
+        """Records the submitted graph, unless this is a resumed execution that already has it.
+        graph_json has to be serialized before the execution propagates outputs into the graph"""
+        graph_path = os.path.join(self.directory, GRAPH_FILENAME)
+        if os.path.exists(graph_path):
+            meta = self._read_meta()
+            meta["status"] = "running"
+            self._write_meta(meta)
+            return
+
+        # The graph only refers to its uploaded values by cache key, which won't survive a restart
+        input_files = {}
+        for wrapper in inputs:
+            if wrapper.cache_key not in input_files:
+                input_files[wrapper.cache_key] = {
+                    "type": wrapper.type,
+                    "file": self.write_value(wrapper),
+                }
+
+        self._write_meta(
+            {
+                "status": "running",
+                "session_id": session_id,
+                "keep_going": keep_going,
+                "inputs": input_files,
+            }
+        )
+        # Written last, a checkpoint without its graph is never resumed
+        _write_atomic(graph_path, graph_json.encode())
+
+    def save_node(self, node_update: NodeUpdate) -> None:
+        """Records the outputs of a node that executed successfully. A node whose outputs
+        can't be written is left out, resuming runs it again"""
+        node_id = node_update.node_id
+        try:
+            outputs = {}
+            data_files = {}
+            for output_name, output in (node_update.outputs or {}).items():
+                if isinstance(output, CachedDataWrapper):
+                    # The value is stored in its own file, the record only keeps the wrapper
+                    data_files[output_name] = self.write_value(output)
+                    output = output.model_copy(update={"value": None})
+                outputs[output_name] = output
+
+            record = {
+                "update": NodeUpdate(
+                    node_id=node_id,
+                    status="executed",
+                    outputs=outputs or None,
+                    terminal_output=node_update.terminal_output,
+                ),
+                "data_files": data_files,
+            }
+            _write_atomic(
+                os.path.join(self.nodes_directory, _node_filename(node_id)),
+                pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL),
+            )
+            self.completed.add(node_id)
+        except Exception as e:
+            print(f"Could not checkpoint node {node_id}: {type(e).__name__}: {e}")
+
+    def finish(self, finished_all_nodes: bool) -> None:
+        """Removes the checkpoint of an execution that has nothing left to do, and marks any
+        other one as stopped so it can be resumed"""
+        if finished_all_nodes:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            return
+        meta = self._read_meta()
+        meta["status"] = "stopped"
+        self._write_meta(meta)
+
+
+def open_checkpoint(execution_id: str) -> Checkpoint | None:
+    """The checkpoint to write an execution to, or None if checkpointing is off"""
+    if CHECKPOINT_DIR is None:
+        return None
+    return Checkpoint(execution_id)
+
+
+def load_checkpoint(
+    execution_id: str,
+) -> tuple[Graph, dict[str, NodeUpdate], dict[str, Any]]:
+    """Reads an execution's checkpoint back in: the submitted graph, the updates of the nodes
+    that completed, and how it was submitted. Cached values go back into LARGE_DATA_CACHE."""
+    from python_node_editor.server import TYPES
+
+    directory = checkpoint_path(execution_id)
+    if not os.path.exists(os.path.join(directory, GRAPH_FILENAME)):
+        raise CheckpointNotFound(f"No checkpoint for execution {execution_id}")
+
+    with open(os.path.join(directory, META_FILENAME)) as f:
+        meta = json.load(f)
+    data_directory = os.path.join(directory, "data")
+
+    # The graph's cached arguments are looked up in the cache while it's validated
+    for cache_key, input_file in meta["inputs"].items():
+        type_def = TYPES.get(input_file["type"])
+        wrapper_class = getattr(type_def, "_referenced_datamodel", None) or CachedDataWrapper
+        LARGE_DATA_CACHE[cache_key] = wrapper_class.read_checkpoint(
+            os.path.join(data_directory, input_file["file"])
+        )
+
+    with open(os.path.join(directory, GRAPH_FILENAME)) as f:
+        graph = Graph.model_validate_json(f.read())
+
+    completed = {}
+    nodes_directory = os.path.join(directory, "nodes")
+    for filename in os.listdir(nodes_directory):
+        if not filename.endswith(".pkl"):
+            continue
+        with open(os.path.join(nodes_directory, filename), "rb") as f:
+            record = pickle.load(f)
+
+        node_update: NodeUpdate = record["update"]
+        for output_name, data_file in record["data_files"].items():
+            output = node_update.outputs[output_name]
+            output.value = type(output).read_checkpoint(
+                os.path.join(data_directory, data_file)
+            )
+            LARGE_DATA_CACHE[output.cache_key] = output.value
+        completed[node_update.node_id] = node_update
+
+    return graph, completed, meta
+
+
+def list_checkpoints() -> list[dict[str, Any]]:
+    """Every execution that has a checkpoint, with how many of its nodes completed"""
+    if CHECKPOINT_DIR is None or not os.path.isdir(CHECKPOINT_DIR):
+        return []
+
+    checkpoints = []
+    for execution_id in sorted(os.listdir(CHECKPOINT_DIR)):
+        directory = os.path.join(CHECKPOINT_DIR, execution_id)
+        if not os.path.exists(os.path.join(directory, GRAPH_FILENAME)):
+            continue
+        try:
+            with open(os.path.join(directory, META_FILENAME)) as f:
+                meta = json.load(f)
+            completed_nodes = sum(
+                filename.endswith(".pkl")
+                for filename in os.listdir(os.path.join(directory, "nodes"))
+            )
+        except (OSError, ValueError):
+            continue
+        checkpoints.append(
+            {
+                "execution_id": execution_id,
+                "status": meta["status"],
+                "completed_nodes": completed_nodes,
+            }
+        )
+    return checkpoints
@@ -0,0 +1,622 @@
+"""
+Distributed execution: pne-worker processes, on this host or others, that run nodes for the server.
+
+A worker analyzes the same search paths as the server, registers the callables it found and then
+pulls its work: while it's idle it long-polls /worker_task for the next node, runs it and posts
+the result to /worker_result. Since nodes go to whichever worker asks next, every worker stays
+busy and nothing has to track how loaded the workers are. While a node runs, its worker posts
+what the node printed to /worker_output, which also tells the worker when to stop the node.
+
+Arguments and results cross the network pickled, so the worker endpoints only accept requests
+carrying the server's worker token and they're disabled when the server doesn't have one.
+
+Values of cached types (like images) and node results stay in the store of the worker that
+received or produced them. When a later node on the same worker needs one of them, only a
+ValueRef to it is sent instead of the value. A worker whose store has dropped a value asks for
+it again by answering with the keys it's missing.
+
+Nodes are placed where their inputs are: a node whose inputs are held by a worker, at least
+LOCALITY_MIN_BYTES of them, is left to that worker while it's busy with another node. Only when
+it's still busy after LOCALITY_WAIT seconds does the next idle worker take the node and receive
+its inputs. How many bytes went to and came from workers is counted per execution.
+
+A worker that hasn't been heard from for WORKER_TIMEOUT seconds is considered dead and its node
+is handed to another worker, up to MAX_ATTEMPTS times. Once no worker is left that has a node's
+callable, the node runs on the server again.
+"""
+
+import asyncio
+import pickle
+import secrets
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, NamedTuple
+
+import shortuuid
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+
+from python_node_editor.execution.capture import LiveOutput
+from python_node_editor.execution.exec_utils import build_call_arguments, timed_out
+from python_node_editor.large_data.base import CachedDataWrapper
+from python_node_editor.schema import NodeDataFromFrontend
+from python_node_editor.schema_base import CamelBaseModel
+
+router = APIRouter()
+
+# Workers have to send this in their X-Worker-Token header, workers are refused when it's None
+WORKER_TOKEN: str | None = None
+
+# Seconds without a poll or output from a worker after which it's considered dead
+WORKER_TIMEOUT = 15.0
+# Longest time in seconds a poll of an idle worker is held open waiting for a node
+MAX_POLL_WAIT = 5.0
+# Number of times a node is handed to a worker before giving up on it
+MAX_ATTEMPTS = 3
+# Seconds a node gets to stop on its own after its execution is cancelled
+CANCEL_GRACE_PERIOD = 2.0
+# Interval in seconds at which a waiting node checks for cancellation and dead workers
+POLL_INTERVAL = 0.05
+# Bytes of a node's inputs a worker has to hold for the node to wait for that worker
+LOCALITY_MIN_BYTES = 1024 * 1024
+# Seconds a node waits for the busy worker holding its inputs before another worker takes it
+LOCALITY_WAIT = 1.0
+
+
+class TransferStats(CamelBaseModel):
+    """Data moved between the server and the workers"""
+
+    nodes: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    # Bytes of inputs that workers already had, so only a reference to them was sent
+    bytes_reused: int = 0
+
+
+# The stats of the execution the current node belongs to, set by the execution
+CURRENT_TRANSFERS: ContextVar[TransferStats | None] = ContextVar(
+    "pne_transfers", default=None
+)
+
+
+class ValueRef(NamedTuple):
+    """An argument value the worker already has in its store"""
+
+    key: str
+
+
+class StoredValue(NamedTuple):
+    """An argument value the worker should keep in its store for later nodes,
+    pickled on its own so the server knows its size"""
+
+    key: str
+    data: bytes
+
+
+class ValueKeys:
+    """Gives values a key that workers can keep them under. A key lives as long as its value
+    does on the server, so values that can't be weakly referenced (like ints) never get one."""
+
+    def __init__(self):
+        self._keys: dict[int, tuple[weakref.ref, str]] = {}
+        # Pickled size of the values, as far as it's known
+        self._sizes: dict[str, int] = {}
+
+    def get(self, value: Any) -> str | None:
+        entry = self._keys.get(id(value))
+        if entry is not None and entry[0]() is value:
+            return entry[1]
+        return None
+
+    def assign(self, value: Any, key: str | None = None) -> str | None:
+        """The value's key, a new one if it doesn't have one yet"""
+        existing = self.get(value)
+        if existing is not None:
+            return existing
+
+        value_id = id(value)
+        key = key or shortuuid.uuid()
+
+        def forget(_):
+            self._keys.pop(value_id, None)
+            self._sizes.pop(key, None)
+
+        try:
+            ref = weakref.ref(value, forget)
+        except TypeError:
+            return None
+        self._keys[value_id] = (ref, key)
+        return key
+
+    def size(self, key: str) -> int:
+        return self._sizes.get(key, 0)
+
+    def set_size(self, key: str, size: int) -> None:
+        self._sizes[key] = size
+
+
+# Tells the waiting node that no worker is left, so it runs on the server instead
+NO_WORKERS = object()
+
+
+class WorkerTask:
+    """A node waiting for, or running on, a worker"""
+
+    def __init__(
+        self,
+        callable_id: str,
+        args: list[Any],
+        kwargs: dict[str, Any],
+        cached_ids: set[int],
+        input_keys: list[str],
+        live_output: LiveOutput | None,
+        transfers: TransferStats | None,
+    ):
+        self.task_id = shortuuid.uuid()
+        self.callable_id = callable_id
+        self.args = args
+        self.kwargs = kwargs
+        # Values of cached type arguments, which are worth keeping in the worker's store
+        self.cached_ids = cached_ids
+        # Keys of the arguments that workers may already hold, for placing the node
+        self.input_keys = input_keys
+        self.live_output = live_output
+        self.transfers = transfers
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.monotonic()
+        self.worker_id: str | None = None
+        self.started_at: float | None = None
+        self.attempts = 0
+        self.cancel_requested = False
+
+    def resolve(self, outcome: Any) -> None:
+        if not self.future.done():
+            self.future.set_result(outcome)
+
+
+class RemoteWorker:
+    def __init__(self, name: str, callable_ids: set[str]):
+        self.worker_id = shortuuid.uuid()
+        self.name = name
+        self.callable_ids = callable_ids
+        self.last_seen = time.monotonic()
+        self.task: WorkerTask | None = None
+        # Keys of the values this worker was given or produced, as far as the server knows
+        self.store_keys: set[str] = set()
+        # The open poll of an idle worker, resolved with the next task for it
+        self.poll: asyncio.Future | None = None
+
+
+class WorkerRegistry:
+    """The registered workers and the nodes waiting for one"""
+
+    def __init__(self):
+        self.workers: dict[str, RemoteWorker] = {}
+        self.queue: deque[WorkerTask] = deque()
+        self.value_keys = ValueKeys()
+        # Totals over all executions
+        self.transfers = TransferStats()
+
+    def has_worker_for(self, callable_id: str) -> bool:
+        return any(
+            callable_id in worker.callable_ids for worker in self.workers.values()
+        )
+
+    def register(self, name: str, callable_ids: set[str]) -> RemoteWorker:
+        worker = RemoteWorker(name, callable_ids)
+        self.workers[worker.worker_id] = worker
+        return worker
+
+    def get_worker(self, worker_id: str) -> RemoteWorker:
+        worker = self.workers.get(worker_id)
+        if worker is None:
+            # The worker registers again, like after it was reaped or the server restarted
+            raise HTTPException(status_code=404, detail="Unknown worker")
+        worker.last_seen = time.monotonic()
+        return worker
+
+    def reap(self) -> None:
+        """Removes the workers that stopped responding and hands their nodes to others"""
+        now = time.monotonic()
+        # A worker waiting in a poll is idle, not dead, it's seen again when the poll ends
+        dead = [
+            worker
+            for worker in self.workers.values()
+            if worker.poll is None and now - worker.last_seen > WORKER_TIMEOUT
+        ]
+        for worker in dead:
+            del self.workers[worker.worker_id]
+            task = worker.task
+            if task is None or task.future.done():
+                continue
+            if task.attempts >= MAX_ATTEMPTS:
+                task.resolve(
+                    (False, None, f"Worker {worker.name} stopped responding, giving up\n")
+                )
+            else:
+                task.worker_id = None
+                task.started_at = None
+                self.queue.appendleft(task)
+
+        if dead:
+            # Nodes no remaining worker can run go back to the server
+            for task in list(self.queue):
+                if not self.has_worker_for(task.callable_id):
+                    self.queue.remove(task)
+                    task.resolve(NO_WORKERS)
+            self.dispatch()
+
+    def held_bytes(self, task: WorkerTask, worker: RemoteWorker) -> int:
+        """Bytes of the node's inputs the worker has in its store"""
+        return sum(
+            self.value_keys.size(key)
+            for key in task.input_keys
+            if key in worker.store_keys
+        )
+
+    def waits_for_other_worker(
+        self, task: WorkerTask, worker: RemoteWorker, now: float
+    ) -> bool:
+        """Whether the node is left to another worker holding more of its inputs,
+        which is the case until that worker has been busy for LOCALITY_WAIT seconds"""
+        if now - task.queued_at > LOCALITY_WAIT:
+            return False
+        held = self.held_bytes(task, worker)
+        return any(
+            other is not worker
+            and task.callable_id in other.callable_ids
+            and (other_held := self.held_bytes(task, other)) >= LOCALITY_MIN_BYTES
+            and other_held > held
+            for other in self.workers.values()
+        )
+
+    def take_task(self, worker: RemoteWorker) -> WorkerTask | None:
+        """The queued node the worker holds the most input bytes of, the first one on a tie.
+        Nodes waiting for a worker that holds more of their inputs are skipped."""
+        now = time.monotonic()
+        best = None
+        best_held = -1
+        for task in self.queue:
+            if task.callable_id not in worker.callable_ids:
+                continue
+            if self.waits_for_other_worker(task, worker, now):
+                continue
+            held = self.held_bytes(task, worker)
+            if held > best_held:
+                best, best_held = task, held
+
+        if best is not None:
+            self.queue.remove(best)
+            self.assign(best, worker)
+        return best
+
+    def assign(self, task: WorkerTask, worker: RemoteWorker) -> None:
+        task.worker_id = worker.worker_id
+        task.started_at = time.monotonic()
+        task.attempts += 1
+        worker.task = task
+
+    def dispatch(self) -> None:
+        """Hands queued nodes to the idle workers that are waiting in a poll"""
+        for worker in self.workers.values():
+            if worker.poll is None or worker.poll.done() or worker.task is not None:
+                continue
+            task = self.take_task(worker)
+            if task is None:
+                continue
+            worker.poll.set_result(task)
+            worker.poll = None
+
+    def abandon(self, task: WorkerTask) -> None:
+        """Stops waiting for a node. Its worker is told to stop it and stays busy
+        until it does, its result is ignored"""
+        task.cancel_requested = True
+        task.future.cancel()
+        if task in self.queue:
+            self.queue.remove(task)
+
+    def wire_keys(self, task: WorkerTask, worker: RemoteWorker) -> tuple[dict[int, str], int]:
+        """The keys of the task's values that workers keep, by value id, giving its cached type
+        arguments one, and the bytes of the ones the worker already holds.
+        Runs on the event loop, which reads the same keys to place nodes."""
+        keys = {}
+        reused = 0
+        for value in [*task.args, *task.kwargs.values()]:
+            if id(value) in task.cached_ids:
+                key = self.value_keys.assign(value)
+            else:
+                key = self.value_keys.get(value)
+            if key is None:
+                continue
+            keys[id(value)] = key
+            if key in worker.store_keys:
+                reused += self.value_keys.size(key)
+        return keys, reused
+
+    def record_stored(self, worker: RemoteWorker, stored: dict[str, int]) -> None:
+        """Takes note of the values a worker was sent to keep, with their pickled sizes"""
+        for key, size in stored.items():
+            self.value_keys.set_size(key, size)
+            worker.store_keys.add(key)
+
+    def count_transfer(
+        self, task: WorkerTask, sent: int = 0, received: int = 0, reused: int = 0
+    ) -> None:
+        for stats in (self.transfers, task.transfers):
+            if stats is None:
+                continue
+            stats.bytes_sent += sent
+            stats.bytes_received += received
+            stats.bytes_reused += reused
+
+    def complete(
+        self, worker: RemoteWorker, task_id: str, message: tuple, size: int = 0
+    ) -> None:
+        """Takes the reply of a worker to a node, size is how many bytes it was"""
+        task = worker.task
+        if task is None or task.task_id != task_id:
+            return
+        worker.task = None
+        self.count_transfer(task, received=size)
+
+        kind, value = message
+        if kind == "missing":
+            # The worker dropped these from its store, so the node is sent again with the values
+            worker.store_keys.difference_update(value)
+            task.attempts -= 1
+            task.worker_id = None
+            if not task.future.done():
+                self.queue.appendleft(task)
+        else:
+            success, result, _ = value
+            if success and self.value_keys.assign(result, task.task_id) == task.task_id:
+                worker.store_keys.add(task.task_id)
+                # The result is most of the reply
+                self.value_keys.set_size(task.task_id, size)
+            for stats in (self.transfers, task.transfers):
+                if stats is not None:
+                    stats.nodes += 1
+            task.resolve(value)
+
+        self.dispatch()
+
+    async def execute(
+        self,
+        node: NodeDataFromFrontend,
+        cancel_event: threading.Event | None = None,
+        timeout: float | None = None,
+        live_output: LiveOutput | None = None,
+    ) -> tuple[bool, Any, str | None] | None:
+        """Executes a node on the next worker that has its callable, streaming its output into
+        live_output while it runs. Returns None if no worker is left to run it.
+
+        A cancelled node is asked to stop and given up on after CANCEL_GRACE_PERIOD seconds,
+        a node running longer than timeout seconds is given up on right away.
+
+        Returns a tuple of (success, result, terminal_output) like execute_node
+        """
+        from python_node_editor.server import CALLABLES
+
+        args, kwargs = build_call_arguments(CALLABLES[node.callable_id], node.arguments)
+        cached_ids = {
+            id(argument.value)
+            for argument in node.arguments.values()
+            if isinstance(argument, CachedDataWrapper)
+        }
+        input_keys = [
+            key
+            for value in [*args, *kwargs.values()]
+            if (key := self.value_keys.get(value)) is not None
+        ]
+        task = WorkerTask(
+            node.callable_id,
+            args,
+            kwargs,
+            cached_ids,
+            input_keys,
+            live_output,
+            CURRENT_TRANSFERS.get(),
+        )
+        self.queue.append(task)
+        self.dispatch()
+
+        cancelled_at = None
+        try:
+            while True:
+                done, _ = await asyncio.wait({task.future}, timeout=POLL_INTERVAL)
+                if done:
+                    outcome = task.future.result()
+                    return None if outcome is NO_WORKERS else outcome
+
+                self.reap()
+                if task.worker_id is None:
+                    # Nodes that waited long enough for a busy worker go to an idle one
+                    self.dispatch()
+
+                if (
+                    timeout is not None
+                    and task.started_at is not None
+                    and time.monotonic() - task.started_at > timeout
+                ):
+                    self.abandon(task)
+                    return timed_out(timeout)
+
+                if cancel_event is None or not cancel_event.is_set():
+                    continue
+
+                if task.worker_id is None:
+                    # Still queued, it never started
+                    self.abandon(task)
+                    return (False, None, "Execution cancelled\n")
+                if cancelled_at is None:
+                    # Give the node a chance to stop cooperatively first
+                    task.cancel_requested = True
+                    cancelled_at = time.monotonic()
+                elif time.monotonic() - cancelled_at > CANCEL_GRACE_PERIOD:
+                    self.abandon(task)
+                    return (
+                        False,
+                        None,
+                        "Stopped waiting for the worker after the execution was cancelled\n",
+                    )
+        except asyncio.CancelledError:
+            # The node's task was cancelled along with its execution
+            self.abandon(task)
+            raise
+
+    def clear(self) -> None:
+        for task in self.queue:
+            task.resolve(NO_WORKERS)
+        self.queue.clear()
+        self.workers.clear()
+
+
+REGISTRY = WorkerRegistry()
+
+
+def encode_task(
+    task: WorkerTask, keys: dict[int, str], held: frozenset[str]
+) -> tuple[bytes, dict[str, int]]:
+    """Pickles a task for a worker, referring to the values it holds by key and sending the
+    other keyed values along for it to keep. Only reads the task, so it can run in a thread.
+    Returns the payload and the pickled sizes of the values sent to be kept."""
+    stored = {}
+
+    def wire_value(value: Any) -> Any:
+        key = keys.get(id(value))
+        if key is None:
+            return value
+        if key in held or key in stored:
+            return ValueRef(key)
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        stored[key] = len(data)
+        return StoredValue(key, data)
+
+    payload = pickle.dumps(
+        {
+            "task_id": task.task_id,
+            "callable_id": task.callable_id,
+            "args": [wire_value(value) for value in task.args],
+            "kwargs": {name: wire_value(value) for name, value in task.kwargs.items()},
+            # The worker keeps the result under this key for the nodes downstream
+            "result_key": task.task_id,
+        },
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    return payload, stored
+
+
+def check_worker_token(x_worker_token: str | None = Header(default=None)) -> None:
+    if WORKER_TOKEN is None:
+        raise HTTPException(status_code=404, detail="Workers are not enabled")
+    if x_worker_token is None or not secrets.compare_digest(x_worker_token, WORKER_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid worker token")
+
+
+class WorkerRegistration(CamelBaseModel):
+    name: str
+    callable_ids: list[str]
+
+
+class WorkerOutput(CamelBaseModel):
+    output: str = ""
+
+
+@router.post("/worker_register", dependencies=[Depends(check_worker_token)])
+async def register_worker(registration: WorkerRegistration):
+    """Adds a worker that can run the given callables"""
+    worker = REGISTRY.register(registration.name, set(registration.callable_ids))
+    return {"worker_id": worker.worker_id}
+
+
+@router.get("/worker_task/{worker_id}", dependencies=[Depends(check_worker_token)])
+async def get_worker_task(worker_id: str, wait: float = MAX_POLL_WAIT):
+    """The next node for an idle worker, pickled. Waits up to wait seconds for one
+    and answers with 204 No Content if none came up."""
+    worker = REGISTRY.get_worker(worker_id)
+    REGISTRY.reap()
+
+    if worker.task is not None and not worker.task.future.done():
+        # The worker is asking for more work, so it no longer runs the node it was given
+        task = worker.task
+        worker.task = None
+        task.worker_id = None
+        task.attempts -= 1
+        REGISTRY.queue.appendleft(task)
+
+    task = REGISTRY.take_task(worker)
+    if task is None:
+        worker.poll = asyncio.get_running_loop().create_future()
+        try:
+            task = await asyncio.wait_for(
+                asyncio.shield(worker.poll), min(wait, MAX_POLL_WAIT)
+            )
+        except TimeoutError:
+            if worker.poll is not None and worker.poll.done():
+                task = worker.poll.result()
+            else:
+                worker.poll = None
+                return Response(status_code=204)
+        finally:
+            worker.last_seen = time.monotonic()
+
+    keys, reused = REGISTRY.wire_keys(task, worker)
+    try:
+        # Only the pickling happens in the thread, the registry is updated on the event loop
+        payload, stored = await asyncio.to_thread(
+            encode_task, task, keys, frozenset(worker.store_keys)
+        )
+    except Exception:
+        worker.task = None
+        task.resolve((False, None, traceback.format_exc()))
+        return Response(status_code=204)
+    REGISTRY.record_stored(worker, stored)
+    REGISTRY.count_transfer(task, sent=len(payload), reused=reused)
+    return Response(content=payload, media_type="application/octet-stream")
+
+
+@router.post(
+    "/worker_output/{worker_id}/{task_id}", dependencies=[Depends(check_worker_token)]
+)
+async def post_worker_output(worker_id: str, task_id: str, output: WorkerOutput):
+    """Output a running node printed since the last post, which also keeps its worker alive.
+    Answers whether the worker should stop the node."""
+    worker = REGISTRY.get_worker(worker_id)
+    task = worker.task
+    if task is None or task.task_id != task_id:
+        return {"cancel": True}
+    if output.output and task.live_output is not None:
+        task.live_output.write(output.output)
+    return {"cancel": task.cancel_requested}
+
+
+@router.post(
+    "/worker_result/{worker_id}/{task_id}", dependencies=[Depends(check_worker_token)]
+)
+async def post_worker_result(worker_id: str, task_id: str, request: Request):
+    """The pickled outcome of a node, or the store keys the worker was missing for it"""
+    worker = REGISTRY.get_worker(worker_id)
+    body = await request.body()
+    message = await asyncio.to_thread(pickle.loads, body)
+    REGISTRY.complete(worker, task_id, message, len(body))
+    return {"ok": True}
+
+
+@router.get("/workers", dependencies=[Depends(check_worker_token)])
+async def get_workers():
+    """The registered workers, whether they're running a node and the data moved so far"""
+    return {
+        "workers": [
+            {
+                "worker_id": worker.worker_id,
+                "name": worker.name,
+                "busy": worker.task is not None,
+            }
+            for worker in REGISTRY.workers.values()
+        ],
+        "queued": len(REGISTRY.queue),
+        "transfers": REGISTRY.transfers,
+    }
@@ -1,18 +1,70 @@
 # pyright: basic, reportOptionalSubscript = false
 import asyncio
+import contextlib
+import threading
+import time
+from typing import Any
 
 import shortuuid
 from devtools import debug as d
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import PrivateAttr
 from typing_extensions import Literal
 
+from python_node_editor.execution import process_pool
+from python_node_editor.execution.capture import LiveOutput
+from python_node_editor.execution.checkpoints import (
+    CheckpointNotFound,
+    list_checkpoints,
+    load_checkpoint,
+    open_checkpoint,
+)
+from python_node_editor.execution.distributed import (
+    CURRENT_TRANSFERS,
+    REGISTRY,
+    TransferStats,
+)
 from python_node_editor.execution.exec_utils import (
     VERBOSE,
+    attach_profile,
     create_node_update,
-    execute_node,
-    topological_order,
+    execute_chain_async,
+    execute_node_async,
+    has_stream_arguments,
+    node_timeout,
+    propagate_outputs,
+    skip_downstream,
+)
+from python_node_editor.execution.graph_index import CYCLE_ERROR, GraphIndex
+from python_node_editor.execution.plans import OutputHint
+from python_node_editor.execution.profiling import (
+    CALL_PROFILES,
+    PROFILE_NODES,
+    callable_stats,
+    execution_profile,
+)
+from python_node_editor.execution.result_cache import (
+    get_cached_update,
+    result_cache_key,
+    store_update,
+)
+from python_node_editor.execution.scheduler import SCHEDULER, Priority, QueueFull
+from python_node_editor.execution.sessions import (
+    kept_update,
+    node_signatures,
+    record_execution,
+    reusable_updates,
+    reused_update,
+)
+from python_node_editor.execution.streams import ItemStream, StreamOutput
+from python_node_editor.large_data.base import CachedDataWrapper
+from python_node_editor.schema import (
+    DataWrapper,
+    Graph,
+    NodeFromFrontend,
+    NodeProfile,
+    NodeUpdate,
 )
-from python_node_editor.schema import Graph, NodeFromFrontend, NodeUpdate
 from python_node_editor.schema_base import CamelBaseModel
 
 router = APIRouter()
@@ -20,29 +72,213 @@ router = APIRouter()
 # Time in seconds to keep completed executions before cleanup
 EXECUTION_CLEANUP_DELAY = 10
 
+# Maximum number of nodes from a single execution that may run at the same time
+MAX_CONCURRENT_NODES = 8
+
+# Async def nodes only wait on I/O without holding a thread, so many more of them may run at once
+MAX_CONCURRENT_ASYNC_NODES = 256
+
+# Interval in seconds at which new output from running nodes is made available to polls
+OUTPUT_PUSH_INTERVAL = 0.25
+
 
 class ExecutionState(CamelBaseModel):
-    status: Literal["running", "complete"] = "running"
+    status: Literal["queued", "running", "complete"] = "running"
+    queue_position: int | None = None
+    cancelled: bool | None = None
     node_updates: dict[str, NodeUpdate] = {}
     update_index: int = -1
     last_sent_index: int | None = None
 
+    # Set on cancellation so running nodes can stop cooperatively through is_cancelled()
+    _cancel_event: threading.Event = PrivateAttr(default_factory=threading.Event)
+    # Output of the running nodes that hasn't been sent to the frontend yet
+    _live_output: dict[str, LiveOutput] = PrivateAttr(default_factory=dict)
+    # Where the running generator nodes put their items, for reporting their progress
+    _stream_outputs: dict[str, StreamOutput] = PrivateAttr(default_factory=dict)
+    # Seconds each executed node took to run, not counting the time it waited for a free slot
+    _node_timings: dict[str, float] = PrivateAttr(default_factory=dict)
+    # Data moved to and from pne-workers for the nodes they ran
+    _transfers: TransferStats = PrivateAttr(default_factory=TransferStats)
+
 
 EXECUTIONS: dict[str, ExecutionState] = {}
 
 
+def update_queue_positions(queued_execution_ids: list[str]) -> None:
+    """Expose the position of every queued execution through /execution_update"""
+    for position, execution_id in enumerate(queued_execution_ids, start=1):
+        state = EXECUTIONS.get(execution_id)
+        if state is not None and state.queue_position != position:
+            state.queue_position = position
+            state.update_index += 1
+
+
+SCHEDULER.on_queue_change = update_queue_positions
+
+
 @router.post("/execution_submit")
-async def submit_execution(graph: Graph):
-    """Submit a graph for async execution and return an execution ID"""
-    execution_id = shortuuid.uuid()
+async def submit_execution(
+    graph: Graph,
+    session_id: str | None = None,
+    deadline: float | None = None,
+    keep_going: bool = False,
+    priority: Priority = "interactive",
+    fuse: bool = False,
+    profile_nodes: bool = False,
+):
+    """Submit a graph for async execution and return an execution ID
+
+    The execution waits in the server-wide queue until a slot is free. When the
+    queue is full the submission is rejected with a 429 so the client can back off.
+    Interactive executions are served before batch ones, which are meant for large
+    background runs and make way for interactive executions between their nodes.
+
+    When a session_id is given, nodes that are unchanged since the session's last
+    execution are answered with their previous outputs instead of being executed again.
+
+    When a deadline is given, the whole execution has to finish within that many seconds
+    of being submitted. Nodes still running at the deadline are reported as timed out.
+
+    By default no further nodes are started once a node fails. With keep_going only the
+    nodes downstream of a failed node are skipped and every other branch still finishes,
+    and with a session_id their results are reused when the graph is submitted again.
+
+    With fuse, linear chains of nodes run as one unit in a single thread, for clients that
+    only look at the ends of chains. The nodes inside a chain still report their status,
+    output and errors, but not their outputs, which go straight into the next node.
+
+    With profile_nodes, every node's callable runs under the profiler, like callables
+    marked with add_node_options(profile=True) always do. See /call_profile.
+    """
+    if not GraphIndex(graph).is_acyclic():
+        raise HTTPException(status_code=400, detail=CYCLE_ERROR)
 
-    EXECUTIONS[execution_id] = ExecutionState(status="running")
+    execution_id = shortuuid.uuid()
+    deadline_at = (
+        asyncio.get_running_loop().time() + deadline if deadline is not None else None
+    )
 
-    asyncio.create_task(execute_graph_async(execution_id, graph))
+    EXECUTIONS[execution_id] = ExecutionState(status="queued")
+
+    try:
+        SCHEDULER.submit(
+            execution_id,
+            lambda: execute_graph_async(
+                execution_id,
+                graph,
+                session_id,
+                deadline_at,
+                keep_going=keep_going,
+                priority=priority,
+                fuse=fuse,
+                profile_nodes=profile_nodes,
+            ),
+            priority,
+        )
+    except QueueFull as e:
+        del EXECUTIONS[execution_id]
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
 
     return {"execution_id": execution_id}
 
 
+@router.post("/execution_resume/{execution_id}")
+async def resume_execution(execution_id: str, priority: Priority = "interactive"):
+    """Continue an execution from its checkpoint, like after a server restart
+
+    The nodes that completed before are answered with their checkpointed outputs and
+    only the rest of the graph runs. The execution keeps its id, so it's polled through
+    /execution_update as usual. Requires the server to run with a checkpoint directory.
+    """
+    state = EXECUTIONS.get(execution_id)
+    if state is not None and state.status != "complete":
+        raise HTTPException(status_code=409, detail="Execution is still running")
+
+    try:
+        graph, completed, meta = await asyncio.to_thread(load_checkpoint, execution_id)
+    except CheckpointNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    EXECUTIONS[execution_id] = ExecutionState(status="queued")
+
+    try:
+        SCHEDULER.submit(
+            execution_id,
+            lambda: execute_graph_async(
+                execution_id,
+                graph,
+                meta["session_id"],
+                shared=completed,
+                keep_going=meta["keep_going"],
+                priority=priority,
+            ),
+            priority,
+        )
+    except QueueFull as e:
+        del EXECUTIONS[execution_id]
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
+    return {"execution_id": execution_id, "resumed_nodes": len(completed)}
+
+
+@router.get("/execution_checkpoints")
+async def get_execution_checkpoints():
+    """The executions that can be resumed. A checkpoint whose status is still "running"
+    while its execution isn't belongs to an execution the server was stopped in the middle of"""
+    return {"checkpoints": await asyncio.to_thread(list_checkpoints)}
+
+
+@router.get("/execution_queue")
+async def get_execution_queue():
+    """How many executions of every priority class are running and waiting in the queue"""
+    return SCHEDULER.depths()
+
+
+@router.get("/execution_transfers/{execution_id}")
+async def get_execution_transfers(execution_id: str):
+    """How many nodes of an execution ran on pne-workers and the bytes moved for them"""
+    if execution_id not in EXECUTIONS:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return EXECUTIONS[execution_id]._transfers
+
+
+@router.get("/execution_profile/{execution_id}")
+async def get_execution_profile(execution_id: str):
+    """The profiles of the nodes an execution ran, slowest first, with their totals"""
+    if execution_id not in EXECUTIONS:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return execution_profile(EXECUTIONS[execution_id].node_updates)
+
+
+@router.get("/callable_profiles")
+async def get_callable_profiles():
+    """Statistics over the recent runs of every callable, by callable_id"""
+    return callable_stats()
+
+
+@router.get("/call_profile/{call_profile_id}")
+async def get_call_profile(
+    call_profile_id: str, format: Literal["text", "pstats", "collapsed"] = "text"
+):
+    """A node's call profile: the functions taking the most time as text, the pstats file to
+    open with pstats or snakeviz, or the sampled stacks collapsed for flamegraph tools"""
+    call_profile = CALL_PROFILES.get(call_profile_id)
+    if call_profile is None:
+        raise HTTPException(status_code=404, detail="Call profile not found")
+
+    if format == "pstats":
+        return Response(
+            content=call_profile.pstats,
+            media_type="application/octet-stream",
+            headers={
+                "Content-Disposition": f'attachment; filename="{call_profile.name}.pstats"'
+            },
+        )
+    content = call_profile.text if format == "text" else call_profile.collapsed
+    return Response(content=content, media_type="text/plain")
+
+
 @router.get("/execution_update/{execution_id}")
 async def get_execution_status(execution_id: str):
     """Get the status and updates for a specific execution"""
@@ -61,7 +297,48 @@ async def get_execution_status(execution_id: str):
     execution_state.last_sent_index = current_index
 
     # Return the execution state, excluding internal last_sent_index field
-    return execution_state.model_dump(exclude={"last_sent_index"}, exclude_none=True)
+    response = execution_state.model_dump(exclude={"last_sent_index"}, exclude_none=True)
+
+    # Running nodes only send what they printed since the previous poll
+    for node_id, live_output in list(execution_state._live_output.items()):
+        if live_output.pending and node_id in response.get("nodeUpdates", {}):
+            response["nodeUpdates"][node_id].update(
+                NodeUpdate(
+                    node_id=node_id, new_terminal_output=live_output.drain()
+                ).model_dump(include={"new_terminal_output"})
+            )
+
+    return response
+
+
+@router.post("/execution_cancel/{execution_id}")
+async def cancel_execution(execution_id: str):
+    """Cancel a queued or running execution
+
+    No further nodes are scheduled and the nodes that are running are reported as cancelled.
+    Running nodes can notice the cancellation through is_cancelled(), and in process pool
+    mode a node that doesn't stop on its own gets its worker process killed.
+    """
+    if execution_id not in EXECUTIONS:
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    state = EXECUTIONS[execution_id]
+    if state.status == "complete":
+        return {"cancelled": False}
+
+    state._cancel_event.set()
+    was_queued = state.status == "queued"
+    SCHEDULER.cancel(execution_id)
+
+    # A queued execution never started, so nothing else will mark it complete
+    if was_queued:
+        state.status = "complete"
+        state.queue_position = None
+        state.cancelled = True
+        state.update_index += 1
+        asyncio.create_task(cleanup_execution(execution_id, state))
+
+    return {"cancelled": True}
 
 
 def push_node_update(
@@ -103,104 +380,589 @@ def push_node_update(
     if new_update.terminal_output is not None:
         existing.terminal_output = new_update.terminal_output
 
+    if new_update.items_produced is not None:
+        existing.items_produced = new_update.items_produced
+
+    if new_update.fused_into is not None:
+        existing.fused_into = new_update.fused_into
+
+    if new_update.profile is not None:
+        existing.profile = new_update.profile
+
 
 async def execute_and_create_update(
-    node: NodeFromFrontend, graph: Graph, execution_list: list[NodeFromFrontend]
+    node: NodeFromFrontend,
+    graph: Graph,
+    execution_list: list[NodeFromFrontend],
+    cancel_event: threading.Event | None = None,
+    timeout: float | None = None,
+    live_output: LiveOutput | None = None,
+    stream_output: StreamOutput | None = None,
+    output_hints: dict[str, OutputHint] | None = None,
 ) -> NodeUpdate:
-    """Execute a node and create its update in a single operation."""
-    success, result, terminal_output = await asyncio.to_thread(execute_node, node.data)
+    """Execute a node and create its update in a single operation, with the node's profile"""
+    profile = NodeProfile()
+    started_at = time.perf_counter()
+    success, result, terminal_output = await execute_node_async(
+        node.data, cancel_event, timeout, live_output, stream_output, profile
+    )
+    profile.wall_seconds = time.perf_counter() - started_at
+
+    node_update = create_node_update(
+        node,
+        success,
+        result,
+        terminal_output,
+        graph,
+        execution_list,
+        output_hints,
+        profile,
+    )
+    if stream_output is not None:
+        node_update.items_produced = stream_output.count
+
+    return node_update
+
+
+def fused_updates(
+    chain: list[NodeFromFrontend],
+    outcomes: list[tuple[bool, Any, str | None, float]],
+    graph: Graph,
+    execution_list: list[NodeFromFrontend],
+    output_hints: dict[str, dict[str, OutputHint]],
+    profiles: list[NodeProfile],
+) -> list[NodeUpdate]:
+    """The updates of the nodes of a fused chain that ran. A node whose result went into the
+    next node only reports that it executed and what it printed, the last node of the
+    chain and a node that failed get their update like any other node."""
+    updates = []
+    for i, (node, (success, result, terminal_output, seconds)) in enumerate(
+        zip(chain, outcomes)
+    ):
+        profile = profiles[i]
+        profile.wall_seconds = seconds
+        if success and i < len(chain) - 1:
+            node_update = NodeUpdate(
+                node_id=node.id,
+                status="executed",
+                terminal_output=terminal_output,
+                fused_into=chain[i + 1].id,
+            )
+            updates.append(
+                attach_profile(node_update, node.data.callable_id, profile, terminal_output)
+            )
+        else:
+            updates.append(
+                create_node_update(
+                    node,
+                    success,
+                    result,
+                    terminal_output,
+                    graph,
+                    execution_list,
+                    output_hints.get(node.id),
+                    profile,
+                )
+            )
+    return updates
+
 
-    return create_node_update(
-        node, success, result, terminal_output, graph, execution_list
+def deadline_passed(node_id: str) -> NodeUpdate:
+    return NodeUpdate(
+        node_id=node_id,
+        status="error",
+        terminal_output="TimeoutError: Execution deadline passed before the node started\n",
     )
 
 
-async def cleanup_execution(execution_id: str):
-    """Remove execution from memory after a delay"""
+async def push_progress(state: ExecutionState):
+    """Let the frontend know when running nodes have printed something new or yielded more items.
+    Polls in between only get the new output once per interval, however much is printed."""
+    reported_counts: dict[str, int] = {}
+    while True:
+        await asyncio.sleep(OUTPUT_PUSH_INTERVAL)
+        changed = any(
+            live_output.pending for live_output in state._live_output.values()
+        )
+
+        for node_id, stream_output in list(state._stream_outputs.items()):
+            if stream_output.count > reported_counts.get(node_id, 0):
+                reported_counts[node_id] = stream_output.count
+                push_node_update(
+                    state.node_updates,
+                    NodeUpdate(node_id=node_id, items_produced=stream_output.count),
+                )
+                changed = True
+
+        if changed:
+            state.update_index += 1
+
+
+async def cleanup_execution(execution_id: str, state: ExecutionState):
+    """Remove execution from memory after a delay, unless it was resumed under the same id"""
     await asyncio.sleep(EXECUTION_CLEANUP_DELAY)
-    if execution_id in EXECUTIONS:
+    if EXECUTIONS.get(execution_id) is state:
         del EXECUTIONS[execution_id]
         if VERBOSE:
             print(f"Cleaned up execution {execution_id}")
 
 
-async def execute_graph_async(execution_id: str, graph: Graph):
-    """Execute a graph asynchronously, yielding updates as nodes complete"""
+async def execute_graph_async(
+    execution_id: str,
+    graph: Graph,
+    session_id: str | None = None,
+    deadline_at: float | None = None,
+    shared: dict[str, NodeUpdate] | None = None,
+    keep_going: bool = False,
+    priority: Priority = "interactive",
+    fuse: bool = False,
+    profile_nodes: bool = False,
+    keep_items: bool = False,
+):
+    """Execute a graph asynchronously, yielding updates as nodes complete
+
+    Nodes are scheduled as a wavefront: every node whose upstream nodes have all
+    executed is launched immediately, so independent branches run concurrently
+    (up to MAX_CONCURRENT_NODES at a time). A node that consumes the items of a generator
+    node through an Iterator argument is launched together with the generator node.
+
+    deadline_at is the event loop time by which the whole execution has to finish.
+    shared holds the updates of nodes that were already executed for this graph by
+    someone else (like the common nodes of a sweep), they are answered with those.
+    With keep_going, a failed node only stops the nodes downstream of it.
+    Batch priority executions wait for interactive ones before launching more nodes.
+    With fuse, the linear chains found by the plan run as one unit, see fused_updates.
+    With profile_nodes, the callables of all nodes that run in a thread are profiled.
+    With keep_items, generator nodes keep their items even when they all go into streams,
+    so their updates can be handed to another execution.
+    When checkpointing is on, the outputs of every executed node are written to disk
+    as the execution goes, so it can be resumed if the server stops.
+    """
 
     # Get local reference to execution state
     state = EXECUTIONS[execution_id]
-
-    execution_list = topological_order(graph)
+    state.status = "running"
+    state.queue_position = None
+    state.update_index += 1
+    # The nodes' tasks copy the context, so this is what they count their transfers in
+    CURRENT_TRANSFERS.set(state._transfers)
+    PROFILE_NODES.set(profile_nodes)
+
+    index = GraphIndex(graph)
+
+    # Signatures have to be taken before outputs get propagated into the graph's arguments
+    signatures = node_signatures(index) if session_id is not None else {}
+    reused = (
+        reusable_updates(session_id, index, signatures)
+        if session_id is not None
+        else {}
+    )
+    if shared:
+        reused.update(shared)
+
+    # The graph is recorded before any outputs get propagated into its arguments
+    checkpoint = open_checkpoint(execution_id)
+    checkpoint_writes: list[asyncio.Task] = []
+    if checkpoint is not None:
+        inputs = [
+            argument
+            for node in graph.nodes
+            for argument in node.data.arguments.values()
+            if isinstance(argument, CachedDataWrapper) and argument.value is not None
+        ]
+        try:
+            await asyncio.to_thread(
+                checkpoint.start,
+                graph.model_dump_json(by_alias=True),
+                inputs,
+                session_id,
+                keep_going,
+            )
+        except asyncio.CancelledError:
+            # Cancelled before any node was launched, so none will be
+            asyncio.current_task().uncancel()
+            state.cancelled = True
+
+    execution_list = index.topological_order()
 
     if VERBOSE:
         d(execution_list)
 
-    # Iterate through and execute
-    for node in execution_list:
-        if VERBOSE:
-            print(f"Executing node {node.id}")
-
-        # Send initial update when node starts executing
-        executing_update = NodeUpdate(
-            node_id=node.id,
-            status="executing",
-        )
-
-        # Push the "executing" status update
-        push_node_update(state.node_updates, executing_update)
+    # Count the incoming edges of each node, a node is ready once this reaches zero
+    remaining_inputs = {node_id: len(edges) for node_id, edges in index.incoming.items()}
+
+    # Edges a generator node streams its items over, into an Iterator argument of the target.
+    # A reused generator node doesn't run, its collected items are passed on like a list
+    plan = index.plan
+    stream_edges = {edge for edge in plan.stream_edges if edge.source not in reused}
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_NODES)
+    async_semaphore = asyncio.Semaphore(MAX_CONCURRENT_ASYNC_NODES)
+    running: dict[asyncio.Task, NodeFromFrontend] = {}
+    # The nodes of the fused chains that are running and the outcomes of the ones that ran
+    chain_runs: dict[
+        asyncio.Task, tuple[list[NodeFromFrontend], list, list[NodeProfile]]
+    ] = {}
+    failed = False
+    session_updates: dict[str, NodeUpdate] = {}
+
+    async def run_node(
+        node: NodeFromFrontend, stream_output: StreamOutput | None = None
+    ) -> NodeUpdate:
+        try:
+            # A node that is unchanged since the session's last execution keeps its previous outputs
+            if node.id in reused:
+                return reused_update(node.id, reused[node.id])
+
+            # A node whose callable already ran with the same arguments is answered from the cache
+            cache_key = result_cache_key(node.data)
+            if cache_key is not None:
+                cached_update = get_cached_update(node, cache_key)
+                if cached_update is not None:
+                    return cached_update
+
+            node_update = await execute_within_limits(node, stream_output)
+        finally:
+            # Let the producers of this node's input streams stop waiting on it,
+            # also when the node was answered without reading them
+            for argument in node.data.arguments.values():
+                if isinstance(argument.value, ItemStream):
+                    argument.value.abandon()
+
+        # Consumers of a generator node that didn't finish stop instead of waiting for more items
+        if stream_output is not None and node_update.status != "executed":
+            stream_output.fail()
+
+        if cache_key is not None:
+            store_update(cache_key, node_update)
+
+        return node_update
+
+    async def execute_within_limits(
+        node: NodeFromFrontend, stream_output: StreamOutput | None
+    ) -> NodeUpdate:
+        if (stream_output is not None and stream_output.streams) or has_stream_arguments(
+            node.data
+        ):
+            # Both ends of a stream have to run at the same time or they'd wait on each other forever
+            limit = contextlib.nullcontext()
+        elif node.id in plan.async_nodes:
+            limit = async_semaphore
+        else:
+            limit = semaphore
+
+        async with limit:
+            # The node gets its own time budget, cut short by the execution's deadline
+            timeout = node_timeout(node.data)
+            if deadline_at is not None:
+                remaining = deadline_at - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    return deadline_passed(node.id)
+                timeout = remaining if timeout is None else min(timeout, remaining)
+
+            if VERBOSE:
+                print(f"Executing node {node.id}")
+
+            # Send initial update when node starts executing
+            executing_update = NodeUpdate(
+                node_id=node.id,
+                status="executing",
+            )
+
+            # Push the "executing" status update
+            push_node_update(state.node_updates, executing_update)
+
+            # Increment update_index so the frontend can see the "executing" status update is available
+            state.update_index += 1
 
-        # Increment update_index so the frontend can see the "executing" status update is available
-        state.update_index += 1
+            # Execute the node and create its update, streaming its output while it runs
+            state._live_output[node.id] = LiveOutput()
+            if stream_output is not None:
+                state._stream_outputs[node.id] = stream_output
+            started_at = asyncio.get_running_loop().time()
+            try:
+                return await execute_and_create_update(
+                    node,
+                    graph,
+                    execution_list,
+                    state._cancel_event,
+                    timeout,
+                    state._live_output[node.id],
+                    stream_output,
+                    plan.output_hints.get(node.id),
+                )
+            finally:
+                state._node_timings[node.id] = (
+                    asyncio.get_running_loop().time() - started_at
+                )
+                # The final update carries the node's full output and item count
+                del state._live_output[node.id]
+                state._stream_outputs.pop(node.id, None)
+
+    def fused_chain(node: NodeFromFrontend) -> list[NodeFromFrontend] | None:
+        """The chain starting at the node if it can run fused"""
+        if not fuse or node.id not in plan.chains:
+            return None
+        chain = [index.nodes[node_id] for node_id in plan.chains[node.id]]
+        # Nodes with their own time budget, or that were already answered, run one at a time
+        if any(
+            member.id in reused or node_timeout(member.data) is not None
+            for member in chain
+        ):
+            return None
+        # As do nodes that run in another process
+        if process_pool.PROCESS_POOL is not None or any(
+            REGISTRY.has_worker_for(member.data.callable_id) for member in chain
+        ):
+            return None
+        return chain
+
+    async def run_chain(
+        chain: list[NodeFromFrontend], outcomes: list, profiles: list[NodeProfile]
+    ) -> list[NodeUpdate]:
+        async with semaphore:
+            timeout = None
+            if deadline_at is not None:
+                timeout = deadline_at - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    return [deadline_passed(chain[0].id)]
+
+            if VERBOSE:
+                print(f"Executing nodes {', '.join(node.id for node in chain)} fused")
+
+            push_node_update(
+                state.node_updates, NodeUpdate(node_id=chain[0].id, status="executing")
+            )
+            state.update_index += 1
 
-        # Execute the node and create its update
-        node_update = await execute_and_create_update(node, graph, execution_list)
-
-        # Push the final update
-        push_node_update(state.node_updates, node_update)
-
-        # Propagate outputs to downstream nodes and create updates for them
-        for edge in graph.edges:
-            if edge.source == node.id:
-                # Extract the output field name from the source_handle
-                output_field_name = edge.source_handle.split(":")[-2]
-
-                # Extract target node ID and argument name
-                target_node_id = edge.target
-                argument_name = edge.target_handle.split(":")[-2]
-
-                # Update the execution graph so downstream nodes have inputs generated from the output in question
-                target_node = next(n for n in execution_list if n.id == target_node_id)
-                target_node.data.arguments[argument_name] = node_update.outputs[
-                    output_field_name
-                ].model_copy()
-
-                # Create an update for the downstream node so we see it's input value change in the UI
-                downstream_update = NodeUpdate(
-                    node_id=target_node_id,
-                    arguments={
-                        argument_name: node_update.outputs[
-                            output_field_name
-                        ].model_copy()
-                    },
+            live_outputs = [LiveOutput() for _ in chain]
+            for node, live_output in zip(chain, live_outputs):
+                state._live_output[node.id] = live_output
+            link_arguments = [index.incoming[node.id][0].argument_name for node in chain[1:]]
+            finished = outcomes
+            try:
+                finished = await execute_chain_async(
+                    [node.data for node in chain],
+                    link_arguments,
+                    state._cancel_event,
+                    timeout,
+                    live_outputs,
+                    outcomes,
+                    profiles,
                 )
+            finally:
+                for node, (*_, seconds) in zip(chain, finished):
+                    state._node_timings[node.id] = seconds
+                for node in chain:
+                    del state._live_output[node.id]
+
+            return fused_updates(
+                chain, finished, graph, execution_list, plan.output_hints, profiles
+            )
+
+    def launch(node: NodeFromFrontend):
+        chain = fused_chain(node)
+        if chain is not None:
+            outcomes = []
+            profiles = [NodeProfile() for _ in chain]
+            task = asyncio.create_task(run_chain(chain, outcomes, profiles))
+            running[task] = node
+            chain_runs[task] = (chain, outcomes, profiles)
+            return
 
-                # Push the downstream update
-                push_node_update(state.node_updates, downstream_update)
+        stream_output = None
+        streamed = [edge for edge in index.outgoing[node.id] if edge in stream_edges]
+
+        if node.id in plan.generator_nodes:
+            streams = []
+            for edge in streamed:
+                stream = ItemStream(node.id)
+                streams.append(stream)
+                # Streams can't be validated or serialized, so they bypass the DataWrapper's validation
+                argument = index.nodes[edge.target].data.arguments[edge.argument_name]
+                index.nodes[edge.target].data.arguments[edge.argument_name] = (
+                    DataWrapper.model_construct(type=argument.type, value=stream)
+                )
 
-        # Increment update_index after execution completes
+            # The items are only kept if a node needs them all at once, or nothing consumes them.
+            # An update that may be reused later has to carry them, its consumers won't get a stream
+            collect = (
+                len(streamed) < len(index.outgoing[node.id])
+                or not streamed
+                or keep_items
+                or checkpoint is not None
+            )
+            stream_output = StreamOutput(streams, collect=collect)
+
+        running[asyncio.create_task(run_node(node, stream_output))] = node
+
+        # Nodes consuming the items start right away instead of waiting for the generator to finish
+        for edge in streamed:
+            remaining_inputs[edge.target] -= 1
+            if remaining_inputs[edge.target] == 0:
+                launch(index.nodes[edge.target])
+
+    # The first wavefront is launched in topological order to keep the x-position tie-breaking.
+    # Ready nodes are collected before launching any, since launching a generator node
+    # also launches its consumers
+    ready = [node for node in execution_list if remaining_inputs[node.id] == 0]
+    if state.cancelled:
+        ready = []
+
+    output_pusher = asyncio.create_task(push_progress(state))
+
+    try:
+        while running or ready:
+            if ready:
+                if priority == "batch":
+                    # Batch executions make way for interactive ones at node boundaries
+                    await SCHEDULER.yield_to_interactive()
+                if state._cancel_event.is_set():
+                    # Cancelled without its task being cancelled, like the variants of a sweep
+                    # that the scheduler didn't start, so the nodes left are given up on here
+                    for node in ready:
+                        push_node_update(
+                            state.node_updates,
+                            NodeUpdate(
+                                node_id=node.id,
+                                status="cancelled",
+                                terminal_output="Execution cancelled\n",
+                            ),
+                        )
+                    state.cancelled = True
+                    state.update_index += 1
+                elif not failed:
+                    for node in ready:
+                        launch(node)
+                ready = []
+                if not running:
+                    break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                running.pop(task)
+                chain_runs.pop(task, None)
+                result = task.result()
+                # A fused chain answers with the updates of all of its nodes that ran
+                node_updates = result if isinstance(result, list) else [result]
+
+                for node_update in node_updates:
+                    node = index.nodes[node_update.node_id]
+
+                    # Push the final update
+                    push_node_update(state.node_updates, node_update)
+
+                    if node_update.status == "error":
+                        if keep_going:
+                            # Only the nodes that depend on the failed one are given up on,
+                            # the ones already launched (like stream consumers) finish on their own
+                            launched = {
+                                node_id
+                                for node_id, count in remaining_inputs.items()
+                                if count == 0
+                            }
+                            for skipped_update in skip_downstream(index, node.id, launched):
+                                push_node_update(state.node_updates, skipped_update)
+                        else:
+                            # Stop scheduling new nodes, but let the ones already running finish
+                            failed = True
+                        break
+
+                    if node_update.fused_into is not None:
+                        # Its output already went into the next node of the chain
+                        remaining_inputs[node_update.fused_into] -= 1
+                        continue
+
+                    if signatures.get(node.id) is not None:
+                        # The session keeps the outputs as they were made,
+                        # before downstream nodes get them
+                        session_updates[node.id] = reused.get(node.id) or kept_update(
+                            node_update
+                        )
+
+                    if checkpoint is not None and node.id not in checkpoint.completed:
+                        checkpoint_writes.append(
+                            asyncio.create_task(
+                                asyncio.to_thread(checkpoint.save_node, node_update)
+                            )
+                        )
+
+                    # Propagate outputs to downstream nodes and create updates for them
+                    # so we see their input values change in the UI
+                    for downstream_update in propagate_outputs(
+                        index, node_update, stream_edges
+                    ):
+                        push_node_update(state.node_updates, downstream_update)
+
+                    # Launch downstream nodes once all of their inputs have arrived
+                    for edge in index.outgoing[node.id]:
+                        if edge in stream_edges:
+                            # Already launched along with this node
+                            continue
+                        remaining_inputs[edge.target] -= 1
+                        if remaining_inputs[edge.target] == 0 and not failed:
+                            ready.append(index.nodes[edge.target])
+
+                # Increment update_index once all updates of the task are in
+                state.update_index += 1
+    except asyncio.CancelledError:
+        # The execution was cancelled, stop waiting for the nodes still running.
+        # Threads can't be interrupted, they stop when their node checks is_cancelled()
+        asyncio.current_task().uncancel()
+        for task, node in running.items():
+            task.cancel()
+            if task in chain_runs:
+                # The nodes of a fused chain that ran keep their updates,
+                # the one that was running is the one that got cancelled
+                chain, outcomes, profiles = chain_runs[task]
+                finished = list(outcomes)
+                for node_update in fused_updates(
+                    chain, finished, graph, execution_list, plan.output_hints, profiles
+                ):
+                    push_node_update(state.node_updates, node_update)
+                node = chain[min(len(finished), len(chain) - 1)]
+            push_node_update(
+                state.node_updates,
+                NodeUpdate(
+                    node_id=node.id,
+                    status="cancelled",
+                    terminal_output="Execution cancelled\n",
+                ),
+            )
+        state.cancelled = True
+    finally:
+        output_pusher.cancel()
+
+    async def finish_checkpoint():
+        await asyncio.gather(*checkpoint_writes)
+        finished_all_nodes = not state.cancelled and all(
+            node.id in state.node_updates
+            and state.node_updates[node.id].status == "executed"
+            for node in graph.nodes
+        )
+        await asyncio.to_thread(checkpoint.finish, finished_all_nodes)
+
+    try:
+        if session_id is not None:
+            record_execution(session_id, signatures, session_updates)
+
+        if checkpoint is not None:
+            # A cancel arriving now doesn't stop the checkpoint from being finished
+            finishing = asyncio.create_task(finish_checkpoint())
+            try:
+                await asyncio.shield(finishing)
+            except asyncio.CancelledError:
+                asyncio.current_task().uncancel()
+                state.cancelled = True
+                await finishing
+    finally:
+        # The execution is complete however it ended, or its pollers would wait forever
+        state.status = "complete"
         state.update_index += 1
 
-        if node_update.status == "error":
-            state.status = "complete"
-            state.update_index += 1
-            asyncio.create_task(cleanup_execution(execution_id))
-            return
-
-    state.status = "complete"
-    state.update_index += 1
-
-    if VERBOSE:
-        d(state)
+        if VERBOSE:
+            d(state)
 
-    # Schedule cleanup after delay
-    asyncio.create_task(cleanup_execution(execution_id))
+        # Schedule cleanup after delay
+        asyncio.create_task(cleanup_execution(execution_id, state))
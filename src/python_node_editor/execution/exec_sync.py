@@ -1,67 +1,141 @@
+import time
+
 from devtools import debug as d
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
 from python_node_editor.execution.exec_utils import (
     VERBOSE,
     create_node_update,
-    execute_node,
-    topological_order,
+    execute_node_async,
+    node_timeout,
+    propagate_outputs,
+    skip_downstream,
+)
+from python_node_editor.execution.graph_index import CYCLE_ERROR, GraphIndex
+from python_node_editor.execution.profiling import PROFILE_NODES
+from python_node_editor.execution.result_cache import (
+    get_cached_update,
+    result_cache_key,
+    store_update,
+)
+from python_node_editor.execution.sessions import (
+    kept_update,
+    node_signatures,
+    record_execution,
+    reusable_updates,
+    reused_update,
 )
-from python_node_editor.schema import Graph, NodeUpdate
+from python_node_editor.schema import Graph, NodeProfile, NodeUpdate
 
 router = APIRouter()
 
 
 @router.post("/graph_execute")
-async def execute_graph_sync(graph: Graph):
-    """Execute a graph containing nodes and edges synchronously"""
+async def execute_graph_sync(
+    graph: Graph,
+    session_id: str | None = None,
+    keep_going: bool = False,
+    profile_nodes: bool = False,
+):
+    """Execute a graph containing nodes and edges synchronously
+
+    The nodes are executed one after the other and the response only comes once all of them
+    are done, but they run off the event loop, so other requests are served in the meantime.
+
+    When a session_id is given, nodes that are unchanged since the session's last
+    execution are answered with their previous outputs instead of being executed again.
+
+    By default execution stops at the first node that fails. With keep_going only the
+    nodes downstream of a failed node are skipped and all other nodes still execute.
+
+    With profile_nodes, every node's callable runs under the profiler, see /call_profile.
+    """
     from python_node_editor.server import TYPES
 
-    execution_list = topological_order(graph)
+    # The nodes' threads copy the request's context, and with it this
+    PROFILE_NODES.set(profile_nodes)
+
+    index = GraphIndex(graph)
+    if not index.is_acyclic():
+        raise HTTPException(status_code=400, detail=CYCLE_ERROR)
+
+    # Signatures have to be taken before outputs get propagated into the graph's arguments
+    signatures = node_signatures(index) if session_id is not None else {}
+    reused = (
+        reusable_updates(session_id, index, signatures)
+        if session_id is not None
+        else {}
+    )
+
+    execution_list = index.topological_order()
 
     if VERBOSE:
         d(execution_list)
 
     updates = []
+    session_updates: dict[str, NodeUpdate] = {}
+    skipped: set[str] = set()
 
     for node in execution_list:
-        if VERBOSE:
-            print(f"Executing node {node.id}")
-        success, result, terminal_output = execute_node(node.data)
-
-        node_update = create_node_update(
-            node, success, result, terminal_output, graph, execution_list
-        )
+        if node.id in skipped:
+            continue
+
+        # A node that is unchanged since the session's last execution keeps its previous outputs
+        # and a node whose callable already ran with the same arguments is answered from the cache
+        cache_key = None
+        if node.id in reused:
+            node_update = reused_update(node.id, reused[node.id])
+        else:
+            cache_key = result_cache_key(node.data)
+            node_update = (
+                get_cached_update(node, cache_key) if cache_key is not None else None
+            )
+
+        if node_update is None:
+            if VERBOSE:
+                print(f"Executing node {node.id}")
+            # Nodes run in the same thread or process pool as async executions, so a slow
+            # graph doesn't hold up the event loop and every other request with it
+            profile = NodeProfile()
+            started_at = time.perf_counter()
+            success, result, terminal_output = await execute_node_async(
+                node.data, timeout=node_timeout(node.data), profile=profile
+            )
+            profile.wall_seconds = time.perf_counter() - started_at
+
+            node_update = create_node_update(
+                node,
+                success,
+                result,
+                terminal_output,
+                graph,
+                execution_list,
+                index.plan.output_hints.get(node.id),
+                profile,
+            )
+
+            if cache_key is not None:
+                store_update(cache_key, node_update)
 
         updates.append(node_update)
+        if signatures.get(node.id) is not None:
+            # The session keeps the outputs as they were made, before downstream nodes get them
+            session_updates[node.id] = reused.get(node.id) or kept_update(node_update)
+
+        if node_update.status == "error":
+            if not keep_going:
+                break
+            # Everything that depends on the failed node is skipped, the rest still runs
+            for skipped_update in skip_downstream(index, node.id, skipped):
+                skipped.add(skipped_update.node_id)
+                updates.append(skipped_update)
+            continue
 
         # Propagate outputs to downstream nodes for both execution and visual display
-        for edge in graph.edges:
-            if edge.source == node.id:
-                # Extract the output field name from the source_handle
-                output_field_name = edge.source_handle.split(":")[-2]
-
-                # Extract target node ID and argument name
-                target_node_id = edge.target
-                argument_name = edge.target_handle.split(":")[-2]
-
-                # Update the execution graph so downstream nodes have correct inputs
-                target_node = next(n for n in execution_list if n.id == target_node_id)
-                target_node.data.arguments[argument_name] = node_update.outputs[
-                    output_field_name
-                ].model_copy()
-
-                # Create a visual update for the downstream node
-                downstream_update = NodeUpdate(
-                    node_id=target_node_id,
-                    arguments={
-                        argument_name: node_update.outputs[
-                            output_field_name
-                        ].model_copy()
-                    },
-                )
-
-                updates.append(downstream_update)
+        updates.extend(propagate_outputs(index, node_update))
+
+    if session_id is not None:
+        record_execution(session_id, signatures, session_updates)
 
     update_message = {
         "status": "success",
@@ -1,13 +1,46 @@
-import io
-import sys
+import asyncio
+import contextlib
+import copy
+import inspect
+import threading
+import time
 import traceback
-from typing import Any
-
-from python_node_editor.schema import Graph, NodeDataFromFrontend, NodeFromFrontend
+from typing import Any, Callable
+
+from python_node_editor.execution import profiling
+from python_node_editor.execution.cancellation import cancellation_scope
+from python_node_editor.execution.capture import LiveOutput, capture_output
+from python_node_editor.execution.graph_index import GraphIndex, IndexedEdge
+from python_node_editor.execution.result_cache import UnhashableValue, hash_value
+from python_node_editor.execution.streams import (
+    ItemStream,
+    StreamOutput,
+    drain_async_generator,
+    drain_generator,
+    is_generator_callable,
+)
+from python_node_editor.schema import (
+    Graph,
+    NodeDataFromFrontend,
+    NodeFromFrontend,
+    NodeProfile,
+    NodeUpdate,
+)
 from python_node_editor.schema_base import StructDescr, UnionDescr
 
 VERBOSE = False
 
+# Frames from these modules are left out of the tracebacks shown on nodes
+_INTERNAL_MODULES = {__name__, "python_node_editor.execution.streams"}
+
+# Seconds a node may run before it's reported as timed out, None means no limit.
+# A callable can override it with add_node_options(timeout=...)
+DEFAULT_NODE_TIMEOUT: float | None = None
+
+# Development mode: report nodes that change the values they were passed, since downstream
+# nodes share their upstream node's outputs rather than getting copies
+CHECK_INPUT_MUTATION = False
+
 
 def infer_concrete_type(value, type_descriptor, TYPES):
     """Infer the concrete type of a value from a type descriptor.
@@ -34,121 +67,598 @@ def infer_concrete_type(value, type_descriptor, TYPES):
     raise ValueError(f"Unknown type descriptor: {type_descriptor}")
 
 
-def execute_node(node: NodeDataFromFrontend) -> tuple[bool, Any, str]:
-    """Finds a node's callable and executes it with the arguments from the frontend
+def build_call_arguments(
+    callable: Callable, arguments: dict[str, Any]
+) -> tuple[list[Any], dict[str, Any]]:
+    """Unwraps a node's argument wrappers into positional and keyword arguments for its callable"""
+    if getattr(callable, "list_inputs", False):
+        numbered_args = {}
+        named_args = {}
+
+        for k, v in arguments.items():
+            arg_value = v.value
+
+            if k.isdigit():
+                numbered_args[int(k)] = arg_value
+            else:
+                named_args[k] = arg_value
+
+        sorted_numbered_args = [numbered_args[i] for i in sorted(numbered_args.keys())]
+
+        named_args_values = list(named_args.values())
+
+        return named_args_values + sorted_numbered_args, {}
+
+    args = {}
+    for k, v in arguments.items():
+        args[k] = v.value
+
+    return [], args
+
+
+def isolate_inputs(
+    callable: Callable, args: list[Any], kwargs: dict[str, Any]
+) -> tuple[list[Any], dict[str, Any]]:
+    """Gives callables marked with add_node_options(mutates_inputs=True) their own copies of
+    their arguments, everyone else gets the values shared with other nodes"""
+    if not getattr(callable, "mutates_inputs", False):
+        return args, kwargs
+
+    # Streams are how items reach the node, they are passed on as they are
+    memo = {
+        id(value): value
+        for value in [*args, *kwargs.values()]
+        if isinstance(value, ItemStream)
+    }
+    return copy.deepcopy(args, memo), copy.deepcopy(kwargs, memo)
+
+
+def _labeled_inputs(args: list[Any], kwargs: dict[str, Any]) -> list[tuple[str, Any]]:
+    return [(str(i), value) for i, value in enumerate(args)] + list(kwargs.items())
+
+
+def input_fingerprints(
+    callable: Callable, args: list[Any], kwargs: dict[str, Any]
+) -> dict[str, str] | None:
+    """Content hashes of the arguments a node is called with when CHECK_INPUT_MUTATION is on,
+    leaving out the ones that can't be hashed"""
+    if not CHECK_INPUT_MUTATION or getattr(callable, "mutates_inputs", False):
+        return None
+
+    fingerprints = {}
+    for name, value in _labeled_inputs(args, kwargs):
+        try:
+            fingerprints[name] = hash_value(value)
+        except UnhashableValue:
+            continue
+    return fingerprints
+
+
+def check_input_mutation(
+    outcome: tuple[bool, Any, str | None],
+    fingerprints: dict[str, str] | None,
+    args: list[Any],
+    kwargs: dict[str, Any],
+) -> tuple[bool, Any, str | None]:
+    """Turns the outcome of a node that changed any of its arguments into an error"""
+    success, _, terminal_output = outcome
+    if fingerprints is None or not success:
+        return outcome
+
+    mutated = [
+        name
+        for name, value in _labeled_inputs(args, kwargs)
+        if name in fingerprints and hash_value(value) != fingerprints[name]
+    ]
+    if not mutated:
+        return outcome
+
+    return (
+        False,
+        None,
+        (terminal_output or "")
+        + f"InputMutationError: The node changed its argument {', '.join(mutated)}, "
+        "which other nodes may share. Copy it before changing it, or mark the function "
+        "with @add_node_options(mutates_inputs=True)\n",
+    )
 
-    Returns a tuple of (success, result, error_message)
+
+def call_with_capture(
+    callable: Callable,
+    args: list[Any],
+    kwargs: dict[str, Any],
+    live_output: LiveOutput | None = None,
+    stream_output: StreamOutput | None = None,
+) -> tuple[bool, Any, str | None]:
+    """Calls a node's callable while capturing everything it prints,
+    streaming it into live_output as it's written if one is given
+
+    The items of a generator node are passed on to stream_output as they are yielded,
+    by default they are collected into a list that becomes the node's result.
+
+    Returns a tuple of (success, result, terminal_output)
     """
+    with capture_output(live_output) as captured_output:
+        try:
+            result = callable(*args, **kwargs)
+            if inspect.isgenerator(result):
+                result = drain_generator(result, stream_output or StreamOutput())
+            error = None
+        except Exception as e:
+            if stream_output is not None:
+                stream_output.fail()
+            result = None
+            error = e
+
+    return format_outcome(result, error, captured_output.getvalue())
+
+
+async def call_with_capture_async(
+    callable: Callable,
+    args: list[Any],
+    kwargs: dict[str, Any],
+    live_output: LiveOutput | None = None,
+    stream_output: StreamOutput | None = None,
+) -> tuple[bool, Any, str | None]:
+    """Awaits an async node's callable on the event loop, capturing its output like call_with_capture"""
+    with capture_output(live_output) as captured_output:
+        try:
+            result = callable(*args, **kwargs)
+            if inspect.isasyncgen(result):
+                result = await drain_async_generator(
+                    result, stream_output or StreamOutput()
+                )
+            else:
+                result = await result
+            error = None
+        except Exception as e:
+            if stream_output is not None:
+                stream_output.fail()
+            result = None
+            error = e
+
+    return format_outcome(result, error, captured_output.getvalue())
+
+
+def format_outcome(
+    result: Any, error: Exception | None, terminal_output: str
+) -> tuple[bool, Any, str | None]:
+    """Echoes a node's captured output to the server's terminal and builds its outcome,
+    with the traceback appended to the output if the node raised"""
+    if error is None:
+        if terminal_output:
+            print(terminal_output, end="")
+
+        return (True, result, terminal_output if terminal_output else None)
+
+    # Leave the frames of call_with_capture and the stream draining out of the traceback
+    tb = error.__traceback__
+    while tb is not None and tb.tb_frame.f_globals.get("__name__") in _INTERNAL_MODULES:
+        tb = tb.tb_next
+    formatted_tb = "".join(traceback.format_exception(type(error), error, tb))
+
+    if terminal_output:
+        print(terminal_output, end="")
+    print(formatted_tb, end="")
+
+    combined_output = ""
+    if terminal_output:
+        combined_output += terminal_output
+    combined_output += formatted_tb
+
+    return (False, None, combined_output)
+
+
+def is_async_callable(callable: Callable) -> bool:
+    """Whether a node's callable is an async def function, looking through decorators"""
+    while True:
+        if inspect.iscoroutinefunction(callable) or inspect.isasyncgenfunction(callable):
+            return True
+        if not hasattr(callable, "__wrapped__"):
+            return False
+        callable = callable.__wrapped__
+
+
+def node_is_async(node: NodeDataFromFrontend) -> bool:
+    """Whether a node runs on the event loop instead of in a thread or worker process"""
     from python_node_editor.server import CALLABLES
 
-    callable = CALLABLES[node.callable_id]
+    return is_async_callable(CALLABLES[node.callable_id])
 
-    old_stdout = sys.stdout
-    old_stderr = sys.stderr
-    captured_output = io.StringIO()
-    sys.stdout = captured_output
-    sys.stderr = captured_output
 
-    try:
-        if getattr(callable, "list_inputs", False):
-            numbered_args = {}
-            named_args = {}
+def node_is_generator(node: NodeDataFromFrontend) -> bool:
+    """Whether a node yields items that downstream nodes can consume while it runs"""
+    from python_node_editor.server import CALLABLES
 
-            for k, v in node.arguments.items():
-                arg_value = v.value
+    return is_generator_callable(CALLABLES[node.callable_id])
 
-                if k.isdigit():
-                    numbered_args[int(k)] = arg_value
-                else:
-                    named_args[k] = arg_value
 
-            sorted_numbered_args = [
-                numbered_args[i] for i in sorted(numbered_args.keys())
-            ]
+def has_stream_arguments(node: NodeDataFromFrontend) -> bool:
+    """Whether a node consumes items streamed to it from a generator node"""
+    return any(isinstance(argument.value, ItemStream) for argument in node.arguments.values())
 
-            named_args_values = list(named_args.values())
 
-            all_args = named_args_values + sorted_numbered_args
+def consumes_stream(node: NodeDataFromFrontend, argument_name: str) -> bool:
+    """Whether a node takes an argument as an Iterator, so items can be streamed into it"""
+    argument_type = node.arguments[argument_name].type
+    return (
+        isinstance(argument_type, StructDescr)
+        and argument_type.structure_type == "iterator"
+    )
 
-            result = callable(*all_args)
-        elif getattr(callable, "dict_inputs", False):
-            args = {}
-            for k, v in node.arguments.items():
-                args[k] = v.value
 
-            result = callable(**args)
-        else:
-            args = {}
-            for k, v in node.arguments.items():
-                args[k] = v.value
+def node_timeout(node: NodeDataFromFrontend) -> float | None:
+    """The number of seconds a node may run, from its callable's options or DEFAULT_NODE_TIMEOUT"""
+    from python_node_editor.server import CALLABLES
 
-            result = callable(**args)
+    return getattr(CALLABLES[node.callable_id], "timeout", DEFAULT_NODE_TIMEOUT)
 
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
-        terminal_output = captured_output.getvalue()
 
-        if terminal_output:
-            print(terminal_output, end="")
+def timed_out(timeout: float) -> tuple[bool, Any, str | None]:
+    """The outcome reported for a node that ran out of time"""
+    return (False, None, f"TimeoutError: Node timed out after {timeout:g} seconds\n")
 
-        return (True, result, terminal_output if terminal_output else None)
-    except Exception as e:
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
-        terminal_output = captured_output.getvalue()
-        tb = e.__traceback__
-        if tb and tb.tb_next:
-            tb = tb.tb_next
-            formatted_tb = "".join(traceback.format_exception(type(e), e, tb))
-        else:
-            formatted_tb = traceback.format_exc()
 
-        if terminal_output:
-            print(terminal_output, end="")
-        print(formatted_tb, end="")
+def execute_node(
+    node: NodeDataFromFrontend,
+    cancel_event: threading.Event | None = None,
+    timeout_event: threading.Event | None = None,
+    live_output: LiveOutput | None = None,
+    stream_output: StreamOutput | None = None,
+    profile: NodeProfile | None = None,
+) -> tuple[bool, Any, str | None]:
+    """Finds a node's callable and executes it with the arguments from the frontend
 
-        combined_output = ""
-        if terminal_output:
-            combined_output += terminal_output
-        combined_output += formatted_tb
+    The callable can check the cancel_event and timeout_event through is_cancelled() to stop early.
+    Everything it prints is also written to live_output while it runs, and the items of
+    a generator node go to stream_output. The CPU time it takes, and its peak memory when
+    memory tracing is on, are recorded in profile. When the node's callable is to be
+    profiled, the id of its call profile is recorded there as well.
 
-        return (False, None, combined_output)
+    Returns a tuple of (success, result, error_message)
+    """
+    from python_node_editor.server import CALLABLES
 
+    callable = CALLABLES[node.callable_id]
+    args, kwargs = isolate_inputs(
+        callable, *build_call_arguments(callable, node.arguments)
+    )
+    fingerprints = input_fingerprints(callable, args, kwargs)
 
-def topological_order(graph: Graph) -> list[NodeFromFrontend]:
+    memory_baseline = (
+        profiling.start_memory_trace()
+        if profile is not None and profiling.TRACE_MEMORY
+        else None
+    )
+    call_profiler = (
+        profiling.CallProfiler(getattr(callable, "__name__", node.callable_id), __name__)
+        if profile is not None and profiling.should_profile(callable)
+        else None
+    )
+    cpu_started_at = time.thread_time()
+    try:
+        with (
+            cancellation_scope(cancel_event),
+            cancellation_scope(timeout_event),
+            call_profiler or contextlib.nullcontext(),
+        ):
+            outcome = call_with_capture(
+                callable, args, kwargs, live_output, stream_output
+            )
+    finally:
+        if profile is not None:
+            profile.cpu_seconds = time.thread_time() - cpu_started_at
+        if memory_baseline is not None:
+            profile.peak_memory_bytes = profiling.stop_memory_trace(memory_baseline)
+        if call_profiler is not None:
+            profile.call_profile_id = call_profiler.call_profile_id
+
+    return check_input_mutation(outcome, fingerprints, args, kwargs)
+
+
+def execute_chain(
+    chain: list[NodeDataFromFrontend],
+    link_arguments: list[str],
+    cancel_event: threading.Event | None = None,
+    timeout_event: threading.Event | None = None,
+    live_outputs: list[LiveOutput | None] | None = None,
+    outcomes: list[tuple[bool, Any, str | None, float]] | None = None,
+    profiles: list[NodeProfile] | None = None,
+) -> list[tuple[bool, Any, str | None, float]]:
+    """Executes a fused chain of nodes one after the other in the calling thread. The result of
+    every node goes straight into the argument link_arguments[i] of the next one.
+
+    Stops at the first node that fails, or before the next node once the execution is
+    cancelled or out of time. The outcome of every node that ran, a tuple of (success, result,
+    terminal_output, seconds), is appended to outcomes as soon as it's done, and what
+    execute_node measures goes into the node's profile in profiles.
     """
-    Returns all nodes in topological order using DFS.
-    Ensures dependencies are executed before dependents.
+    from python_node_editor.schema import DataWrapper
+
+    outcomes = [] if outcomes is None else outcomes
+    for i, node in enumerate(chain):
+        if any(event is not None and event.is_set() for event in (cancel_event, timeout_event)):
+            break
+
+        if i > 0:
+            # A copy of the node with the previous result as its argument, so the
+            # intermediate value never ends up in the graph
+            argument_name = link_arguments[i - 1]
+            argument = DataWrapper.model_construct(
+                type=node.arguments[argument_name].type, value=outcomes[-1][1]
+            )
+            node = node.model_copy(
+                update={"arguments": {**node.arguments, argument_name: argument}}
+            )
+
+        started_at = time.perf_counter()
+        success, result, terminal_output = execute_node(
+            node,
+            cancel_event,
+            timeout_event,
+            live_outputs[i] if live_outputs is not None else None,
+            profile=profiles[i] if profiles is not None else None,
+        )
+        outcomes.append((success, result, terminal_output, time.perf_counter() - started_at))
+        if not success:
+            break
+
+    return outcomes
+
+
+async def execute_chain_async(
+    chain: list[NodeDataFromFrontend],
+    link_arguments: list[str],
+    cancel_event: threading.Event | None = None,
+    timeout: float | None = None,
+    live_outputs: list[LiveOutput | None] | None = None,
+    outcomes: list[tuple[bool, Any, str | None, float]] | None = None,
+    profiles: list[NodeProfile] | None = None,
+) -> list[tuple[bool, Any, str | None, float]]:
+    """Executes a fused chain of nodes with a single hop to the default thread pool, see
+    execute_chain. If the chain runs longer than timeout seconds, the node that was running
+    is reported as timed out and the chain stops after it."""
+    outcomes = [] if outcomes is None else outcomes
+    timeout_event = threading.Event()
+    call = asyncio.to_thread(
+        execute_chain,
+        chain,
+        link_arguments,
+        cancel_event,
+        timeout_event,
+        live_outputs,
+        outcomes,
+        profiles,
+    )
+    if timeout is None:
+        return await call
+
+    try:
+        return await asyncio.wait_for(call, timeout)
+    except TimeoutError:
+        timeout_event.set()
+        # The running node may still finish in its thread, what it returns isn't used
+        finished = list(outcomes)
+        elapsed = sum(seconds for *_, seconds in finished)
+        return [*finished, (*timed_out(timeout), max(timeout - elapsed, 0))]
+
+
+async def execute_node_async(
+    node: NodeDataFromFrontend,
+    cancel_event: threading.Event | None = None,
+    timeout: float | None = None,
+    live_output: LiveOutput | None = None,
+    stream_output: StreamOutput | None = None,
+    profile: NodeProfile | None = None,
+) -> tuple[bool, Any, str | None]:
+    """Executes a node off the event loop: on a pne-worker if one that has the node's callable
+    is registered, in the process pool if one was started, otherwise in the default thread pool
+
+    A node that runs longer than timeout seconds is reported as timed out. Its worker
+    process gets killed, but a thread can't be, so the node is only told to stop through
+    is_cancelled() and the execution stops waiting for it.
+
+    Output the node prints is streamed into live_output while it runs. A node that runs
+    in a thread gets its CPU time and peak memory recorded in profile.
+
+    Async def nodes are awaited directly on the event loop, so a timeout or cancellation
+    actually stops them. Nodes that stream items to or from other nodes stay in this
+    process, since their streams can't be sent to a worker.
     """
-    result: list[NodeFromFrontend] = []
-    visited: set[str] = set()
+    from python_node_editor.execution import distributed, process_pool
 
-    node_map: dict[str, NodeFromFrontend] = {node.id: node for node in graph.nodes}
+    if node_is_async(node):
+        return await execute_async_callable(
+            node, cancel_event, timeout, live_output, stream_output
+        )
 
-    def visit(node_id: str):
-        if node_id in visited:
-            return
-        visited.add(node_id)
+    streaming = (
+        stream_output is not None and stream_output.streams
+    ) or has_stream_arguments(node)
+    if not streaming and distributed.REGISTRY.has_worker_for(node.callable_id):
+        outcome = await distributed.REGISTRY.execute(
+            node, cancel_event, timeout, live_output
+        )
+        # None when every worker that could run the node is gone
+        if outcome is not None:
+            return outcome
 
-        for edge in graph.edges:
-            if edge.target == node_id:
-                visit(edge.source)
+    if process_pool.PROCESS_POOL is not None and not streaming:
+        return await process_pool.PROCESS_POOL.execute(
+            node, cancel_event, timeout, live_output
+        )
 
-        result.append(node_map[node_id])
+    if timeout is None:
+        return await asyncio.to_thread(
+            execute_node,
+            node,
+            cancel_event,
+            None,
+            live_output,
+            stream_output,
+            profile,
+        )
+
+    timeout_event = threading.Event()
+    try:
+        return await asyncio.wait_for(
+            asyncio.to_thread(
+                execute_node,
+                node,
+                cancel_event,
+                timeout_event,
+                live_output,
+                stream_output,
+                profile,
+            ),
+            timeout,
+        )
+    except TimeoutError:
+        timeout_event.set()
+        return timed_out(timeout)
+
+
+async def execute_async_callable(
+    node: NodeDataFromFrontend,
+    cancel_event: threading.Event | None = None,
+    timeout: float | None = None,
+    live_output: LiveOutput | None = None,
+    stream_output: StreamOutput | None = None,
+) -> tuple[bool, Any, str | None]:
+    """Awaits an async def node's callable without a thread hop, like execute_node does for sync ones"""
+    from python_node_editor.server import CALLABLES
 
-    sorted_nodes = sorted(
-        graph.nodes, key=lambda node: node.position["x"] if node.position else 0
+    callable = CALLABLES[node.callable_id]
+    args, kwargs = isolate_inputs(
+        callable, *build_call_arguments(callable, node.arguments)
     )
+    fingerprints = input_fingerprints(callable, args, kwargs)
+
+    with cancellation_scope(cancel_event):
+        call = call_with_capture_async(
+            callable, args, kwargs, live_output, stream_output
+        )
+        if timeout is None:
+            outcome = await call
+        else:
+            try:
+                outcome = await asyncio.wait_for(call, timeout)
+            except TimeoutError:
+                return timed_out(timeout)
 
-    for node in sorted_nodes:
-        visit(node.id)
+    return check_input_mutation(outcome, fingerprints, args, kwargs)
 
-    return result
 
+def topological_order(graph: Graph) -> list[NodeFromFrontend]:
+    """
+    Returns all nodes in topological order.
+    Ensures dependencies are executed before dependents.
+    """
+    return GraphIndex(graph).topological_order()
+
+
+def propagate_outputs(
+    index: GraphIndex,
+    node_update: NodeUpdate,
+    skip_edges: set[IndexedEdge] | None = None,
+) -> list[NodeUpdate]:
+    """Copies a node's outputs into the arguments of its downstream nodes so they have
+    the correct inputs when they execute. Returns an update for each edge so the UI shows
+    the downstream nodes' new input values.
+
+    Downstream nodes share the output wrapper and its value instead of getting copies, so an
+    output fanning out to many nodes is only held in memory once. Callables that change their
+    inputs get their own copies when they run, see isolate_inputs. Outputs reused from the
+    result cache or a session are copies, so the sharing doesn't reach past one execution.
+
+    Edges in skip_edges (the ones items were streamed over) are left alone."""
+    downstream_updates = []
+
+    for edge in index.outgoing[node_update.node_id]:
+        if skip_edges and edge in skip_edges:
+            continue
+
+        output = node_update.outputs[edge.output_name]
+
+        # Update the execution graph so downstream nodes have correct inputs
+        target_node = index.nodes[edge.target]
+        target_node.data.arguments[edge.argument_name] = output
+
+        # Create a visual update for the downstream node
+        downstream_updates.append(
+            NodeUpdate(
+                node_id=edge.target,
+                arguments={edge.argument_name: output},
+            )
+        )
 
-def create_node_update(node, success, result, terminal_output, graph, execution_list):
-    """Create a node update object from execution results"""
-    from python_node_editor.schema import DataWrapper, MultipleOutputs, NodeUpdate
+    return downstream_updates
+
+
+def skip_downstream(
+    index: GraphIndex, failed_node_id: str, exclude: set[str] | None = None
+) -> list[NodeUpdate]:
+    """Returns a "skipped" update for every node downstream of a failed node, leaving
+    out the ones in exclude (like nodes that are already running)"""
+    closure = index.downstream_closure({failed_node_id})
+    closure.discard(failed_node_id)
+    return [
+        NodeUpdate(
+            node_id=node_id,
+            status="skipped",
+            terminal_output=f"Skipped because upstream node {failed_node_id} failed\n",
+        )
+        for node_id in sorted(closure)
+        if not exclude or node_id not in exclude
+    ]
+
+
+def attach_profile(
+    node_update: NodeUpdate,
+    callable_id: str,
+    profile: NodeProfile,
+    terminal_output: str | None,
+) -> NodeUpdate:
+    """Completes a node's profile, puts it on its update and adds it to its callable's stats"""
+    profile.output_bytes = len(terminal_output.encode()) if terminal_output else 0
+    node_update.profile = profile
+    profiling.record_profile(callable_id, profile)
+    return node_update
+
+
+def create_node_update(
+    node,
+    success,
+    result,
+    terminal_output,
+    graph,
+    execution_list,
+    output_hints=None,
+    profile=None,
+):
+    """Create a node update object from execution results
+
+    output_hints are the output types and wrapper classes from the graph's execution plan,
+    outputs without a hint have their type inferred from the value.
+
+    With a profile, the time it takes to build the outputs is added to it and
+    the profile is attached to the update.
+    """
+    started_at = time.perf_counter()
+    node_update = build_node_update(
+        node, success, result, terminal_output, output_hints
+    )
+    if profile is None:
+        return node_update
+
+    profile.serialization_seconds = time.perf_counter() - started_at
+    return attach_profile(node_update, node.data.callable_id, profile, terminal_output)
+
+
+def build_node_update(node, success, result, terminal_output, output_hints=None):
+    """The update of an executed node with its result wrapped into its outputs"""
+    from python_node_editor.execution.plans import output_class_for
+    from python_node_editor.schema import MultipleOutputs, NodeUpdate
     from python_node_editor.server import TYPES
 
     outputs = {}
@@ -173,22 +683,18 @@ def create_node_update(node, success, result, terminal_output, graph, execution_
 
     # Generate the output data structures
     for output_name in node.data.outputs.keys():
-        data = node.data.outputs[output_name]
         new_value = result_dict[output_name]
 
-        concrete_type = infer_concrete_type(new_value, data.type, TYPES)
-
-        # If the type has a custom referenced data model, find and create an instance of it
-        # Otheriwse use the generic DataWrapper
-        if (
-            isinstance(concrete_type, str)
-            and concrete_type in TYPES
-            and hasattr(TYPES[concrete_type], "_referenced_datamodel")
-            and TYPES[concrete_type]._referenced_datamodel is not None
-        ):
-            output_class = TYPES[concrete_type]._referenced_datamodel
+        hint = output_hints.get(output_name) if output_hints else None
+        if hint is not None:
+            concrete_type, output_class = hint
         else:
-            output_class = DataWrapper
+            data = node.data.outputs[output_name]
+            concrete_type = infer_concrete_type(new_value, data.type, TYPES)
+
+            # If the type has a custom referenced data model, find and create an instance of it
+            # Otheriwse use the generic DataWrapper
+            output_class = output_class_for(concrete_type, TYPES)
 
         output_data_model = output_class(
             type=concrete_type,
@@ -0,0 +1,58 @@
+from typing import NamedTuple
+
+from python_node_editor.schema import Graph, NodeFromFrontend
+
+
+CYCLE_ERROR = "Graph contains a cycle and can't be executed"
+
+
+class IndexedEdge(NamedTuple):
+    """An edge with its handles already parsed into output and argument names"""
+
+    source: str
+    output_name: str
+    target: str
+    argument_name: str
+
+
+class GraphIndex:
+    """Lookups over a graph for a single execution
+
+    The structure (edges by node and the topological order) comes from the graph's
+    compiled ExecutionPlan, which is cached by structure hash, so for a graph that was
+    planned before only the lookup of the submitted nodes by id is built here.
+    """
+
+    def __init__(self, graph: Graph):
+        from python_node_editor.execution.plans import get_plan
+
+        self.graph = graph
+        self.nodes: dict[str, NodeFromFrontend] = {node.id: node for node in graph.nodes}
+        self.plan = get_plan(graph)
+        self.outgoing = self.plan.outgoing
+        self.incoming = self.plan.incoming
+
+    def is_acyclic(self) -> bool:
+        """Whether the graph can be executed, endpoints check this before scheduling it"""
+        return self.plan.order is not None
+
+    def topological_order(self) -> list[NodeFromFrontend]:
+        """
+        Returns all nodes in topological order using Kahn's algorithm.
+        Among the nodes that are ready at the same time, the leftmost one on the canvas goes first.
+        """
+        if not self.is_acyclic():
+            raise ValueError(CYCLE_ERROR)
+
+        return [self.nodes[node_id] for node_id in self.plan.order]
+
+    def downstream_closure(self, node_ids: set[str]) -> set[str]:
+        """Returns the given nodes and every node downstream of them"""
+        closure = set(node_ids)
+        stack = list(node_ids)
+        while stack:
+            for edge in self.outgoing[stack.pop()]:
+                if edge.target not in closure:
+                    closure.add(edge.target)
+                    stack.append(edge.target)
+        return closure
@@ -0,0 +1,317 @@
+"""
+Compiled execution plans, cached by the structure of the graph.
+
+A plan holds everything about executing a graph that doesn't depend on its argument values:
+the order of the nodes, how their inputs are wired to upstream outputs, their callables and
+how those have to be run, and the types their outputs get wrapped in. The frontend resubmits
+the same graph after every edit, usually with only argument values changed, so plans are
+cached by a hash of the graph's structure and those resubmits skip planning entirely.
+"""
+
+import hashlib
+import heapq
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple
+
+from python_node_editor.execution.graph_index import IndexedEdge
+from python_node_editor.schema import Graph
+from python_node_editor.schema_base import StructDescr, UnionDescr
+
+# Least recently used plans are evicted once more than this many are cached
+MAX_PLANS = 256
+
+
+class OutputHint(NamedTuple):
+    """The type of an output and the wrapper class its values go in, known ahead of execution"""
+
+    type: str | StructDescr
+    output_class: type
+
+
+class ExecutionPlan(NamedTuple):
+    """The value independent part of executing a graph, shared by every graph with the same
+    structure. Nodes are referred to by id, so a plan never holds on to a submitted graph."""
+
+    structure_hash: str
+    # Node ids in topological order, None if the graph contains a cycle
+    order: tuple[str, ...] | None
+    # The input slot wiring: edges leaving and entering every node
+    outgoing: dict[str, tuple[IndexedEdge, ...]]
+    incoming: dict[str, tuple[IndexedEdge, ...]]
+    # The callables the nodes were planned with, by callable_id
+    callables: dict[str, Callable | None]
+    async_nodes: frozenset[str]
+    generator_nodes: frozenset[str]
+    # Edges a generator node can stream its items over, into an Iterator argument
+    stream_edges: frozenset[IndexedEdge]
+    # Outputs whose type doesn't have to be inferred from the value, by node id and output name
+    output_hints: dict[str, dict[str, OutputHint]]
+    # Linear chains of nodes that can run as one fused unit, by the id of their first node
+    chains: dict[str, tuple[str, ...]]
+
+
+PLANS: OrderedDict[str, ExecutionPlan] = OrderedDict()
+
+
+def _type_key(type_descriptor: Any) -> str:
+    return type_descriptor if isinstance(type_descriptor, str) else repr(type_descriptor)
+
+
+def structure_hash(graph: Graph) -> str:
+    """Hashes everything a plan depends on: the nodes with their callables, argument and
+    output types and canvas x positions (which break ties in the order), and the edges"""
+    hasher = hashlib.sha256()
+    for node in graph.nodes:
+        data = node.data
+        x = node.position["x"] if node.position else 0
+        hasher.update(
+            f"node:{node.id};{data.callable_id};{data.output_style};{x!r};".encode()
+        )
+        for name, argument in data.arguments.items():
+            hasher.update(f"in:{name}:{_type_key(argument.type)};".encode())
+        for name, output in data.outputs.items():
+            hasher.update(f"out:{name}:{_type_key(output.type)};".encode())
+
+    for edge in graph.edges:
+        hasher.update(
+            f"edge:{edge.source}:{edge.source_handle}->{edge.target}:{edge.target_handle};".encode()
+        )
+
+    return hasher.hexdigest()
+
+
+def _topological_order(
+    graph: Graph, outgoing: dict[str, list[IndexedEdge]], incoming: dict[str, list[IndexedEdge]]
+) -> tuple[str, ...] | None:
+    """Orders the nodes with Kahn's algorithm. Among the nodes that are ready at the same time,
+    the leftmost one on the canvas goes first. Returns None if the graph contains a cycle."""
+    remaining_inputs = {node_id: len(edges) for node_id, edges in incoming.items()}
+
+    # The node's index in the graph breaks ties between nodes at the same x position
+    ready: list[tuple[float, int, str]] = []
+    position_keys: dict[str, tuple[float, int]] = {}
+    for i, node in enumerate(graph.nodes):
+        position_keys[node.id] = (node.position["x"] if node.position else 0, i)
+        if remaining_inputs[node.id] == 0:
+            ready.append((*position_keys[node.id], node.id))
+    heapq.heapify(ready)
+
+    order: list[str] = []
+    while ready:
+        _, _, node_id = heapq.heappop(ready)
+        order.append(node_id)
+
+        for edge in outgoing[node_id]:
+            remaining_inputs[edge.target] -= 1
+            if remaining_inputs[edge.target] == 0:
+                heapq.heappush(ready, (*position_keys[edge.target], edge.target))
+
+    if len(order) != len(graph.nodes):
+        return None
+    return tuple(order)
+
+
+def _linear_chains(
+    graph: Graph,
+    order: tuple[str, ...] | None,
+    outgoing: dict[str, list[IndexedEdge]],
+    incoming: dict[str, list[IndexedEdge]],
+    fusable: set[str],
+) -> dict[str, tuple[str, ...]]:
+    """Finds the longest runs of nodes where each one's single output only goes into the next
+    one, which has no other inputs wired. Those nodes always run back to back, so they can
+    run as a single unit without delaying anything else."""
+    if order is None:
+        return {}
+
+    nodes = {node.id: node for node in graph.nodes}
+
+    def next_in_chain(node_id: str) -> str | None:
+        edges = outgoing[node_id]
+        if (
+            node_id not in fusable
+            or nodes[node_id].data.output_style != "single"
+            or len(edges) != 1
+        ):
+            return None
+        target = edges[0].target
+        if target not in fusable or len(incoming[target]) != 1:
+            return None
+        return target
+
+    links = {node_id: next_in_chain(node_id) for node_id in order}
+    linked_to = {target for target in links.values() if target is not None}
+
+    chains = {}
+    for node_id in order:
+        if node_id in linked_to or links[node_id] is None:
+            continue
+        chain = [node_id]
+        while (target := links[chain[-1]]) is not None:
+            chain.append(target)
+        chains[node_id] = tuple(chain)
+    return chains
+
+
+def _stream_edges(
+    candidates: set[IndexedEdge],
+    outgoing: dict[str, list[IndexedEdge]],
+    incoming: dict[str, list[IndexedEdge]],
+) -> frozenset[IndexedEdge]:
+    """The edges into Iterator arguments that a generator node can stream its items over.
+
+    A consumer also waiting for a node that only finishes once the generator made progress
+    would never start reading, and the generator would block once the stream is full.
+    Such edges pass the items as a list instead. A generator holds up the nodes downstream
+    of it and of the nodes streaming into it, since those block on it in turn."""
+    streamed_from = {node_id: [] for node_id in incoming}
+    for edge in candidates:
+        streamed_from[edge.target].append(edge.source)
+
+    held_up: dict[str, set[str]] = {}
+
+    def held_up_by(node_id: str) -> set[str]:
+        if node_id not in held_up:
+            sources = set()
+            stack = [node_id]
+            while stack:
+                source = stack.pop()
+                if source not in sources:
+                    sources.add(source)
+                    stack.extend(streamed_from[source])
+            closure = set()
+            stack = list(sources)
+            while stack:
+                downstream = stack.pop()
+                if downstream not in closure:
+                    closure.add(downstream)
+                    stack.extend(edge.target for edge in outgoing[downstream])
+            held_up[node_id] = closure
+        return held_up[node_id]
+
+    return frozenset(
+        edge
+        for edge in candidates
+        if not any(
+            other != edge and other.source in held_up_by(edge.source)
+            for other in incoming[edge.target]
+        )
+    )
+
+
+def output_class_for(concrete_type: Any, TYPES: dict) -> type:
+    """The class an output of the given type is wrapped in: the type's custom referenced
+    data model if it has one, otherwise the generic DataWrapper"""
+    from python_node_editor.schema import DataWrapper
+
+    if (
+        isinstance(concrete_type, str)
+        and concrete_type in TYPES
+        and hasattr(TYPES[concrete_type], "_referenced_datamodel")
+        and TYPES[concrete_type]._referenced_datamodel is not None
+    ):
+        return TYPES[concrete_type]._referenced_datamodel
+    return DataWrapper
+
+
+def compile_plan(graph: Graph, plan_hash: str) -> ExecutionPlan:
+    from python_node_editor.execution.exec_utils import consumes_stream, is_async_callable
+    from python_node_editor.execution.streams import is_generator_callable
+    from python_node_editor.server import CALLABLES, TYPES
+
+    # Handles look like "node1:outputs:return:handle", so the output or argument
+    # name is always the second to last segment
+    outgoing: dict[str, list[IndexedEdge]] = {node.id: [] for node in graph.nodes}
+    incoming: dict[str, list[IndexedEdge]] = {node.id: [] for node in graph.nodes}
+    for edge in graph.edges:
+        indexed_edge = IndexedEdge(
+            source=edge.source,
+            output_name=edge.source_handle.split(":")[-2],
+            target=edge.target,
+            argument_name=edge.target_handle.split(":")[-2],
+        )
+        outgoing[edge.source].append(indexed_edge)
+        incoming[edge.target].append(indexed_edge)
+
+    callables: dict[str, Callable | None] = {}
+    async_nodes = set()
+    generator_nodes = set()
+    output_hints: dict[str, dict[str, OutputHint]] = {}
+    for node in graph.nodes:
+        callable_id = node.data.callable_id
+        if callable_id not in callables:
+            callables[callable_id] = CALLABLES.get(callable_id)
+        callable = callables[callable_id]
+
+        if callable is not None and is_async_callable(callable):
+            async_nodes.add(node.id)
+        if callable is not None and is_generator_callable(callable):
+            generator_nodes.add(node.id)
+
+        # The concrete type of a union output depends on the value, it's inferred after execution
+        output_hints[node.id] = {
+            output_name: OutputHint(output.type, output_class_for(output.type, TYPES))
+            for output_name, output in node.data.outputs.items()
+            if not isinstance(output.type, UnionDescr)
+        }
+
+    nodes = {node.id: node for node in graph.nodes}
+    stream_edges = _stream_edges(
+        {
+            edge
+            for node_id in generator_nodes
+            for edge in outgoing[node_id]
+            if consumes_stream(nodes[edge.target].data, edge.argument_name)
+        },
+        outgoing,
+        incoming,
+    )
+
+    # Sync nodes that don't stream, so they can run one after the other in the same thread
+    fusable = {
+        node.id
+        for node in graph.nodes
+        if callables[node.data.callable_id] is not None
+        and node.id not in async_nodes
+        and node.id not in generator_nodes
+        and not any(edge in stream_edges for edge in incoming[node.id])
+    }
+    order = _topological_order(graph, outgoing, incoming)
+
+    return ExecutionPlan(
+        structure_hash=plan_hash,
+        order=order,
+        outgoing={node_id: tuple(edges) for node_id, edges in outgoing.items()},
+        incoming={node_id: tuple(edges) for node_id, edges in incoming.items()},
+        callables=callables,
+        async_nodes=frozenset(async_nodes),
+        generator_nodes=frozenset(generator_nodes),
+        stream_edges=stream_edges,
+        output_hints=output_hints,
+        chains=_linear_chains(graph, order, outgoing, incoming, fusable),
+    )
+
+
+def get_plan(graph: Graph) -> ExecutionPlan:
+    """Returns the cached plan for the graph's structure, compiling it on first use or when
+    one of the callables it was planned with has been replaced since"""
+    from python_node_editor.server import CALLABLES
+
+    plan_hash = structure_hash(graph)
+    plan = PLANS.get(plan_hash)
+    if plan is not None and all(
+        CALLABLES.get(callable_id) is callable
+        for callable_id, callable in plan.callables.items()
+    ):
+        PLANS.move_to_end(plan_hash)
+        return plan
+
+    plan = compile_plan(graph, plan_hash)
+    PLANS[plan_hash] = plan
+    while len(PLANS) > MAX_PLANS:
+        PLANS.popitem(last=False)
+    return plan
+
+
+def clear_plans() -> None:
+    PLANS.clear()
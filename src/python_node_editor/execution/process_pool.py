@@ -0,0 +1,270 @@
+"""
+Opt-in execution backend that runs node callables in a pool of worker processes.
+
+Thread pool execution can't use more than about one core for pure python nodes because of
+the GIL. With this backend every worker process analyzes the same search paths once when it
+starts, so for each node only the callable_id and the raw argument values cross the process
+boundary, and only the result and the captured terminal output come back.
+
+While a node runs, its worker also sends ("output", text) messages with what it printed so
+far, the call always ends with a single ("result", outcome) message.
+"""
+
+import asyncio
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from python_node_editor.execution.capture import LiveOutput
+from python_node_editor.execution.exec_utils import build_call_arguments, timed_out
+from python_node_editor.schema import NodeDataFromFrontend
+
+PROCESS_POOL: "ProcessWorkerPool | None" = None
+
+# Seconds a node gets to stop on its own after its execution is cancelled before its worker is killed
+CANCEL_GRACE_PERIOD = 2.0
+# Interval in seconds at which a dispatch thread checks for cancellation while its node runs
+POLL_INTERVAL = 0.05
+
+
+def _worker_main(
+    conn, cancel_event, search_paths: list[str], ignore_underscore_prefix: bool
+):
+    """Entry point of a worker process: load the callables once, then serve calls until the pipe closes"""
+    import python_node_editor.server as server_module
+    from python_node_editor.analysis.utils import analyze_file_structure
+    from python_node_editor.execution.cancellation import cancellation_scope
+    from python_node_editor.execution.exec_utils import call_with_capture
+
+    _, callables, types = analyze_file_structure(
+        search_paths, ignore_underscore_prefix=ignore_underscore_prefix
+    )
+    server_module.CALLABLES.update(callables)
+    server_module.TYPES.update(types)
+
+    # The lock keeps output messages from being sent after the result of their call
+    send_lock = threading.Lock()
+    live_output = LiveOutput()
+
+    def forward_output():
+        while True:
+            time.sleep(POLL_INTERVAL)
+            with send_lock:
+                if live_output.pending:
+                    message = ("output", live_output.drain())
+                    conn.send_bytes(pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL))
+
+    threading.Thread(target=forward_output, daemon=True).start()
+
+    while True:
+        try:
+            message = conn.recv_bytes()
+        except EOFError:
+            break
+
+        callable_id, args, kwargs = pickle.loads(message)
+
+        if callable_id in server_module.CALLABLES:
+            # The parent sets the shared cancel event when the node's execution is cancelled
+            with cancellation_scope(cancel_event):
+                outcome = call_with_capture(
+                    server_module.CALLABLES[callable_id], args, kwargs, live_output
+                )
+        else:
+            outcome = (False, None, f"Callable {callable_id} not found in worker\n")
+
+        try:
+            payload = pickle.dumps(("result", outcome), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # The result can't be sent back, report it as an error on the node instead
+            terminal_output = outcome[2] or ""
+            payload = pickle.dumps(
+                ("result", (False, None, terminal_output + traceback.format_exc())),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+        with send_lock:
+            # The result carries the full output, anything not yet forwarded is dropped
+            live_output.drain()
+            conn.send_bytes(payload)
+
+
+class _Worker:
+    """A single worker process and the parent's end of the pipe connected to it"""
+
+    def __init__(self, context, search_paths: list[str], ignore_underscore_prefix: bool):
+        self.conn, child_conn = context.Pipe()
+        self.cancel_event = context.Event()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.cancel_event, search_paths, ignore_underscore_prefix),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+
+
+class ProcessWorkerPool:
+    """A fixed number of worker processes that execute nodes by callable_id"""
+
+    def __init__(
+        self,
+        num_workers: int,
+        search_paths: list[str],
+        ignore_underscore_prefix: bool = True,
+    ):
+        # Spawn (rather than fork) so workers don't inherit the server's threads and event loop
+        self._context = multiprocessing.get_context("spawn")
+        self._search_paths = search_paths
+        self._ignore_underscore_prefix = ignore_underscore_prefix
+
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._workers: list[_Worker] = []
+        for _ in range(num_workers):
+            worker = self._spawn_worker()
+            self._idle.put(worker)
+
+        # One dispatch thread per worker, each blocks on the pipe of the worker it checked out
+        self._dispatcher = ThreadPoolExecutor(
+            max_workers=num_workers, thread_name_prefix="pne-process-dispatch"
+        )
+
+    def _spawn_worker(self) -> _Worker:
+        worker = _Worker(
+            self._context, self._search_paths, self._ignore_underscore_prefix
+        )
+        self._workers.append(worker)
+        return worker
+
+    def _replace_worker(self, worker: _Worker) -> _Worker:
+        # The replacement is spawned before the old worker is killed and removed,
+        # so the pool never runs out of live workers
+        replacement = self._spawn_worker()
+        worker.kill()
+        self._workers.remove(worker)
+        return replacement
+
+    def _dispatch(
+        self,
+        callable_id: str,
+        args: list[Any],
+        kwargs: dict[str, Any],
+        cancel_event: threading.Event | None,
+        timeout: float | None,
+        live_output: LiveOutput | None,
+    ) -> tuple[bool, Any, str | None]:
+        try:
+            payload = pickle.dumps(
+                (callable_id, args, kwargs), protocol=pickle.HIGHEST_PROTOCOL
+            )
+        except Exception:
+            return (False, None, traceback.format_exc())
+
+        worker = self._idle.get()
+        try:
+            worker.cancel_event.clear()
+            worker.conn.send_bytes(payload)
+            started_at = time.monotonic()
+
+            cancelled_at = None
+            while True:
+                if worker.conn.poll(POLL_INTERVAL):
+                    kind, value = pickle.loads(worker.conn.recv_bytes())
+                    if kind == "result":
+                        return value
+                    if live_output is not None:
+                        live_output.write(value)
+
+                if timeout is not None and time.monotonic() - started_at > timeout:
+                    # Out of time, the worker is killed right away to free its slot
+                    worker = self._replace_worker(worker)
+                    return timed_out(timeout)
+
+                if cancel_event is None or not cancel_event.is_set():
+                    continue
+
+                if cancelled_at is None:
+                    # Give the node a chance to stop cooperatively first
+                    worker.cancel_event.set()
+                    cancelled_at = time.monotonic()
+                elif time.monotonic() - cancelled_at > CANCEL_GRACE_PERIOD:
+                    worker = self._replace_worker(worker)
+                    return (
+                        False,
+                        None,
+                        "Worker process killed after the execution was cancelled\n",
+                    )
+        except (EOFError, OSError):
+            worker = self._replace_worker(worker)
+            return (False, None, "Worker process exited unexpectedly\n")
+        finally:
+            self._idle.put(worker)
+
+    async def execute(
+        self,
+        node: NodeDataFromFrontend,
+        cancel_event: threading.Event | None = None,
+        timeout: float | None = None,
+        live_output: LiveOutput | None = None,
+    ) -> tuple[bool, Any, str | None]:
+        """Execute a node in the next idle worker process, streaming its output into
+        live_output while it runs
+
+        If the cancel_event gets set while the node runs, the worker is asked to stop
+        and killed if it's still busy after CANCEL_GRACE_PERIOD seconds. A node that runs
+        longer than timeout seconds gets its worker killed immediately.
+
+        Returns a tuple of (success, result, terminal_output) like execute_node
+        """
+        from python_node_editor.server import CALLABLES
+
+        args, kwargs = build_call_arguments(CALLABLES[node.callable_id], node.arguments)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._dispatcher,
+            self._dispatch,
+            node.callable_id,
+            args,
+            kwargs,
+            cancel_event,
+            timeout,
+            live_output,
+        )
+
+    def shutdown(self):
+        self._dispatcher.shutdown(wait=False, cancel_futures=True)
+        for worker in self._workers:
+            worker.kill()
+        self._workers.clear()
+
+
+def start_process_pool(
+    num_workers: int, search_paths: list[str], ignore_underscore_prefix: bool = True
+) -> ProcessWorkerPool:
+    """Start the process pool that execute_node_async dispatches nodes to"""
+    global PROCESS_POOL
+    stop_process_pool()
+    PROCESS_POOL = ProcessWorkerPool(
+        num_workers, search_paths, ignore_underscore_prefix
+    )
+    return PROCESS_POOL
+
+
+def stop_process_pool():
+    """Shut down the process pool, nodes go back to running in the thread pool"""
+    global PROCESS_POOL
+    if PROCESS_POOL is not None:
+        PROCESS_POOL.shutdown()
+        PROCESS_POOL = None
@@ -0,0 +1,291 @@
+"""
+Performance profiles of executed nodes.
+
+Every node that runs gets a NodeProfile on its final update: its wall and CPU time, the bytes it
+printed, how long its result took to wrap into outputs and, when TRACE_MEMORY is on, the peak
+of its Python memory allocations. The profiles of the last ROLLING_WINDOW runs of every
+callable are kept, so slow callables and regressions show up without adding prints.
+
+To see where a node spends its time, its callable can additionally run under a CallProfiler,
+for every node of an execution or for callables marked with add_node_options(profile=True).
+It samples the stacks of the node's thread every SAMPLE_INTERVAL seconds, and the samples are
+kept as a pstats file and flamegraph stacks that can be downloaded through the node's profile.
+cProfile isn't used for this: since Python 3.12 it records every thread of the server at once
+and only one can be active, so it can't tell nodes running at the same time apart.
+"""
+
+import io
+import marshal
+import os
+import pstats
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict, deque
+from contextvars import ContextVar
+from typing import Callable, NamedTuple
+
+import shortuuid
+
+from python_node_editor.schema import NodeProfile
+
+# Trace Python memory allocations to report each node's peak. Tracing slows down every
+# allocation, and the peak is process-wide, so nodes running at the same time share it
+TRACE_MEMORY = False
+
+# Number of recent runs kept per callable for the rolling statistics
+ROLLING_WINDOW = 100
+
+CALLABLE_PROFILES: dict[str, deque[NodeProfile]] = {}
+
+# Seconds between two samples of a profiled node's stack
+SAMPLE_INTERVAL = 0.005
+# Number of call profiles kept for download, the oldest ones are dropped first
+MAX_CALL_PROFILES = 64
+# Number of functions in the text summary of a call profile
+TEXT_SUMMARY_LINES = 40
+
+# Whether the execution the current node belongs to profiles all of its nodes' callables
+PROFILE_NODES: ContextVar[bool] = ContextVar("pne_profile_nodes", default=False)
+
+_trace_lock = threading.Lock()
+_traced_nodes = 0
+
+
+def start_memory_trace() -> int:
+    """Starts tracing a node's allocations, returns the memory in use at its start"""
+    global _traced_nodes
+    with _trace_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        # The peak can only be reset while no other node is measuring it
+        if _traced_nodes == 0:
+            tracemalloc.reset_peak()
+        _traced_nodes += 1
+        return tracemalloc.get_traced_memory()[0]
+
+
+def stop_memory_trace(baseline: int) -> int:
+    """Stops tracing a node's allocations, returns its peak above the baseline"""
+    global _traced_nodes
+    with _trace_lock:
+        _traced_nodes -= 1
+        return max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+
+
+def record_profile(callable_id: str, profile: NodeProfile) -> None:
+    profiles = CALLABLE_PROFILES.get(callable_id)
+    if profiles is None:
+        profiles = CALLABLE_PROFILES[callable_id] = deque(maxlen=ROLLING_WINDOW)
+    profiles.append(profile)
+
+
+def _percentile(values: list[float], percentile: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percentile - 1]
+
+
+def callable_stats() -> dict[str, dict]:
+    """Statistics over the recent runs of every callable that was executed"""
+    from python_node_editor.server import CALLABLES
+
+    stats = {}
+    for callable_id, profiles in CALLABLE_PROFILES.items():
+        wall = [profile.wall_seconds for profile in profiles]
+        cpu = [profile.cpu_seconds for profile in profiles if profile.cpu_seconds is not None]
+        peaks = [
+            profile.peak_memory_bytes
+            for profile in profiles
+            if profile.peak_memory_bytes is not None
+        ]
+        stats[callable_id] = {
+            "name": getattr(CALLABLES.get(callable_id), "__name__", None),
+            "runs": len(profiles),
+            "meanWallSeconds": statistics.fmean(wall),
+            "p50WallSeconds": _percentile(wall, 50),
+            "p95WallSeconds": _percentile(wall, 95),
+            "meanCpuSeconds": statistics.fmean(cpu) if cpu else None,
+            "maxPeakMemoryBytes": max(peaks) if peaks else None,
+            "meanOutputBytes": statistics.fmean(
+                profile.output_bytes for profile in profiles
+            ),
+            "meanSerializationSeconds": statistics.fmean(
+                profile.serialization_seconds for profile in profiles
+            ),
+        }
+    return stats
+
+
+def execution_profile(node_updates: dict) -> dict:
+    """The profiles of an execution's nodes, slowest first, and their totals"""
+    profiled = [
+        (node_id, update.profile)
+        for node_id, update in node_updates.items()
+        if update.profile is not None
+    ]
+    profiled.sort(key=lambda item: item[1].wall_seconds, reverse=True)
+    peaks = [
+        profile.peak_memory_bytes
+        for _, profile in profiled
+        if profile.peak_memory_bytes is not None
+    ]
+    return {
+        "nodes": [
+            {"nodeId": node_id, **profile.model_dump(by_alias=True)}
+            for node_id, profile in profiled
+        ],
+        "totals": {
+            "wallSeconds": sum(profile.wall_seconds for _, profile in profiled),
+            "cpuSeconds": sum(profile.cpu_seconds or 0 for _, profile in profiled),
+            "peakMemoryBytes": max(peaks) if peaks else None,
+            "outputBytes": sum(profile.output_bytes for _, profile in profiled),
+            "serializationSeconds": sum(
+                profile.serialization_seconds for _, profile in profiled
+            ),
+        },
+    }
+
+
+class CallProfile(NamedTuple):
+    """What a CallProfiler recorded for a node"""
+
+    name: str
+    # The marshalled stats, as written by pstats.Stats.dump_stats
+    pstats: bytes
+    # The functions taking the most time, as printed by pstats
+    text: str
+    # Sampled stacks in the collapsed format flamegraph tools read, one "a;b;c count" per line
+    collapsed: str
+
+
+CALL_PROFILES: OrderedDict[str, CallProfile] = OrderedDict()
+_call_profiles_lock = threading.Lock()
+
+
+def should_profile(callable: Callable) -> bool:
+    return getattr(callable, "profile", False) or PROFILE_NODES.get()
+
+
+# (filename, first line, function name), how pstats identifies a function
+FunctionKey = tuple[str, int, str]
+
+
+class CallProfiler:
+    """Samples the stacks of the calling thread while it runs a node's callable. Stacks end at
+    the first frame of stop_module, so they start at the callable instead of the executor."""
+
+    def __init__(self, name: str, stop_module: str):
+        self.name = name
+        self.stop_module = stop_module
+        self.thread_id = threading.get_ident()
+        self.samples: Counter[tuple[FunctionKey, ...]] = Counter()
+        # The sampler can't always wake up on time (it needs the GIL), so every sample counts
+        # for the time since the previous one instead of SAMPLE_INTERVAL
+        self.sample_seconds: Counter[tuple[FunctionKey, ...]] = Counter()
+        self.stats: dict = {}
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self.call_profile_id: str | None = None
+
+    def __enter__(self) -> "CallProfiler":
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stopped.set()
+        self._sampler.join()
+        self.call_profile_id = store_call_profile(self.build())
+
+    def _sample(self) -> None:
+        sampled_at = time.perf_counter()
+        while not self._stopped.wait(SAMPLE_INTERVAL):
+            now = time.perf_counter()
+            elapsed, sampled_at = now - sampled_at, now
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame.f_globals.get("__name__") != self.stop_module:
+                if frame.f_globals.get("__name__") == __name__:
+                    # Caught the profiler stopping, not the callable
+                    stack = []
+                    break
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+                self.sample_seconds[tuple(reversed(stack))] += elapsed
+
+    def create_stats(self) -> None:
+        """Turns the samples into the stats pstats reads, with sample counts as call counts"""
+        # function -> [samples in it, seconds in it, seconds on top of the stack,
+        #              callers -> [samples, seconds]]
+        totals: dict[FunctionKey, list] = {}
+        for stack, count in self.samples.items():
+            seconds = self.sample_seconds[stack]
+            for i, function in enumerate(stack):
+                if function in stack[:i]:
+                    # Recursion, the sample already counts for this function
+                    continue
+                entry = totals.setdefault(function, [0, 0.0, 0.0, {}])
+                entry[0] += count
+                entry[1] += seconds
+                if i > 0:
+                    caller = entry[3].setdefault(stack[i - 1], [0, 0.0])
+                    caller[0] += count
+                    caller[1] += seconds
+            totals[stack[-1]][2] += seconds
+
+        self.stats = {
+            function: (
+                count,
+                count,
+                on_top,
+                inclusive,
+                {caller: (n, n, 0.0, t) for caller, (n, t) in callers.items()},
+            )
+            for function, (count, inclusive, on_top, callers) in totals.items()
+        }
+
+    def build(self) -> CallProfile:
+        self.create_stats()
+        # Before pstats takes the stats, it empties them on the profiler it loads them from
+        stats_data = marshal.dumps(self.stats)
+        stream = io.StringIO()
+        stream.write(
+            f"Sampled every {SAMPLE_INTERVAL * 1000:g} ms, "
+            "call counts are the number of samples a function was in\n"
+        )
+        if self.samples:
+            pstats.Stats(self, stream=stream).sort_stats("cumulative").print_stats(
+                TEXT_SUMMARY_LINES
+            )
+        else:
+            stream.write("The callable returned before the first sample\n")
+
+        collapsed = "".join(
+            ";".join(
+                f"{name} ({os.path.basename(filename)}:{line})"
+                for filename, line, name in stack
+            )
+            + f" {count}\n"
+            for stack, count in self.samples.most_common()
+        )
+        return CallProfile(self.name, stats_data, stream.getvalue(), collapsed)
+
+
+def store_call_profile(call_profile: CallProfile) -> str:
+    call_profile_id = shortuuid.uuid()
+    with _call_profiles_lock:
+        CALL_PROFILES[call_profile_id] = call_profile
+        while len(CALL_PROFILES) > MAX_CALL_PROFILES:
+            CALL_PROFILES.popitem(last=False)
+    return call_profile_id
+
+
+def clear_profiles() -> None:
+    CALLABLE_PROFILES.clear()
+    with _call_profiles_lock:
+        CALL_PROFILES.clear()
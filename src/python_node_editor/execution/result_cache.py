@@ -0,0 +1,208 @@
+"""
+Content-addressed memoization of node results.
+
+A node's result is cached under a key combining its callable_id (a hash of the function's
+source) with stable content hashes of its argument values. Resubmitting a graph where only
+a few arguments changed then only re-runs the nodes whose inputs actually differ.
+Functions with side effects can opt out with @add_node_options(pure=False).
+"""
+
+import copy
+import hashlib
+import pickle
+import sys
+from collections import OrderedDict
+from typing import Any
+
+from pydantic import BaseModel
+
+from python_node_editor.execution.streams import is_generator_callable
+from python_node_editor.large_data.base import CachedDataWrapper
+from python_node_editor.schema import NodeDataFromFrontend, NodeFromFrontend, NodeUpdate
+
+RESULT_CACHE_ENABLED = True
+# Least recently used entries are evicted once the cached results add up to more than this.
+# Sizes are estimates, see approximate_size
+RESULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+RESULT_CACHE: OrderedDict[str, NodeUpdate] = OrderedDict()
+# The approximate size of every cached result, and their total
+RESULT_CACHE_SIZES: dict[str, int] = {}
+_cached_bytes = 0
+
+
+class UnhashableValue(Exception):
+    pass
+
+
+def update_hash(hasher, value: Any) -> None:
+    """Feed a stable representation of a value into the hasher, tagging each value with its
+    type so that for example 1, 1.0 and "1" don't collide"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        hasher.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, bytes):
+        hasher.update(f"bytes:{len(value)}:".encode())
+        hasher.update(value)
+    elif isinstance(value, CachedDataWrapper):
+        # Cached values are immutable once stored, so their key identifies their content
+        if value.cache_key is None:
+            update_hash(hasher, value.value)
+        else:
+            hasher.update(f"cached:{value.cache_key};".encode())
+    elif isinstance(value, BaseModel):
+        # UserModels and DataWrappers hash by class and field values
+        hasher.update(f"model:{type(value).__module__}.{type(value).__qualname__}(".encode())
+        for field_name in type(value).model_fields:
+            hasher.update(f"{field_name}=".encode())
+            update_hash(hasher, getattr(value, field_name))
+        hasher.update(b");")
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"{type(value).__name__}:{len(value)}[".encode())
+        for item in value:
+            update_hash(hasher, item)
+        hasher.update(b"];")
+    elif isinstance(value, dict):
+        hasher.update(f"dict:{len(value)}{{".encode())
+        for k, v in value.items():
+            update_hash(hasher, k)
+            update_hash(hasher, v)
+        hasher.update(b"};")
+    else:
+        # Anything else (like an image that never went through the cache) hashes by its pickled content
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            raise UnhashableValue(f"Cannot hash value of type {type(value)}") from e
+        hasher.update(f"pickle:{type(value).__qualname__}:{len(data)}:".encode())
+        hasher.update(data)
+
+
+def approximate_size(value: Any) -> int:
+    """Estimates the memory a value takes up. Containers and models add up their items,
+    values with an nbytes (like numpy arrays) report it and anything else that isn't a
+    plain value (like an image) counts with its pickled size"""
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, BaseModel):
+        return sys.getsizeof(value) + sum(
+            approximate_size(getattr(value, field_name))
+            for field_name in type(value).model_fields
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(approximate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            approximate_size(k) + approximate_size(v) for k, v in value.items()
+        )
+    if isinstance(getattr(value, "nbytes", None), int):
+        return value.nbytes
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def hash_value(value: Any) -> str:
+    """Returns a stable content hash of a value, raises UnhashableValue if that's not possible"""
+    hasher = hashlib.sha256()
+    update_hash(hasher, value)
+    return hasher.hexdigest()
+
+
+def is_pure(node: NodeDataFromFrontend) -> bool:
+    """Whether a node's callable may be memoized, functions opt out with @add_node_options(pure=False)
+
+    Generator nodes never are, their items are streamed to other nodes as they are produced.
+    """
+    from python_node_editor.server import CALLABLES
+
+    callable = CALLABLES[node.callable_id]
+    return getattr(callable, "pure", True) and not is_generator_callable(callable)
+
+
+def result_cache_key(node: NodeDataFromFrontend) -> str | None:
+    """Returns the cache key for a node with its current arguments,
+    or None if the node's result shouldn't be cached"""
+    if not RESULT_CACHE_ENABLED or not is_pure(node):
+        return None
+
+    hasher = hashlib.sha256()
+    hasher.update(f"{node.callable_id};{node.output_style};".encode())
+    try:
+        for arg_name in sorted(node.arguments.keys()):
+            hasher.update(f"{arg_name}=".encode())
+            update_hash(hasher, node.arguments[arg_name])
+    except UnhashableValue:
+        return None
+
+    return hasher.hexdigest()
+
+
+def copy_outputs(outputs: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Copies of output wrappers that are kept beyond their execution, so nodes that change
+    their inputs in place can't change them. Cached values are immutable once stored, their
+    wrappers are kept as they are so that their cache keys stay stable"""
+    if not outputs:
+        return None
+    return {
+        name: output if isinstance(output, CachedDataWrapper) else copy.deepcopy(output)
+        for name, output in outputs.items()
+    }
+
+
+def get_cached_update(node: NodeFromFrontend, cache_key: str) -> NodeUpdate | None:
+    """Returns an "executed" update for the node built from a cached result, if there is one"""
+    cached = RESULT_CACHE.get(cache_key)
+    if cached is None:
+        return None
+
+    RESULT_CACHE.move_to_end(cache_key)
+
+    # Downstream nodes share the outputs they're given, so they get their own copies
+    return NodeUpdate(
+        node_id=node.id,
+        status="executed",
+        outputs=copy_outputs(cached.outputs),
+        terminal_output=cached.terminal_output,
+    )
+
+
+def store_update(cache_key: str, node_update: NodeUpdate) -> None:
+    """Caches a successful node update, evicting the least recently used entries when full"""
+    global _cached_bytes
+    if node_update.status != "executed":
+        return
+
+    size = approximate_size(node_update.outputs) + approximate_size(
+        node_update.terminal_output
+    )
+    if size > RESULT_CACHE_MAX_BYTES:
+        # It would push out everything else and still not fit
+        return
+
+    # The update's outputs go on to downstream nodes, the cache keeps what they were
+    try:
+        outputs = copy_outputs(node_update.outputs)
+    except Exception:
+        return
+
+    _cached_bytes += size - RESULT_CACHE_SIZES.get(cache_key, 0)
+    RESULT_CACHE[cache_key] = node_update.model_copy(update={"outputs": outputs})
+    RESULT_CACHE_SIZES[cache_key] = size
+    RESULT_CACHE.move_to_end(cache_key)
+
+    while _cached_bytes > RESULT_CACHE_MAX_BYTES:
+        evicted_key, _ = RESULT_CACHE.popitem(last=False)
+        _cached_bytes -= RESULT_CACHE_SIZES.pop(evicted_key)
+
+
+def cached_bytes() -> int:
+    """The approximate size of all cached results"""
+    return _cached_bytes
+
+
+def clear_result_cache() -> None:
+    global _cached_bytes
+    RESULT_CACHE.clear()
+    RESULT_CACHE_SIZES.clear()
+    _cached_bytes = 0
@@ -0,0 +1,141 @@
+"""
+Headless execution of saved graphs, for batch jobs that don't need the HTTP server.
+
+Used by the pne-run entry point: the graph is executed with the same wavefront scheduling
+as /execution_submit, then the results are written to an output directory. Outputs of cached
+types (like images) become one file each, and everything else ends up in results.ndjson
+with one line per node.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+from typing import Any
+
+import shortuuid
+
+import python_node_editor.execution.checkpoints as checkpoints
+from python_node_editor.execution.checkpoints import CheckpointNotFound, load_checkpoint
+from python_node_editor.execution.exec_async import (
+    EXECUTIONS,
+    ExecutionState,
+    execute_graph_async,
+)
+from python_node_editor.large_data.base import CachedDataWrapper
+from python_node_editor.schema import DataWrapper, Graph
+
+RESULTS_FILENAME = "results.ndjson"
+
+
+def run_graph(
+    graph: Graph, keep_going: bool = False, execution_id: str | None = None
+) -> ExecutionState:
+    """Execute a graph to completion and return its final state.
+    When checkpointing is on and the execution_id has a checkpoint from an earlier run,
+    the nodes that completed in that run aren't executed again."""
+    execution_id = execution_id or shortuuid.uuid()
+    EXECUTIONS[execution_id] = ExecutionState()
+
+    completed = None
+    if checkpoints.CHECKPOINT_DIR is not None:
+        try:
+            _, completed, _ = load_checkpoint(execution_id)
+        except CheckpointNotFound:
+            pass
+
+    async def run():
+        await execute_graph_async(
+            execution_id, graph, shared=completed, keep_going=keep_going
+        )
+        return EXECUTIONS.pop(execution_id)
+
+    return asyncio.run(run())
+
+
+def run_id(graph_json: str) -> str:
+    """An execution id that's the same every time the same graph file is run,
+    so running it again picks up its checkpoint"""
+    return "run-" + hashlib.sha256(graph_json.encode()).hexdigest()[:16]
+
+
+def write_cached_output(output: CachedDataWrapper, path: str) -> str:
+    """Writes the value of a cached type output to a file next to path and returns its name.
+    Values that know how to save themselves (like PIL images) are saved as PNG, others are pickled"""
+    if hasattr(output.value, "save"):
+        path = f"{path}.png"
+        output.value.save(path)
+    else:
+        path = f"{path}.pkl"
+        with open(path, "wb") as f:
+            pickle.dump(output.value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return os.path.basename(path)
+
+
+def output_value(output: DataWrapper) -> Any:
+    """The output's value in JSON form, or its repr if it can't be serialized"""
+    try:
+        return output.model_dump(mode="json")["value"]
+    except Exception:
+        return repr(output.value)
+
+
+def write_results(graph: Graph, state: ExecutionState, output_dir: str) -> str:
+    """Writes the outputs of every node in the graph to output_dir and returns
+    the path of the results file"""
+    os.makedirs(output_dir, exist_ok=True)
+    results_path = os.path.join(output_dir, RESULTS_FILENAME)
+
+    with open(results_path, "w") as results_file:
+        for node in graph.nodes:
+            node_update = state.node_updates.get(node.id)
+            record: dict[str, Any] = {
+                "nodeId": node.id,
+                "status": node_update.status if node_update else "skipped",
+                "seconds": state._node_timings.get(node.id),
+            }
+
+            outputs = {}
+            if node_update is not None and node_update.outputs:
+                for output_name, output in node_update.outputs.items():
+                    if isinstance(output, CachedDataWrapper):
+                        # The results file refers to the file holding the value
+                        outputs[output_name] = write_cached_output(
+                            output, os.path.join(output_dir, f"{node.id}.{output_name}")
+                        )
+                    else:
+                        outputs[output_name] = output_value(output)
+            record["outputs"] = outputs
+
+            if node_update is not None and node_update.terminal_output:
+                record["terminalOutput"] = node_update.terminal_output
+
+            if node_update is not None and node_update.profile is not None:
+                record["profile"] = node_update.profile.model_dump(by_alias=True)
+
+            results_file.write(json.dumps(record, default=repr) + "\n")
+
+    return results_path
+
+
+def format_timings(graph: Graph, state: ExecutionState) -> str:
+    """A table of how long every node took, in the order they finished executing"""
+    from python_node_editor.server import CALLABLES
+
+    names = {
+        node.id: getattr(CALLABLES.get(node.data.callable_id), "__name__", "?")
+        for node in graph.nodes
+    }
+    id_width = max((len(node.id) for node in graph.nodes), default=0)
+    name_width = max((len(name) for name in names.values()), default=0)
+
+    lines = []
+    for node_id, seconds in state._node_timings.items():
+        node_update = state.node_updates.get(node_id)
+        status = node_update.status if node_update else "?"
+        lines.append(
+            f"{node_id:<{id_width}}  {names[node_id]:<{name_width}}  {status:<9}  {seconds:8.3f}s"
+        )
+
+    return "\n".join(lines)
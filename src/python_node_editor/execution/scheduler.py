@@ -0,0 +1,198 @@
+"""
+Server-wide admission control for graph executions.
+
+Only a fixed number of executions run at once. Further submissions wait in a FIFO queue,
+and once the queue is full new submissions are rejected, so latency under load stays
+predictable instead of every execution competing for the same threads.
+
+Executions come in two priority classes. Interactive ones (edits in the frontend) are always
+served first, they even start while batch executions take up every slot. Running batch
+executions make way for them by not launching new nodes while an interactive execution
+is running or waiting. So batch work doesn't starve under a steady stream of edits,
+a batch execution that has waited for BATCH_MAX_WAIT seconds goes ahead anyway.
+"""
+
+import asyncio
+from collections import deque
+from typing import Callable, Coroutine, Literal
+
+Priority = Literal["interactive", "batch"]
+
+PRIORITIES: tuple[Priority, ...] = ("interactive", "batch")
+
+# Seconds a batch execution waits for interactive ones, in the queue or at a node boundary,
+# before it goes ahead regardless
+BATCH_MAX_WAIT = 10.0
+
+
+class QueueFull(Exception):
+    pass
+
+
+class ExecutionScheduler:
+    def __init__(self, max_running: int = 4, max_queued: int = 64):
+        self.max_running = max_running
+        # Per priority class, so a backlog of batch work never gets edits rejected
+        self.max_queued = max_queued
+        self.running: dict[str, asyncio.Task] = {}
+        self.running_priorities: dict[str, Priority] = {}
+        self.pending: dict[Priority, deque[tuple[str, Callable[[], Coroutine], float]]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+        # Called with the ids of the queued executions, in order, whenever the queue changes
+        self.on_queue_change: Callable[[list[str]], None] | None = None
+        # Set while no interactive execution is running or queued. It's created on first use
+        # and again for a new event loop, since an event belongs to the loop it's used in
+        self._interactive_idle: asyncio.Event | None = None
+        self._idle_loop: asyncio.AbstractEventLoop | None = None
+
+    def submit(
+        self,
+        execution_id: str,
+        run: Callable[[], Coroutine],
+        priority: Priority = "interactive",
+    ) -> None:
+        """Start an execution right away if a slot is free, otherwise queue it.
+        Raises QueueFull if the queue of its priority class is at capacity."""
+        # Interactive executions only queue behind each other, batch ones behind everything
+        ahead = (
+            self.pending["interactive"]
+            if priority == "interactive"
+            else self.queued_ids()
+        )
+        if not ahead and self._has_slot(priority):
+            self._start(execution_id, run, priority)
+            return
+
+        if len(self.pending[priority]) >= self.max_queued:
+            raise QueueFull(
+                f"{len(self.pending[priority])} {priority} executions "
+                "are already waiting to run"
+            )
+
+        queued_at = asyncio.get_running_loop().time()
+        self.pending[priority].append((execution_id, run, queued_at))
+        self._update_interactive_idle()
+        self._queue_changed()
+
+    def cancel(self, execution_id: str) -> bool:
+        """Drop a queued execution or cancel the task of a running one.
+        Returns False if the execution is neither queued nor running."""
+        for pending in self.pending.values():
+            for i, (queued_id, _, _) in enumerate(pending):
+                if queued_id == execution_id:
+                    del pending[i]
+                    self._update_interactive_idle()
+                    self._queue_changed()
+                    return True
+
+        task = self.running.get(execution_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    def queued_ids(self) -> list[str]:
+        """The ids of the queued executions in the order they'll start, unless batch ones age"""
+        return [
+            execution_id
+            for priority in PRIORITIES
+            for execution_id, _, _ in self.pending[priority]
+        ]
+
+    def depths(self) -> dict[Priority, dict[str, int]]:
+        """How many executions of every priority class are running and queued"""
+        return {
+            priority: {
+                "running": sum(
+                    running_priority == priority
+                    for running_priority in self.running_priorities.values()
+                ),
+                "queued": len(self.pending[priority]),
+            }
+            for priority in PRIORITIES
+        }
+
+    async def yield_to_interactive(self) -> None:
+        """Called by batch executions at node boundaries: waits while interactive executions
+        are running or queued, but never longer than BATCH_MAX_WAIT"""
+        if self._interactive_waiting() == 0:
+            return
+        try:
+            await asyncio.wait_for(self._idle_event().wait(), timeout=BATCH_MAX_WAIT)
+        except TimeoutError:
+            pass
+
+    def _interactive_waiting(self) -> int:
+        return len(self.pending["interactive"]) + sum(
+            priority == "interactive" for priority in self.running_priorities.values()
+        )
+
+    def _idle_event(self) -> asyncio.Event:
+        loop = asyncio.get_running_loop()
+        if self._interactive_idle is None or self._idle_loop is not loop:
+            self._interactive_idle = asyncio.Event()
+            self._idle_loop = loop
+            self._update_interactive_idle()
+        return self._interactive_idle
+
+    def _update_interactive_idle(self) -> None:
+        if self._interactive_idle is None:
+            return
+        if self._interactive_waiting() == 0:
+            self._interactive_idle.set()
+        else:
+            self._interactive_idle.clear()
+
+    def _has_slot(self, priority: Priority) -> bool:
+        if priority == "interactive":
+            # Batch executions make way at their next node boundary, so they don't count
+            return (
+                sum(p == "interactive" for p in self.running_priorities.values())
+                < self.max_running
+            )
+        return len(self.running) < self.max_running
+
+    def _start(
+        self, execution_id: str, run: Callable[[], Coroutine], priority: Priority
+    ) -> None:
+        task = asyncio.create_task(run())
+        self.running[execution_id] = task
+        self.running_priorities[execution_id] = priority
+        self._update_interactive_idle()
+        # A done callback also fires for tasks cancelled before they got to run
+        task.add_done_callback(lambda _: self._finished(execution_id))
+
+    def _finished(self, execution_id: str) -> None:
+        self.running.pop(execution_id, None)
+        self.running_priorities.pop(execution_id, None)
+        self._update_interactive_idle()
+        self._start_next()
+
+    def _next_priority(self) -> Priority | None:
+        """The class to start an execution from: interactive, unless the oldest batch
+        execution has waited too long. None if nothing can start right now."""
+        batch = self.pending["batch"]
+        if batch and self._has_slot("batch"):
+            waited = asyncio.get_running_loop().time() - batch[0][2]
+            if waited >= BATCH_MAX_WAIT or not self.pending["interactive"]:
+                return "batch"
+        if self.pending["interactive"] and self._has_slot("interactive"):
+            return "interactive"
+        return None
+
+    def _start_next(self) -> None:
+        started = False
+        while (priority := self._next_priority()) is not None:
+            execution_id, run, _ = self.pending[priority].popleft()
+            self._start(execution_id, run, priority)
+            started = True
+        if started:
+            self._queue_changed()
+
+    def _queue_changed(self) -> None:
+        if self.on_queue_change is not None:
+            self.on_queue_change(self.queued_ids())
+
+
+SCHEDULER = ExecutionScheduler()
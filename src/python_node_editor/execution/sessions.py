@@ -0,0 +1,149 @@
+"""
+Incremental re-execution of graphs resubmitted by the same client session.
+
+The frontend resubmits the whole graph after every edit. For each session we keep a signature
+of every node from the last execution (callable, manually set arguments and incoming edges)
+along with its final update. On resubmit only the nodes whose signature changed, and everything
+downstream of them, are executed again. The rest are answered with their previous outputs.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+from python_node_editor.execution.graph_index import GraphIndex
+from python_node_editor.execution.result_cache import (
+    UnhashableValue,
+    copy_outputs,
+    is_pure,
+    update_hash,
+)
+from python_node_editor.schema import NodeUpdate
+from python_node_editor.schema_base import CamelBaseModel
+
+# Least recently used sessions are forgotten once more than this many are stored
+MAX_SESSIONS = 64
+
+
+class SessionState(CamelBaseModel):
+    node_signatures: dict[str, str] = {}
+    node_updates: dict[str, NodeUpdate] = {}
+
+
+SESSIONS: OrderedDict[str, SessionState] = OrderedDict()
+
+
+def node_signatures(index: GraphIndex) -> dict[str, str | None]:
+    """Returns a signature for every node in the graph, or None for nodes that must always run
+
+    Arguments fed by an edge are left out of the signature, they are covered by the
+    signature of the upstream node and the edge itself.
+    """
+    signatures: dict[str, str | None] = {}
+    for node in index.graph.nodes:
+        if not is_pure(node.data):
+            signatures[node.id] = None
+            continue
+
+        incoming = index.incoming[node.id]
+        edge_arguments = {edge.argument_name for edge in incoming}
+
+        hasher = hashlib.sha256()
+        hasher.update(f"{node.data.callable_id};{node.data.output_style};".encode())
+        try:
+            for arg_name in sorted(node.data.arguments.keys()):
+                if arg_name in edge_arguments:
+                    continue
+                hasher.update(f"{arg_name}=".encode())
+                update_hash(hasher, node.data.arguments[arg_name])
+        except UnhashableValue:
+            signatures[node.id] = None
+            continue
+        for edge in sorted(incoming):
+            hasher.update(
+                f"edge:{edge.source}.{edge.output_name}->{edge.argument_name};".encode()
+            )
+
+        signatures[node.id] = hasher.hexdigest()
+
+    return signatures
+
+
+def reusable_updates(
+    session_id: str, index: GraphIndex, signatures: dict[str, str | None]
+) -> dict[str, NodeUpdate]:
+    """Returns the previous updates of the nodes that don't need to be executed again"""
+    session = SESSIONS.get(session_id)
+    if session is None:
+        return {}
+
+    SESSIONS.move_to_end(session_id)
+
+    dirty = {
+        node_id
+        for node_id, signature in signatures.items()
+        if signature is None
+        or session.node_signatures.get(node_id) != signature
+        or node_id not in session.node_updates
+    }
+
+    # Everything downstream of a changed node has to run again as well
+    dirty = index.downstream_closure(dirty)
+
+    return {
+        node_id: session.node_updates[node_id]
+        for node_id in signatures
+        if node_id not in dirty
+    }
+
+
+def _copied_outputs(node_update: NodeUpdate) -> dict | None:
+    # Outputs that can't be copied are shared
+    try:
+        return copy_outputs(node_update.outputs)
+    except Exception:
+        return dict(node_update.outputs) if node_update.outputs else None
+
+
+def kept_update(node_update: NodeUpdate) -> NodeUpdate:
+    """The update of a node as the session keeps it, with copies of its outputs taken before
+    downstream nodes get them, so changing their inputs in place doesn't change what the
+    next execution reuses"""
+    return node_update.model_copy(update={"outputs": _copied_outputs(node_update)})
+
+
+def reused_update(node_id: str, previous: NodeUpdate) -> NodeUpdate:
+    """Builds the "executed" update for a node answered with its previous outputs,
+    downstream nodes get copies of them"""
+    return NodeUpdate(
+        node_id=node_id,
+        status="executed",
+        outputs=_copied_outputs(previous),
+        terminal_output=previous.terminal_output,
+    )
+
+
+def record_execution(
+    session_id: str,
+    signatures: dict[str, str | None],
+    node_updates: dict[str, NodeUpdate],
+) -> None:
+    """Stores the signatures and outputs of the nodes that executed successfully.
+    Nodes that ran fused into the next one didn't keep their outputs, so they aren't stored."""
+    session = SessionState()
+    for node_id, signature in signatures.items():
+        node_update = node_updates.get(node_id)
+        if (
+            signature is None
+            or node_update is None
+            or node_update.status != "executed"
+            or node_update.fused_into is not None
+        ):
+            continue
+        session.node_signatures[node_id] = signature
+        session.node_updates[node_id] = node_update
+
+    SESSIONS[session_id] = session
+    SESSIONS.move_to_end(session_id)
+
+    while len(SESSIONS) > MAX_SESSIONS:
+        SESSIONS.popitem(last=False)
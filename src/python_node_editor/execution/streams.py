@@ -0,0 +1,221 @@
+"""
+Streaming items from generator nodes to the nodes that consume them.
+
+A node whose callable yields (declared with an Iterator[T] / AsyncIterator[T] return type)
+produces items one at a time. When a downstream node takes the items as an Iterator[T] or
+AsyncIterator[T] argument, the async execution starts it as soon as the producer starts and
+hands it an ItemStream: a bounded queue the producer puts every item into and the consumer
+iterates over. A slow consumer makes the producer wait once the queue is full, so a pipeline
+of generator nodes works through any number of items with constant memory.
+
+Downstream nodes that take a plain list instead get all items once the producer is done.
+"""
+
+import asyncio
+import inspect
+import queue
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from python_node_editor.execution.cancellation import raise_if_cancelled
+
+# Number of items that may wait in a stream before the producing node has to wait for its consumer
+STREAM_QUEUE_SIZE = 16
+# Interval in seconds at which a waiting producer or consumer thread checks for cancellation
+# and failures. Async producers and consumers don't poll, the other end wakes them up instead
+POLL_INTERVAL = 0.05
+
+
+class StreamFailed(Exception):
+    pass
+
+
+class _End:
+    """Put into a stream after the last item"""
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _wake(waiter: asyncio.Future | None) -> None:
+    """Wakes up an async producer or consumer waiting on a stream, from any thread"""
+    if waiter is not None and not waiter.done():
+        waiter.get_loop().call_soon_threadsafe(_resolve, waiter)
+
+
+class ItemStream:
+    """A bounded queue carrying the items of a generator node to one consuming node.
+    Iterable from a thread (for Iterator arguments) and from the event loop (for AsyncIterator ones)"""
+
+    def __init__(self, producer_id: str):
+        self.producer_id = producer_id
+        self._queue: queue.Queue = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self._failed = False
+        self._abandoned = False
+        # Set while an async consumer waits for an item, or an async producer for room.
+        # Whoever changes the queue resolves them, wherever it runs
+        self._item_waiter: asyncio.Future | None = None
+        self._space_waiter: asyncio.Future | None = None
+
+    def put(self, item: Any) -> bool:
+        """Waits while the stream is full. Returns False if the consumer stopped reading"""
+        while not self._abandoned:
+            try:
+                self._queue.put(item, timeout=POLL_INTERVAL)
+            except queue.Full:
+                raise_if_cancelled()
+                continue
+            _wake(self._item_waiter)
+            return True
+        return False
+
+    async def put_async(self, item: Any) -> bool:
+        """Like put, but waits without blocking the event loop"""
+        while not self._abandoned:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                raise_if_cancelled()
+                self._space_waiter = asyncio.get_running_loop().create_future()
+                try:
+                    # The consumer may have made room before it could see the waiter
+                    if self._queue.full() and not self._abandoned:
+                        await self._space_waiter
+                finally:
+                    self._space_waiter = None
+                continue
+            _wake(self._item_waiter)
+            return True
+        return False
+
+    def fail(self) -> None:
+        """The producer failed, the consumer raises StreamFailed once it has read what's left"""
+        self._failed = True
+        _wake(self._item_waiter)
+
+    def abandon(self) -> None:
+        """The consumer is done, the producer stops waiting on this stream"""
+        self._abandoned = True
+        _wake(self._space_waiter)
+
+    def _failure(self) -> StreamFailed:
+        return StreamFailed(f"Node {self.producer_id} failed while producing items")
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            try:
+                item = self._queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self._failed:
+                    raise self._failure()
+                raise_if_cancelled()
+                continue
+
+            _wake(self._space_waiter)
+            if item is _End:
+                return
+            yield item
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                if self._failed:
+                    raise self._failure()
+                raise_if_cancelled()
+                self._item_waiter = asyncio.get_running_loop().create_future()
+                try:
+                    # The producer may have put an item before it could see the waiter
+                    if self._queue.empty() and not self._failed:
+                        await self._item_waiter
+                finally:
+                    self._item_waiter = None
+                continue
+
+            _wake(self._space_waiter)
+            if item is _End:
+                return
+            yield item
+
+
+class StreamOutput:
+    """Where the items of a generator node go: the streams of its consuming nodes,
+    and a list if the node's whole output is needed as well"""
+
+    def __init__(self, streams: list[ItemStream] | None = None, collect: bool = True):
+        self.streams = streams or []
+        self.items: list[Any] | None = [] if collect else None
+        self.count = 0
+
+    def _delivered(self, item: Any, delivered: list[bool]) -> bool:
+        """Returns False once nobody wants any more items"""
+        if self.items is not None:
+            self.items.append(item)
+        self.count += 1
+        return self.items is not None or not self.streams or any(delivered)
+
+    def deliver(self, item: Any) -> bool:
+        return self._delivered(item, [stream.put(item) for stream in self.streams])
+
+    async def deliver_async(self, item: Any) -> bool:
+        return self._delivered(
+            item, [await stream.put_async(item) for stream in self.streams]
+        )
+
+    def close(self) -> None:
+        for stream in self.streams:
+            stream.put(_End)
+
+    async def close_async(self) -> None:
+        for stream in self.streams:
+            await stream.put_async(_End)
+
+    def fail(self) -> None:
+        for stream in self.streams:
+            stream.fail()
+
+
+def drain_generator(generator: Iterator[Any], output: StreamOutput) -> list[Any] | None:
+    """Passes every item a generator node yields on to its output"""
+    try:
+        for item in generator:
+            if not output.deliver(item):
+                break
+            raise_if_cancelled()
+    finally:
+        close = getattr(generator, "close", None)
+        if close is not None:
+            close()
+
+    output.close()
+    return output.items
+
+
+async def drain_async_generator(
+    generator: AsyncIterator[Any], output: StreamOutput
+) -> list[Any] | None:
+    """Passes every item an async generator node yields on to its output"""
+    try:
+        async for item in generator:
+            if not await output.deliver_async(item):
+                break
+            raise_if_cancelled()
+    finally:
+        aclose = getattr(generator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    await output.close_async()
+    return output.items
+
+
+def is_generator_callable(callable: Callable) -> bool:
+    """Whether a node's callable yields items, looking through decorators"""
+    while True:
+        if inspect.isgeneratorfunction(callable) or inspect.isasyncgenfunction(callable):
+            return True
+        if not hasattr(callable, "__wrapped__"):
+            return False
+        callable = callable.__wrapped__
@@ -0,0 +1,379 @@
+"""
+Parameter sweeps: executing one graph over many sets of argument values.
+
+A sweep takes a graph and a list of variants, each of which overrides some arguments of
+some nodes. Nodes that no override reaches (nothing upstream of them is overridden) compute
+the same thing in every variant, so they are executed only once, up front. Then every variant
+runs as its own async execution with those shared nodes answered from that first run,
+MAX_CONCURRENT_VARIANTS at a time, and each variant's results are made available to
+/sweep_update as soon as it completes.
+"""
+
+import asyncio
+import threading
+from typing import Any
+
+import shortuuid
+from fastapi import APIRouter, HTTPException
+from pydantic import PrivateAttr, ValidationError
+from typing_extensions import Literal
+
+from python_node_editor.execution.exec_async import (
+    EXECUTION_CLEANUP_DELAY,
+    EXECUTIONS,
+    ExecutionState,
+    execute_graph_async,
+)
+from python_node_editor.execution.exec_utils import VERBOSE
+from python_node_editor.execution.graph_index import CYCLE_ERROR, GraphIndex
+from python_node_editor.execution.scheduler import SCHEDULER, Priority, QueueFull
+from python_node_editor.schema import DataWrapper, Graph, NodeUpdate
+from python_node_editor.schema_base import CamelBaseModel
+
+router = APIRouter()
+
+# Maximum number of variants of a single sweep that may execute at the same time
+MAX_CONCURRENT_VARIANTS = 8
+
+
+class SweepRequest(CamelBaseModel):
+    graph: Graph
+    # One entry per variant, mapping node ids to the argument values to override on that node
+    variants: list[dict[str, dict[str, Any]]]
+
+
+class SweepVariant(CamelBaseModel):
+    # The variant's execution can be followed in detail through /execution_update while it runs
+    execution_id: str
+    status: Literal["pending", "running", "executed", "error", "cancelled"] = "pending"
+    # Final updates of the nodes that were executed for this variant only
+    node_updates: dict[str, NodeUpdate] = {}
+
+
+class SweepState(CamelBaseModel):
+    status: Literal["queued", "running", "complete"] = "queued"
+    queue_position: int | None = None
+    cancelled: bool | None = None
+    shared_execution_id: str | None = None
+    # Final updates of the nodes that were executed once for all variants
+    shared_updates: dict[str, NodeUpdate] = {}
+    variants: list[SweepVariant] = []
+    update_index: int = -1
+    last_sent_index: int | None = None
+
+    _shared_sent: bool = PrivateAttr(default=False)
+    # Variants whose results have already been sent to the client
+    _sent_variants: set[int] = PrivateAttr(default_factory=set)
+
+
+SWEEPS: dict[str, SweepState] = {}
+
+FINISHED_VARIANT_STATUSES = {"executed", "error", "cancelled"}
+
+_update_execution_queue_positions = SCHEDULER.on_queue_change
+
+
+def update_queue_positions(queued_ids: list[str]) -> None:
+    """Expose the position of every queued execution and sweep, they share the same queue"""
+    if _update_execution_queue_positions is not None:
+        _update_execution_queue_positions(queued_ids)
+
+    for position, queued_id in enumerate(queued_ids, start=1):
+        state = SWEEPS.get(queued_id)
+        if state is not None and state.queue_position != position:
+            state.queue_position = position
+            state.update_index += 1
+
+
+SCHEDULER.on_queue_change = update_queue_positions
+
+
+def prepare_overrides(
+    index: GraphIndex, overrides: dict[str, dict[str, Any]]
+) -> dict[str, dict[str, DataWrapper]]:
+    """Wraps the override values of a variant like the arguments they replace.
+    Raises an HTTPException for overrides that don't fit the graph"""
+    prepared: dict[str, dict[str, DataWrapper]] = {}
+    for node_id, values in overrides.items():
+        if node_id not in index.nodes:
+            raise HTTPException(status_code=400, detail=f"Node {node_id} not found")
+
+        arguments = index.nodes[node_id].data.arguments
+        connected = {edge.argument_name for edge in index.incoming[node_id]}
+        prepared[node_id] = {}
+        for argument_name, value in values.items():
+            if argument_name not in arguments:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Node {node_id} has no argument {argument_name}",
+                )
+            if argument_name in connected:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Argument {argument_name} of node {node_id} is connected to an edge",
+                )
+            try:
+                prepared[node_id][argument_name] = DataWrapper(
+                    type=arguments[argument_name].type, value=value
+                )
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+
+    return prepared
+
+
+def variant_graph(graph: Graph, overrides: dict[str, dict[str, DataWrapper]]) -> Graph:
+    """A copy of the graph with a variant's overrides applied. Only the argument dicts are
+    copied, executing the variant replaces their values rather than changing them"""
+    nodes = []
+    for node in graph.nodes:
+        arguments = dict(node.data.arguments)
+        for argument_name, value in overrides.get(node.id, {}).items():
+            arguments[argument_name] = value.model_copy()
+        data = node.data.model_copy(update={"arguments": arguments})
+        nodes.append(node.model_copy(update={"data": data}))
+
+    return Graph.model_construct(nodes=nodes, edges=graph.edges)
+
+
+@router.post("/sweep_submit")
+async def submit_sweep(sweep: SweepRequest, priority: Priority = "interactive"):
+    """Submit a graph for execution over many sets of argument values and return a sweep ID
+
+    Every variant maps node ids to the argument values that differ from the graph, for example
+    {"blur": {"radius": 3}}. The nodes that don't depend on any overridden argument are
+    executed once and shared by all variants. The sweep waits in the same queue as
+    /execution_submit and takes up a single slot of its priority class while it runs.
+    """
+    index = GraphIndex(sweep.graph)
+    if not index.is_acyclic():
+        raise HTTPException(status_code=400, detail=CYCLE_ERROR)
+    variants = [prepare_overrides(index, overrides) for overrides in sweep.variants]
+
+    sweep_id = shortuuid.uuid()
+    SWEEPS[sweep_id] = SweepState(
+        variants=[SweepVariant(execution_id=shortuuid.uuid()) for _ in variants]
+    )
+
+    try:
+        SCHEDULER.submit(
+            sweep_id,
+            lambda: execute_sweep(sweep_id, sweep.graph, variants, priority),
+            priority,
+        )
+    except QueueFull as e:
+        del SWEEPS[sweep_id]
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
+    return {
+        "sweep_id": sweep_id,
+        "execution_ids": [variant.execution_id for variant in SWEEPS[sweep_id].variants],
+    }
+
+
+@router.get("/sweep_update/{sweep_id}")
+async def get_sweep_status(sweep_id: str):
+    """Get the status of a sweep along with the results of the variants completed since the last poll"""
+    if sweep_id not in SWEEPS:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+
+    state = SWEEPS[sweep_id]
+    if state.last_sent_index is not None and state.update_index == state.last_sent_index:
+        return {"updateIndex": state.update_index}
+    state.last_sent_index = state.update_index
+
+    response = state.model_dump(
+        include={
+            "status",
+            "queue_position",
+            "cancelled",
+            "shared_execution_id",
+            "update_index",
+        },
+        exclude_none=True,
+    )
+    response["variantStatuses"] = [variant.status for variant in state.variants]
+
+    # The shared nodes' outputs are only sent once instead of with every variant
+    if state.shared_updates and not state._shared_sent:
+        state._shared_sent = True
+        response["sharedUpdates"] = {
+            node_id: node_update.model_dump(exclude_none=True)
+            for node_id, node_update in state.shared_updates.items()
+        }
+
+    response["results"] = []
+    for i, variant in enumerate(state.variants):
+        if variant.status in FINISHED_VARIANT_STATUSES and i not in state._sent_variants:
+            state._sent_variants.add(i)
+            response["results"].append(
+                {"variant": i, **variant.model_dump(exclude_none=True)}
+            )
+
+    return response
+
+
+@router.post("/sweep_cancel/{sweep_id}")
+async def cancel_sweep(sweep_id: str):
+    """Cancel a queued or running sweep, including all of its running variants"""
+    if sweep_id not in SWEEPS:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+
+    state = SWEEPS[sweep_id]
+    if state.status == "complete":
+        return {"cancelled": False}
+
+    # Let the nodes running in threads notice the cancellation through is_cancelled()
+    execution_ids = [state.shared_execution_id] + [
+        variant.execution_id for variant in state.variants
+    ]
+    for execution_id in execution_ids:
+        execution = EXECUTIONS.get(execution_id) if execution_id else None
+        if execution is not None:
+            execution._cancel_event.set()
+
+    was_queued = state.status == "queued"
+    SCHEDULER.cancel(sweep_id)
+
+    # A queued sweep never started, so nothing else will mark it complete
+    if was_queued:
+        finish_sweep(sweep_id, cancelled=True)
+
+    return {"cancelled": True}
+
+
+async def execute_shared_nodes(
+    state: SweepState, graph: Graph, varying: set[str], priority: Priority
+) -> dict[str, NodeUpdate] | None:
+    """Executes the nodes that are the same in every variant.
+    Returns their updates, or None if one of them didn't execute successfully"""
+    # Nothing upstream of a shared node varies, so every edge into one comes from another one
+    shared_graph = Graph.model_construct(
+        nodes=[node for node in graph.nodes if node.id not in varying],
+        edges=[edge for edge in graph.edges if edge.target not in varying],
+    )
+    if not shared_graph.nodes:
+        return {}
+
+    execution_id = shortuuid.uuid()
+    state.shared_execution_id = execution_id
+    EXECUTIONS[execution_id] = ExecutionState()
+    # The variants' consumers of a shared generator node get its items as a list
+    await execute_graph_async(
+        execution_id, shared_graph, priority=priority, keep_items=True
+    )
+
+    execution = EXECUTIONS[execution_id]
+    state.shared_updates = dict(execution.node_updates)
+    state.update_index += 1
+
+    if execution.cancelled:
+        state.cancelled = True
+        return None
+    if any(
+        node_update.status != "executed"
+        for node_update in execution.node_updates.values()
+    ):
+        return None
+    return execution.node_updates
+
+
+async def execute_variant(
+    state: SweepState,
+    variant: SweepVariant,
+    graph: Graph,
+    overrides: dict[str, dict[str, DataWrapper]],
+    shared: dict[str, NodeUpdate],
+    limit: asyncio.Semaphore,
+    priority: Priority,
+):
+    async with limit:
+        variant.status = "running"
+        state.update_index += 1
+
+        EXECUTIONS[variant.execution_id] = ExecutionState()
+        await execute_graph_async(
+            variant.execution_id,
+            variant_graph(graph, overrides),
+            shared=shared,
+            priority=priority,
+        )
+
+        execution = EXECUTIONS[variant.execution_id]
+        variant.node_updates = {
+            node_id: node_update
+            for node_id, node_update in execution.node_updates.items()
+            if node_id not in shared
+        }
+        if execution.cancelled:
+            variant.status = "cancelled"
+        elif any(
+            node_update.status == "error"
+            for node_update in variant.node_updates.values()
+        ):
+            variant.status = "error"
+        else:
+            variant.status = "executed"
+        state.update_index += 1
+
+
+async def execute_sweep(
+    sweep_id: str,
+    graph: Graph,
+    variants: list[dict[str, dict[str, DataWrapper]]],
+    priority: Priority = "interactive",
+):
+    """Execute the shared nodes of a sweep once, then all of its variants in parallel"""
+    state = SWEEPS[sweep_id]
+    state.status = "running"
+    state.queue_position = None
+    state.update_index += 1
+
+    # Everything downstream of an overridden argument differs between the variants
+    index = GraphIndex(graph)
+    varying = index.downstream_closure(
+        {node_id for overrides in variants for node_id in overrides}
+    )
+
+    try:
+        shared = await execute_shared_nodes(state, graph, varying, priority)
+        if shared is not None:
+            limit = asyncio.Semaphore(MAX_CONCURRENT_VARIANTS)
+            await asyncio.gather(
+                *(
+                    execute_variant(
+                        state, variant, graph, overrides, shared, limit, priority
+                    )
+                    for variant, overrides in zip(state.variants, variants)
+                )
+            )
+    except asyncio.CancelledError:
+        # The variants still running were cancelled along with the sweep's task
+        asyncio.current_task().uncancel()
+        state.cancelled = True
+
+    finish_sweep(sweep_id, cancelled=bool(state.cancelled))
+
+
+def finish_sweep(sweep_id: str, cancelled: bool):
+    """Mark a sweep complete, along with the variants that never got to finish"""
+    state = SWEEPS[sweep_id]
+    for variant in state.variants:
+        if variant.status not in FINISHED_VARIANT_STATUSES:
+            variant.status = "cancelled" if cancelled else "error"
+
+    state.status = "complete"
+    state.queue_position = None
+    state.cancelled = cancelled or None
+    state.update_index += 1
+
+    asyncio.create_task(cleanup_sweep(sweep_id))
+
+
+async def cleanup_sweep(sweep_id: str):
+    """Remove a sweep from memory after a delay"""
+    await asyncio.sleep(EXECUTION_CLEANUP_DELAY)
+    if sweep_id in SWEEPS:
+        del SWEEPS[sweep_id]
+        if VERBOSE:
+            print(f"Cleaned up sweep {sweep_id}")
@@ -0,0 +1,217 @@
+"""
+The pne-worker side of distributed execution, see distributed.py for the server side.
+
+A worker loads the callables of its search paths once, registers them with the server and
+then runs one node at a time: it polls for the next node, runs it in a thread while posting
+what it prints every HEARTBEAT_INTERVAL (which also keeps it registered as alive), and posts
+the pickled outcome back. Values it was sent to keep, and the results it produced, stay in an
+LRU store so later nodes on this worker can refer to them instead of receiving them again.
+"""
+
+import copy
+import pickle
+import socket
+import threading
+import time
+import traceback
+import weakref
+from collections import OrderedDict
+from typing import Any
+
+import httpx
+
+from python_node_editor.execution.capture import LiveOutput
+from python_node_editor.execution.distributed import MAX_POLL_WAIT, StoredValue, ValueRef
+
+# Interval in seconds at which a running node's output is posted to the server
+HEARTBEAT_INTERVAL = 1.0
+# Seconds to wait before trying again when the server can't be reached
+RETRY_INTERVAL = 1.0
+
+
+class ValueStore:
+    """Values kept for later nodes, the least recently used ones are dropped first"""
+
+    def __init__(self, max_values: int):
+        self.max_values = max_values
+        self.values: OrderedDict[str, Any] = OrderedDict()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.values
+
+    def get(self, key: str) -> Any:
+        self.values.move_to_end(key)
+        return self.values[key]
+
+    def put(self, key: str, value: Any) -> None:
+        self.values[key] = value
+        self.values.move_to_end(key)
+        while len(self.values) > self.max_values:
+            self.values.popitem(last=False)
+
+
+def _can_keep(value: Any) -> bool:
+    """Only values the server can track by weak reference get a key there"""
+    try:
+        weakref.ref(value)
+    except TypeError:
+        return False
+    return True
+
+
+class Worker:
+    def __init__(
+        self,
+        server_url: str,
+        token: str,
+        callables: dict,
+        name: str | None = None,
+        store_size: int = 32,
+    ):
+        self.client = httpx.Client(
+            base_url=server_url,
+            headers={"X-Worker-Token": token},
+            timeout=MAX_POLL_WAIT + 10,
+        )
+        self.callables = callables
+        self.name = name or socket.gethostname()
+        self.store = ValueStore(store_size)
+        self.worker_id: str | None = None
+
+    def register(self) -> None:
+        response = self.client.post(
+            "/worker_register",
+            json={"name": self.name, "callableIds": list(self.callables)},
+        )
+        response.raise_for_status()
+        self.worker_id = response.json()["worker_id"]
+
+    def resolve_arguments(
+        self, task: dict
+    ) -> tuple[list[Any], dict[str, Any]] | list[str]:
+        """The task's arguments with store references replaced by the stored values,
+        or the keys of the references this worker doesn't have anymore"""
+        missing = [
+            value.key
+            for value in [*task["args"], *task["kwargs"].values()]
+            if isinstance(value, ValueRef) and value.key not in self.store
+        ]
+        if missing:
+            return missing
+
+        # A callable that changes its inputs gets copies, the stored values are shared
+        mutates_inputs = getattr(
+            self.callables[task["callable_id"]], "mutates_inputs", False
+        )
+
+        def resolve(value: Any) -> Any:
+            if isinstance(value, ValueRef):
+                value = self.store.get(value.key)
+            elif isinstance(value, StoredValue):
+                key, value = value.key, pickle.loads(value.data)
+                self.store.put(key, value)
+            else:
+                return value
+            return copy.deepcopy(value) if mutates_inputs else value
+
+        args = [resolve(value) for value in task["args"]]
+        kwargs = {name: resolve(value) for name, value in task["kwargs"].items()}
+        return args, kwargs
+
+    def run_task(self, task: dict) -> tuple:
+        """Runs a node in a thread, posting its output while it runs,
+        and returns the message to answer the server with"""
+        from python_node_editor.execution.cancellation import cancellation_scope
+        from python_node_editor.execution.exec_utils import call_with_capture
+
+        callable_id = task["callable_id"]
+        if callable_id not in self.callables:
+            return ("result", (False, None, f"Callable {callable_id} not found in worker\n"))
+
+        arguments = self.resolve_arguments(task)
+        if isinstance(arguments, list):
+            return ("missing", arguments)
+        args, kwargs = arguments
+
+        live_output = LiveOutput()
+        cancel_event = threading.Event()
+        outcome: list[tuple] = []
+
+        def run():
+            with cancellation_scope(cancel_event):
+                outcome.append(
+                    call_with_capture(self.callables[callable_id], args, kwargs, live_output)
+                )
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        while thread.is_alive():
+            thread.join(HEARTBEAT_INTERVAL)
+            if thread.is_alive():
+                response = self.client.post(
+                    f"/worker_output/{self.worker_id}/{task['task_id']}",
+                    json={"output": live_output.drain() if live_output.pending else ""},
+                )
+                if response.status_code == 200 and response.json()["cancel"]:
+                    cancel_event.set()
+
+        success, result, terminal_output = outcome[0]
+        if success and _can_keep(result):
+            self.store.put(task["result_key"], result)
+        return ("result", (success, result, terminal_output))
+
+    def post_result(self, task_id: str, message: tuple) -> None:
+        try:
+            payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # The result can't be sent back, report it as an error on the node instead
+            terminal_output = message[1][2] or ""
+            payload = pickle.dumps(
+                ("result", (False, None, terminal_output + traceback.format_exc())),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        self.client.post(f"/worker_result/{self.worker_id}/{task_id}", content=payload)
+
+    def serve(self) -> None:
+        """Polls for nodes and runs them until interrupted"""
+        while True:
+            try:
+                if self.worker_id is None:
+                    self.register()
+                    print(f"Registered with {self.client.base_url} as {self.worker_id}")
+
+                response = self.client.get(f"/worker_task/{self.worker_id}")
+                if response.status_code == 404:
+                    # The server forgot this worker, like after a restart
+                    self.worker_id = None
+                    continue
+                response.raise_for_status()
+                if response.status_code == 204:
+                    continue
+
+                task = pickle.loads(response.content)
+                self.post_result(task["task_id"], self.run_task(task))
+            except httpx.HTTPError as e:
+                print(f"Server not reachable ({type(e).__name__}), retrying")
+                time.sleep(RETRY_INTERVAL)
+
+
+def run_worker(
+    server_url: str,
+    token: str,
+    search_paths: list[str],
+    ignore_underscore_prefix: bool = True,
+    name: str | None = None,
+    store_size: int = 32,
+) -> None:
+    """Entry point of a worker: load the callables once, then serve nodes for the server"""
+    import python_node_editor.server as server_module
+    from python_node_editor.analysis.utils import analyze_file_structure
+
+    _, callables, types = analyze_file_structure(
+        search_paths, ignore_underscore_prefix=ignore_underscore_prefix
+    )
+    server_module.CALLABLES.update(callables)
+    server_module.TYPES.update(types)
+
+    Worker(server_url, token, callables, name, store_size).serve()
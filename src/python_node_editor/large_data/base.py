@@ -1,3 +1,4 @@
+import pickle
 import uuid
 from typing import Any, ClassVar, Self
 
@@ -58,8 +59,8 @@ class CachedDataWrapper(CamelBaseModel):
     This also enables automatic exclusion of the full data when the updates are sent to the frontend,
     but the preview and other computed fields are sent.
 
-    For propogating updates across edges, we just set the input's wrapper to a model_copy() of
-    the wrapper subclass.
+    For propogating updates across edges, we just set the input's wrapper to the output's
+    wrapper, so the downstream nodes share it.
     """
 
     model_config = ConfigDict(
@@ -134,6 +135,25 @@ class CachedDataWrapper(CamelBaseModel):
         """
         raise NotImplementedError
 
+    def write_checkpoint(self, path: str) -> str:
+        """
+        Writes the value to a file for an execution checkpoint and returns the file's path.
+        path has no extension yet, so the file format is up to the subclass.
+
+        The value is pickled by default. Subclasses can override this together with
+        read_checkpoint to store their values in a format that suits them better.
+        """
+        path = f"{path}.pkl"
+        with open(path, "wb") as f:
+            pickle.dump(self.value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @classmethod
+    def read_checkpoint(cls, path: str) -> Any:
+        """Reads a value back from a file written by write_checkpoint"""
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
     @classmethod
     def from_cache_key(
         cls, cache_key: str, type_str: str | None = None
@@ -60,6 +60,8 @@ class FunctionSchema(CamelBaseModel):
     output_style: Literal["single", "multiple"] = "single"
     outputs: dict[str, DataWrapper | CachedDataWrapper]
     auto_generated: bool = False
+    # async def functions are awaited on the server's event loop instead of running in a thread
+    is_async: bool = False
 
 
 class NodeDataFromFrontend(CamelBaseModel):
@@ -129,14 +131,39 @@ class Graph(CamelBaseModel):
     edges: list[Edge]
 
 
+class NodeProfile(CamelBaseModel):
+    """How an executed node performed, measured while the server executes it"""
+
+    wall_seconds: float = 0.0
+    # Time the node's thread spent on the CPU, None for nodes that ran on the event loop
+    # or in another process
+    cpu_seconds: float | None = None
+    # Peak of Python memory allocations while the node ran, only with memory tracing on
+    peak_memory_bytes: int | None = None
+    # Bytes of terminal output the node printed
+    output_bytes: int = 0
+    # Time it took to wrap the node's result into its outputs in create_node_update
+    serialization_seconds: float = 0.0
+    # Id of the node's call profile, download it from /call_profile/{call_profile_id}
+    call_profile_id: str | None = None
+
+
 class NodeUpdate(CamelBaseModel):
     """Represents an update to a node during execution."""
 
     node_id: str
-    status: Literal["executing", "executed", "error"] | None = None
+    status: Literal["executing", "executed", "error", "cancelled", "skipped"] | None = None
     outputs: dict[str, DataWrapper | CachedDataWrapper] | None = None
     arguments: dict[str, DataWrapper | CachedDataWrapper] | None = None
     terminal_output: str | None = None
+    # Output printed by a running node since the previous poll, to be appended to what's shown
+    new_terminal_output: str | None = None
+    # Number of items a generator node has yielded so far
+    items_produced: int | None = None
+    # The node an executed node's output went straight into when they ran fused, it isn't kept
+    fused_into: str | None = None
+    # Measurements of the execution, only on the final update of an executed node
+    profile: NodeProfile | None = None
 
     @field_serializer("outputs", "arguments", when_used="unless-none")
     def serialize_wrappers(self, value, _info):
@@ -33,7 +33,8 @@ class UnionDescr(CamelBaseModel):
 
 
 class StructDescr(CamelBaseModel):
-    structure_type: Literal["list", "dict"]
+    # "iterator" is a stream of items yielded by a generator node
+    structure_type: Literal["list", "dict", "iterator"]
     items_type: str | UnionDescr
 
 
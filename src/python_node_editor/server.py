@@ -9,8 +9,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from python_node_editor.analysis.utils import analyze_file_structure
+from python_node_editor.execution import distributed, process_pool
 from python_node_editor.execution.exec_async import router as execute_async_router
 from python_node_editor.execution.exec_sync import router as execute_sync_router
+from python_node_editor.execution.plans import clear_plans
+from python_node_editor.execution.sweep import router as sweep_router
 from python_node_editor.large_data.router import router as large_data_router
 
 FUNCTION_SCHEMAS = []
@@ -19,6 +22,8 @@ TYPES = {}
 VERBOSE = False
 IGNORE_UNDERSCORE_PREFIX = True
 SERVE_FRONTEND = False
+# Number of worker processes to run nodes in, 0 runs them in the thread pool instead
+PROCESS_WORKERS = 0
 
 
 class _HealthCheckAccessFilter(logging.Filter):
@@ -60,6 +65,8 @@ async def lifespan(app: FastAPI):
     FUNCTION_SCHEMAS.extend(function_schemas)
     CALLABLES.update(callables)
     TYPES.update(types)
+    # Plans hold on to callables and types, anything planned before has to be planned again
+    clear_plans()
 
     print(f"Found {len(FUNCTION_SCHEMAS)} functions and {len(TYPES)} types")
 
@@ -67,8 +74,20 @@ async def lifespan(app: FastAPI):
         d(FUNCTION_SCHEMAS)
         d(TYPES)
 
+    if PROCESS_WORKERS > 0:
+        process_pool.start_process_pool(
+            PROCESS_WORKERS, search_paths, IGNORE_UNDERSCORE_PREFIX
+        )
+        print(f"Running nodes in {PROCESS_WORKERS} worker processes")
+
+    if distributed.WORKER_TOKEN is not None:
+        print("Accepting pne-worker registrations")
+
     yield
 
+    process_pool.stop_process_pool()
+    distributed.REGISTRY.clear()
+
 
 # Create the FastAPI app
 app = FastAPI(
@@ -81,6 +100,8 @@ _attach_access_log_filter()
 # Include routers
 app.include_router(execute_sync_router)
 app.include_router(execute_async_router)
+app.include_router(sweep_router)
+app.include_router(distributed.router)
 app.include_router(large_data_router, prefix="/data", tags=["data"])
 
 
@@ -0,0 +1,34 @@
+"""
+Async def test functions, awaited directly on the event loop.
+"""
+
+import asyncio
+import threading
+
+from python_node_editor.display import add_node_options
+
+
+async def fetch_value(value: int, delay: float) -> int:
+    """Wait like a network request would, then return the value."""
+    print(f"Fetching {value}")
+    await asyncio.sleep(delay)
+    return value
+
+
+async def current_thread_name(x: int) -> str:
+    """The name of the thread the node ran in."""
+    return threading.current_thread().name
+
+
+async def failing_fetch(url: str) -> str:
+    """Print something, then fail."""
+    print(f"Requesting {url}")
+    await asyncio.sleep(0)
+    raise ConnectionError(f"Could not reach {url}")
+
+
+@add_node_options(node_name="Slow Fetch", timeout=0.1)
+async def slow_fetch(delay: float) -> float:
+    """Has a timeout of 0.1 seconds."""
+    await asyncio.sleep(delay)
+    return delay
@@ -0,0 +1,39 @@
+"""
+Test functions that count their calls for testing the result cache.
+"""
+
+from typing import Iterator
+
+from python_node_editor.display import add_node_options
+
+CALLS = {"counted_add": 0, "counted_impure": 0}
+
+
+def counted_add(a: int, b: int) -> int:
+    CALLS["counted_add"] += 1
+    print(f"Adding {a} and {b}")
+    return a + b
+
+
+@add_node_options(pure=False)
+def counted_impure(x: int) -> int:
+    CALLS["counted_impure"] += 1
+    return x
+
+
+FLAKY = {"fail": False}
+
+
+def flaky_add(a: int, b: int) -> int:
+    """Fails while FLAKY["fail"] is set, like a node running into a temporary problem"""
+    if FLAKY["fail"]:
+        raise RuntimeError("Temporary failure")
+    return a + b
+
+
+def flaky_sum(numbers: Iterator[int]) -> int:
+    """Fails while FLAKY["fail"] is set, after reading all the numbers"""
+    total = sum(numbers)
+    if FLAKY["fail"]:
+        raise RuntimeError("Temporary failure")
+    return total
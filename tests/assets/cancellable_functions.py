@@ -0,0 +1,32 @@
+"""
+Long running test functions for testing execution cancellation.
+"""
+
+import time
+
+from python_node_editor.display import add_node_options
+from python_node_editor.execution.cancellation import is_cancelled
+
+
+def cooperative_wait(seconds: float) -> float:
+    """Waits in small steps and stops as soon as the execution is cancelled."""
+    waited = 0.0
+    while waited < seconds:
+        if is_cancelled():
+            return waited
+        time.sleep(0.02)
+        waited += 0.02
+    return waited
+
+
+def runaway_wait(seconds: float) -> float:
+    """Ignores cancellation entirely."""
+    time.sleep(seconds)
+    return seconds
+
+
+@add_node_options(timeout=0.2)
+def impatient_wait(seconds: float) -> float:
+    """Has its own time budget of 0.2 seconds."""
+    time.sleep(seconds)
+    return seconds
@@ -0,0 +1,16 @@
+"""
+Test functions for fused chains, reporting which thread ran them.
+"""
+
+import threading
+
+
+def increment(x: int) -> int:
+    print(f"Thread {threading.get_ident()}")
+    return x + 1
+
+
+def at_most(x: int, limit: int) -> int:
+    if x > limit:
+        raise ValueError(f"{x} is above {limit}")
+    return x
@@ -0,0 +1,37 @@
+"""
+Test functions for sharing outputs between downstream nodes without copying them.
+"""
+
+from python_node_editor.display import add_node_options
+
+# The ids of the lists count_numbers was passed
+SEEN_IDS: list[int] = []
+
+
+def make_numbers(n: int) -> list[int]:
+    return list(range(n))
+
+
+def count_numbers(numbers: list[int]) -> int:
+    SEEN_IDS.append(id(numbers))
+    return len(numbers)
+
+
+def append_in_place(numbers: list[int]) -> int:
+    """Changes the list it was passed, which other nodes may share."""
+    numbers.append(-1)
+    return len(numbers)
+
+
+@add_node_options(mutates_inputs=True)
+def append_to_copy(numbers: list[int]) -> int:
+    """Changes the list it was passed, but declares it."""
+    numbers.append(-1)
+    return len(numbers)
+
+
+@add_node_options(pure=False)
+def append_every_time(numbers: list[int]) -> int:
+    """Changes the list it was passed, and runs again on every execution."""
+    numbers.append(-1)
+    return len(numbers)
@@ -0,0 +1,20 @@
+"""
+Test functions for the process pool execution backend.
+"""
+
+import os
+
+
+def worker_pid(x: int) -> int:
+    """Return the id of the process the node ran in."""
+    print(f"Running in process {os.getpid()} with input {x}")
+    return os.getpid()
+
+
+def count_primes(limit: int) -> int:
+    """Count the primes below limit with pure python, holding the GIL the whole time."""
+    count = 0
+    for n in range(2, limit):
+        if all(n % d for d in range(2, int(n**0.5) + 1)):
+            count += 1
+    return count
@@ -0,0 +1,36 @@
+"""
+Test functions for node profiles, with known CPU time and memory use.
+"""
+
+import time
+
+from python_node_editor.display import add_node_options
+
+
+def spin(seconds: float) -> int:
+    """Keeps the CPU busy for a while"""
+    print("Spinning")
+    end = time.thread_time() + seconds
+    count = 0
+    while time.thread_time() < end:
+        count += 1
+    return count
+
+
+def allocate(megabytes: int) -> int:
+    """Holds on to a block of memory while it runs, then sleeps without using the CPU"""
+    block = bytearray(megabytes * 1024 * 1024)
+    time.sleep(0.1)
+    return len(block)
+
+
+def inner_loop(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+@add_node_options(profile=True)
+def profiled_work(n: int) -> int:
+    total = 0
+    for _ in range(20):
+        total += inner_loop(n)
+    return total
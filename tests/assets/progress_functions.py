@@ -0,0 +1,13 @@
+"""
+Test functions that report their progress while they run.
+"""
+
+import time
+
+
+def report_progress(steps: int, interval: float) -> int:
+    """Print a line for every step, waiting interval seconds in between."""
+    for step in range(steps):
+        print(f"step {step}")
+        time.sleep(interval)
+    return steps
@@ -0,0 +1,75 @@
+"""
+Generator test functions and the nodes that consume their items.
+PROGRESS records how far producers got ahead of their consumers.
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Iterator
+
+PROGRESS = {"produced": 0, "consumed": 0, "max_ahead": 0, "produced_at_first_item": None}
+
+
+def count_up(n: int, delay: float) -> Iterator[int]:
+    """Yield the numbers below n, waiting delay seconds before each one."""
+    for i in range(n):
+        time.sleep(delay)
+        PROGRESS["produced"] += 1
+        yield i
+
+
+def square_each(numbers: Iterator[int]) -> Iterator[int]:
+    """Square every number as it arrives."""
+    for number in numbers:
+        yield number * number
+
+
+def slow_sum(numbers: Iterator[int], delay: float) -> int:
+    """Add up the numbers, taking delay seconds for each one."""
+    total = 0
+    for number in numbers:
+        if PROGRESS["produced_at_first_item"] is None:
+            PROGRESS["produced_at_first_item"] = PROGRESS["produced"]
+        PROGRESS["consumed"] += 1
+        PROGRESS["max_ahead"] = max(
+            PROGRESS["max_ahead"], PROGRESS["produced"] - PROGRESS["consumed"]
+        )
+        time.sleep(delay)
+        total += number
+    return total
+
+
+def total_of_list(numbers: list[int]) -> int:
+    """Takes all the items at once."""
+    return sum(numbers)
+
+
+def offset_sum(numbers: Iterator[int], offset: int) -> int:
+    """Adds up the numbers on top of an offset."""
+    return offset + sum(numbers)
+
+
+def first_item(numbers: Iterator[int]) -> int:
+    """Only reads the first item."""
+    return next(iter(numbers))
+
+
+def failing_count(n: int) -> Iterator[int]:
+    """Yield n numbers, then fail."""
+    yield from range(n)
+    raise RuntimeError("Ran out of numbers")
+
+
+async def async_count_up(n: int) -> AsyncIterator[int]:
+    """Yield the numbers below n from the event loop."""
+    for i in range(n):
+        await asyncio.sleep(0)
+        yield i
+
+
+async def async_sum(numbers: AsyncIterator[int]) -> int:
+    """Add up numbers arriving asynchronously."""
+    total = 0
+    async for number in numbers:
+        total += number
+    return total
@@ -0,0 +1,43 @@
+"""
+Test functions for distributed execution, reporting which process ran them.
+"""
+
+import os
+import time
+
+from PIL import Image as ImageLibrary
+from PIL.Image import Image
+
+from examples._custom_datatypes.cached_image import image_cached_datatype
+
+
+def running_pid(seconds: float) -> int:
+    """Returns the id of the process running it after sleeping a while"""
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def dies_once(marker_path: str) -> int:
+    """Kills the process running it the first time, as if its host went down"""
+    if not os.path.exists(marker_path):
+        open(marker_path, "w").close()
+        os._exit(1)
+    return os.getpid()
+
+
+@image_cached_datatype
+def blank_image(width: int) -> Image:
+    return ImageLibrary.new("RGB", (width, 2), "white")
+
+
+@image_cached_datatype
+def image_width(image: Image) -> int:
+    print(f"Image is {image.width} wide")
+    return image.width
+
+
+@image_cached_datatype
+def image_holder_pid(image: Image, seconds: float) -> int:
+    """Returns the id of the process it got the image in after sleeping a while"""
+    time.sleep(seconds)
+    return os.getpid()
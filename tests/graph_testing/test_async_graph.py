@@ -299,5 +299,84 @@ async def test_async_execution_with_error():
         assert "Cannot divide by zero" in node1_error["terminalOutput"]
 
 
+@pytest.mark.asyncio
+async def test_fan_out_branches_execute_concurrently():
+    """Independent downstream branches should run at the same time, so wall time
+    follows the critical path instead of the sum of the node times."""
+    source = node_from_schema("source", schema_add)
+    source.data.arguments["a"].value = 2
+    source.data.arguments["b"].value = 1
+
+    branches = []
+    edges = []
+    for i in range(4):
+        branch = node_from_schema(
+            f"branch{i}", schema_multiply, position={"x": 200, "y": i * 100}
+        )
+        branch.data.arguments["x"].value = None
+        branch.data.arguments["y"].value = i + 1
+        branches.append(branch)
+        edges.append(
+            Edge(
+                id=f"edge{i}",
+                source="source",
+                source_handle="source:outputs:return:handle",
+                target=f"branch{i}",
+                target_handle=f"branch{i}:inputs:x:handle",
+            )
+        )
+
+    graph = Graph(nodes=[source, *branches], edges=edges)
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        start_time = time.time()
+        response = await client.post(
+            "/execution_submit", json=graph.model_dump(by_alias=True)
+        )
+        execution_id = response.json()["execution_id"]
+
+        snapshots = await poll_execution_until_complete(client, execution_id)
+        elapsed = time.time() - start_time
+
+        final_updates = snapshots[-1]["nodeUpdates"]
+        for i in range(4):
+            branch_update = final_updates[f"branch{i}"]
+            assert branch_update["status"] == "executed"
+            assert branch_update["arguments"]["x"]["value"] == 3
+            assert branch_update["outputs"]["return"]["value"] == 3 * (i + 1)
+
+        # Sequential execution would take 0.3 + 4 * 0.3 = 1.5s
+        assert elapsed < 1.2
+
+
+@pytest.mark.asyncio
+async def test_cyclic_graph_is_rejected():
+    node1 = node_from_schema("node1", schema_add)
+    node2 = node_from_schema("node2", schema_add, position={"x": 200, "y": 0})
+    edges = [
+        Edge(
+            id=f"edge_{source}_{target}",
+            source=source,
+            source_handle=f"{source}:outputs:return:handle",
+            target=target,
+            target_handle=f"{target}:inputs:a:handle",
+        )
+        for source, target in [("node1", "node2"), ("node2", "node1")]
+    ]
+    graph = Graph(nodes=[node1, node2], edges=edges)
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/execution_submit", json=graph.model_dump(by_alias=True)
+        )
+
+    assert response.status_code == 400
+    assert "cycle" in response.json()["detail"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
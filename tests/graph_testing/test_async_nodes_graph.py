@@ -0,0 +1,174 @@
+"""
+Tests for async def nodes, which are awaited on the event loop instead of running in threads.
+"""
+
+import asyncio
+import inspect
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import result_cache
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.execution.exec_sync import router as sync_router
+from python_node_editor.schema import Edge, Graph
+from tests.assets.async_functions import (
+    failing_fetch,
+    fetch_value,
+    current_thread_name,
+    slow_fetch,
+)
+from tests.assets.graph_utils import node_from_schema
+
+_, schema_fetch, _, types_fetch = analyze_function(fetch_value)
+_, schema_thread, _, types_thread = analyze_function(current_thread_name)
+_, schema_failing, _, types_failing = analyze_function(failing_fetch)
+_, schema_slow, _, types_slow = analyze_function(slow_fetch)
+
+for schema, func, types in [
+    (schema_fetch, fetch_value, types_fetch),
+    (schema_thread, current_thread_name, types_thread),
+    (schema_failing, failing_fetch, types_failing),
+    (schema_slow, slow_fetch, types_slow),
+]:
+    server_module.CALLABLES[schema.callable_id] = func
+    server_module.TYPES.update(types)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Async Nodes", lifespan=lifespan)
+app.include_router(async_router)
+app.include_router(sync_router)
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+
+
+async def run_async(graph: Graph) -> dict:
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/execution_submit", json=graph.model_dump(by_alias=True)
+        )
+        execution_id = response.json()["execution_id"]
+
+        start_time = time.time()
+        while time.time() - start_time < 10:
+            data = (await client.get(f"/execution_update/{execution_id}")).json()
+            if data.get("status") == "complete":
+                return data
+            await asyncio.sleep(0.02)
+    raise TimeoutError(f"Execution {execution_id} did not complete")
+
+
+def test_async_functions_are_detected():
+    assert schema_fetch.is_async
+    # add_node_options keeps the function a coroutine function
+    assert schema_slow.is_async
+    assert inspect.iscoroutinefunction(slow_fetch)
+    assert schema_slow.name == "Slow Fetch"
+
+
+@pytest.mark.asyncio
+async def test_many_async_nodes_run_at_once():
+    nodes = []
+    for i in range(100):
+        node = node_from_schema(f"node{i}", schema_fetch, position={"x": 0, "y": i})
+        node.data.arguments["value"].value = i
+        node.data.arguments["delay"].value = 0.3
+        nodes.append(node)
+
+    start_time = time.time()
+    final = await run_async(Graph(nodes=nodes, edges=[]))
+    elapsed = time.time() - start_time
+
+    # With MAX_CONCURRENT_NODES threads this would take at least 100 / 8 * 0.3 seconds
+    assert elapsed < 1.5, f"Async nodes did not run concurrently ({elapsed:.2f}s)"
+    for i in range(100):
+        update = final["nodeUpdates"][f"node{i}"]
+        assert update["status"] == "executed"
+        assert update["outputs"]["return"]["value"] == i
+        assert update["terminalOutput"] == f"Fetching {i}\n"
+
+
+@pytest.mark.asyncio
+async def test_async_nodes_skip_the_thread_pool():
+    node1 = node_from_schema("node1", schema_thread)
+    node1.data.arguments["x"].value = 1
+
+    final = await run_async(Graph(nodes=[node1], edges=[]))
+    # The test's event loop runs in the main thread
+    assert final["nodeUpdates"]["node1"]["outputs"]["return"]["value"] == "MainThread"
+
+
+@pytest.mark.asyncio
+async def test_async_node_errors_are_formatted():
+    node1 = node_from_schema("node1", schema_failing)
+    node1.data.arguments["url"].value = "http://example.invalid"
+
+    final = await run_async(Graph(nodes=[node1], edges=[]))
+    update = final["nodeUpdates"]["node1"]
+    assert update["status"] == "error"
+    assert update["terminalOutput"].startswith("Requesting http://example.invalid\n")
+    assert "ConnectionError: Could not reach http://example.invalid" in update["terminalOutput"]
+    assert "call_with_capture_async" not in update["terminalOutput"]
+
+
+@pytest.mark.asyncio
+async def test_async_node_timeout():
+    node1 = node_from_schema("node1", schema_slow)
+    node1.data.arguments["delay"].value = 5.0
+
+    start_time = time.time()
+    final = await run_async(Graph(nodes=[node1], edges=[]))
+    assert time.time() - start_time < 1.0
+    assert final["nodeUpdates"]["node1"]["status"] == "error"
+    assert "TimeoutError" in final["nodeUpdates"]["node1"]["terminalOutput"]
+
+
+@pytest.mark.asyncio
+async def test_async_nodes_in_sync_execution():
+    node1 = node_from_schema("node1", schema_fetch)
+    node1.data.arguments["value"].value = 3
+    node1.data.arguments["delay"].value = 0.01
+
+    node2 = node_from_schema("node2", schema_fetch, position={"x": 200, "y": 0})
+    node2.data.arguments["value"].value = None
+    node2.data.arguments["delay"].value = 0.01
+
+    edge1 = Edge(
+        id="edge1",
+        source="node1",
+        source_handle="node1:outputs:return:handle",
+        target="node2",
+        target_handle="node2:inputs:value:handle",
+    )
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/graph_execute",
+            json=Graph(nodes=[node1, node2], edges=[edge1]).model_dump(by_alias=True),
+        )
+
+    updates = {
+        update["nodeId"]: update
+        for update in response.json()["updates"]
+        if "status" in update
+    }
+    assert updates["node2"]["status"] == "executed"
+    assert updates["node2"]["outputs"]["return"]["value"] == 3
@@ -0,0 +1,198 @@
+"""
+Tests for cancelling queued and running executions through /execution_cancel.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import process_pool, result_cache
+from python_node_editor.execution.exec_async import (
+    EXECUTIONS,
+    ExecutionState,
+    execute_graph_async,
+)
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.execution.scheduler import SCHEDULER
+from python_node_editor.schema import Edge, Graph
+from tests.assets.cancellable_functions import cooperative_wait, runaway_wait
+from tests.assets.graph_utils import node_from_schema
+
+ASSET_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "assets", "cancellable_functions.py"
+)
+
+_, schema_cooperative, _, types_cooperative = analyze_function(cooperative_wait)
+_, schema_runaway, _, types_runaway = analyze_function(runaway_wait)
+
+server_module.CALLABLES[schema_cooperative.callable_id] = cooperative_wait
+server_module.CALLABLES[schema_runaway.callable_id] = runaway_wait
+server_module.TYPES.update(types_cooperative)
+server_module.TYPES.update(types_runaway)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Execution Cancellation", lifespan=lifespan)
+app.include_router(async_router)
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+
+
+def chain_graph(schema, seconds: float) -> dict:
+    """A long running node followed by a node that should never run"""
+    node1 = node_from_schema("node1", schema)
+    node1.data.arguments["seconds"].value = seconds
+
+    node2 = node_from_schema("node2", schema, position={"x": 200, "y": 0})
+    node2.data.arguments["seconds"].value = None
+
+    edge1 = Edge(
+        id="edge1",
+        source="node1",
+        source_handle="node1:outputs:return:handle",
+        target="node2",
+        target_handle="node2:inputs:seconds:handle",
+    )
+    return Graph(nodes=[node1, node2], edges=[edge1]).model_dump(by_alias=True)
+
+
+async def wait_until_complete(client: httpx.AsyncClient, execution_id: str) -> dict:
+    start_time = time.time()
+    while time.time() - start_time < 10:
+        data = (await client.get(f"/execution_update/{execution_id}")).json()
+        if data.get("status") == "complete":
+            return data
+        await asyncio.sleep(0.02)
+    raise TimeoutError(f"Execution {execution_id} did not complete")
+
+
+async def wait_until_executing(client: httpx.AsyncClient, execution_id: str) -> None:
+    while True:
+        data = (await client.get(f"/execution_update/{execution_id}")).json()
+        node1 = data.get("nodeUpdates", {}).get("node1", {})
+        if node1.get("status") == "executing":
+            return
+        await asyncio.sleep(0.02)
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_execution():
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        submitted = await client.post(
+            "/execution_submit", json=chain_graph(schema_cooperative, 5.0)
+        )
+        execution_id = submitted.json()["execution_id"]
+        await wait_until_executing(client, execution_id)
+
+        start_time = time.time()
+        response = await client.post(f"/execution_cancel/{execution_id}")
+        assert response.json() == {"cancelled": True}
+
+        final = await wait_until_complete(client, execution_id)
+        assert time.time() - start_time < 1.0
+        assert final["cancelled"] is True
+        assert final["nodeUpdates"]["node1"]["status"] == "cancelled"
+        assert "node2" not in final["nodeUpdates"]
+
+        # Cancelling again is a no-op
+        response = await client.post(f"/execution_cancel/{execution_id}")
+        assert response.json() == {"cancelled": False}
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_execution(monkeypatch):
+    monkeypatch.setattr(SCHEDULER, "max_running", 1)
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        first = await client.post(
+            "/execution_submit", json=chain_graph(schema_cooperative, 5.0)
+        )
+        second = await client.post(
+            "/execution_submit", json=chain_graph(schema_cooperative, 0.1)
+        )
+        first_id = first.json()["execution_id"]
+        second_id = second.json()["execution_id"]
+
+        await client.post(f"/execution_cancel/{second_id}")
+        final = (await client.get(f"/execution_update/{second_id}")).json()
+        assert final["status"] == "complete"
+        assert final["cancelled"] is True
+        assert not final.get("nodeUpdates")
+
+        await client.post(f"/execution_cancel/{first_id}")
+        await wait_until_complete(client, first_id)
+
+
+@pytest.mark.asyncio
+async def test_cancel_execution_the_scheduler_did_not_start():
+    """Like the variants of a sweep, which are run by the sweep's own task"""
+    execution_id = "unscheduled"
+    EXECUTIONS[execution_id] = ExecutionState()
+    graph = Graph.model_validate(chain_graph(schema_cooperative, 5.0))
+    execution = asyncio.create_task(execute_graph_async(execution_id, graph))
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        await wait_until_executing(client, execution_id)
+        response = await client.post(f"/execution_cancel/{execution_id}")
+        assert response.json() == {"cancelled": True}
+
+        await asyncio.wait_for(execution, 1.0)
+        final = (await client.get(f"/execution_update/{execution_id}")).json()
+
+    assert final["cancelled"] is True
+    # node1 stopped early on its own, node2 is never launched
+    assert final["nodeUpdates"]["node2"]["status"] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_cancel_kills_runaway_worker(monkeypatch):
+    monkeypatch.setattr(process_pool, "CANCEL_GRACE_PERIOD", 0.2)
+    pool = process_pool.start_process_pool(1, [ASSET_PATH])
+
+    try:
+        (worker,) = pool._workers
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            submitted = await client.post(
+                "/execution_submit", json=chain_graph(schema_runaway, 60.0)
+            )
+            execution_id = submitted.json()["execution_id"]
+            await wait_until_executing(client, execution_id)
+
+            await client.post(f"/execution_cancel/{execution_id}")
+            final = await wait_until_complete(client, execution_id)
+            assert final["nodeUpdates"]["node1"]["status"] == "cancelled"
+
+        # The busy worker gets killed after the grace period and replaced
+        start_time = time.time()
+        while (
+            worker.process.is_alive() or worker in pool._workers
+        ) and time.time() - start_time < 5:
+            await asyncio.sleep(0.05)
+        assert not worker.process.is_alive()
+        assert len(pool._workers) == 1
+        assert pool._workers[0].process.is_alive()
+    finally:
+        process_pool.stop_process_pool()
@@ -0,0 +1,292 @@
+"""
+Tests for checkpointing executions to disk and resuming them, as if the server had restarted
+in between: the in-memory executions, sessions and large data cache are cleared before resuming.
+The result cache is turned off so that only the checkpoint decides what runs again.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+from PIL import Image
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import checkpoints, exec_async, result_cache, sessions
+from python_node_editor.execution.exec_async import EXECUTIONS
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.large_data.base import LARGE_DATA_CACHE
+from python_node_editor.schema import Edge, Graph
+from examples._custom_datatypes.cached_image import CachedImageDataModel
+from tests.assets.blur import blur_image
+from tests.assets.cache_functions import CALLS, FLAKY, counted_add, flaky_add, flaky_sum
+from tests.assets.graph_utils import node_from_schema
+from tests.assets.stream_functions import count_up, slow_sum
+
+_, schema_add, _, types_add = analyze_function(counted_add)
+_, schema_flaky, _, types_flaky = analyze_function(flaky_add)
+_, schema_blur, _, types_blur = analyze_function(blur_image)
+_, schema_count, _, types_count = analyze_function(count_up)
+_, schema_sum, _, types_sum = analyze_function(slow_sum)
+_, schema_flaky_sum, _, types_flaky_sum = analyze_function(flaky_sum)
+
+server_module.CALLABLES[schema_add.callable_id] = counted_add
+server_module.CALLABLES[schema_flaky.callable_id] = flaky_add
+server_module.CALLABLES[schema_blur.callable_id] = blur_image
+server_module.CALLABLES[schema_count.callable_id] = count_up
+server_module.CALLABLES[schema_sum.callable_id] = slow_sum
+server_module.CALLABLES[schema_flaky_sum.callable_id] = flaky_sum
+server_module.TYPES.update(types_add)
+server_module.TYPES.update(types_flaky)
+server_module.TYPES.update(types_blur)
+server_module.TYPES.update(types_count)
+server_module.TYPES.update(types_sum)
+server_module.TYPES.update(types_flaky_sum)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Checkpoints", lifespan=lifespan)
+app.include_router(async_router)
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(checkpoints, "CHECKPOINT_DIR", str(tmp_path))
+    CALLS["counted_add"] = 0
+    FLAKY["fail"] = True
+    yield str(tmp_path)
+    FLAKY["fail"] = False
+
+
+def restart_server():
+    EXECUTIONS.clear()
+    sessions.SESSIONS.clear()
+    LARGE_DATA_CACHE.clear()
+
+
+def chain_graph() -> dict:
+    """source -> middle -> flaky sink, the sink fails while FLAKY["fail"] is set"""
+    nodes = []
+    for node_id, x, schema in (
+        ("source", 0, schema_add),
+        ("middle", 200, schema_add),
+        ("sink", 400, schema_flaky),
+    ):
+        node = node_from_schema(node_id, schema, position={"x": x, "y": 0})
+        node.data.arguments["a"].value = 1 if node_id == "source" else None
+        node.data.arguments["b"].value = 10
+        nodes.append(node)
+
+    edges = [
+        Edge(
+            id=f"{source}-{target}",
+            source=source,
+            source_handle=f"{source}:outputs:return:handle",
+            target=target,
+            target_handle=f"{target}:inputs:a:handle",
+        )
+        for source, target in (("source", "middle"), ("middle", "sink"))
+    ]
+    return Graph(nodes=nodes, edges=edges).model_dump(by_alias=True)
+
+
+def image_graph(cache_key: str) -> dict:
+    """A blur of an uploaded image next to a flaky node that doesn't depend on it"""
+    blur = node_from_schema("blur", schema_blur)
+    blur.data.arguments["image"] = CachedImageDataModel(type="Image", cache_key=cache_key)
+    blur.data.arguments["radius"].value = 1
+
+    flaky = node_from_schema("flaky", schema_flaky, position={"x": 10, "y": 0})
+    flaky.data.arguments["a"].value = 1
+    flaky.data.arguments["b"].value = 2
+    return Graph(nodes=[blur, flaky], edges=[]).model_dump(by_alias=True)
+
+
+def stream_graph() -> dict:
+    """A generator streaming into a sum and into a flaky sum, all of its items are streamed"""
+    count = node_from_schema("count", schema_count)
+    count.data.arguments["n"].value = 5
+    count.data.arguments["delay"].value = 0
+    total = node_from_schema("total", schema_sum, position={"x": 200, "y": 0})
+    total.data.arguments["delay"].value = 0
+    flaky = node_from_schema("flaky", schema_flaky_sum, position={"x": 200, "y": 100})
+
+    edges = [
+        Edge(
+            id=f"count-{target}",
+            source="count",
+            source_handle="count:outputs:return:handle",
+            target=target,
+            target_handle=f"{target}:inputs:numbers:handle",
+        )
+        for target in ("total", "flaky")
+    ]
+    return Graph(nodes=[count, total, flaky], edges=edges).model_dump(by_alias=True)
+
+
+async def wait_for_completion(client: httpx.AsyncClient, execution_id: str) -> dict:
+    start_time = time.time()
+    while time.time() - start_time < 10:
+        data = (await client.get(f"/execution_update/{execution_id}")).json()
+        if data.get("status") == "complete":
+            return data["nodeUpdates"]
+        await asyncio.sleep(0.02)
+    raise TimeoutError(f"Execution {execution_id} did not complete")
+
+
+async def submit(client: httpx.AsyncClient, graph: dict, **params) -> tuple[str, dict]:
+    response = await client.post("/execution_submit", json=graph, params=params)
+    execution_id = response.json()["execution_id"]
+    return execution_id, await wait_for_completion(client, execution_id)
+
+
+@pytest.mark.asyncio
+async def test_resume_only_runs_the_nodes_that_did_not_complete(checkpoint_dir):
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        execution_id, updates = await submit(client, chain_graph())
+        assert updates["sink"]["status"] == "error"
+        assert CALLS["counted_add"] == 2
+
+        listed = (await client.get("/execution_checkpoints")).json()["checkpoints"]
+        assert listed == [
+            {"execution_id": execution_id, "status": "stopped", "completed_nodes": 2}
+        ]
+
+        restart_server()
+        FLAKY["fail"] = False
+
+        response = await client.post(f"/execution_resume/{execution_id}")
+        assert response.json() == {"execution_id": execution_id, "resumed_nodes": 2}
+        updates = await wait_for_completion(client, execution_id)
+
+    assert CALLS["counted_add"] == 2
+    assert updates["middle"]["status"] == "executed"
+    assert updates["sink"]["outputs"]["return"]["value"] == 31
+
+    # Nothing is left to resume once every node has executed
+    assert not os.path.exists(os.path.join(checkpoint_dir, execution_id))
+
+
+@pytest.mark.asyncio
+async def test_cached_values_are_checkpointed_with_their_hook(checkpoint_dir):
+    graph = image_graph("upload1")
+    # Serializing the graph puts its empty argument in the cache, so it's uploaded after
+    LARGE_DATA_CACHE["upload1"] = Image.new("RGB", (4, 3), "red")
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        execution_id, updates = await submit(client, graph, keep_going=True)
+        assert updates["blur"]["status"] == "executed"
+
+        # The uploaded image and the blurred one
+        data_files = os.listdir(os.path.join(checkpoint_dir, execution_id, "data"))
+        assert len(data_files) == 2
+        assert all(filename.endswith(".png") for filename in data_files)
+
+        restart_server()
+        FLAKY["fail"] = False
+
+        await client.post(f"/execution_resume/{execution_id}")
+        updates = await wait_for_completion(client, execution_id)
+
+    assert LARGE_DATA_CACHE["upload1"].size == (4, 3)
+    blurred = updates["blur"]["outputs"]["return"]
+    assert blurred["displayName"] == "Image(4x3, RGB)"
+    assert updates["flaky"]["outputs"]["return"]["value"] == 3
+
+
+@pytest.mark.asyncio
+async def test_resume_errors():
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        missing = await client.post("/execution_resume/unknown")
+        outside = await client.post("/execution_resume/..")
+
+    assert missing.status_code == 404
+    assert outside.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_resumed_generator_passes_on_its_items():
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        execution_id, updates = await submit(client, stream_graph(), keep_going=True)
+        assert updates["total"]["outputs"]["return"]["value"] == 10
+        assert updates["flaky"]["status"] == "error"
+
+        restart_server()
+        FLAKY["fail"] = False
+
+        response = await client.post(f"/execution_resume/{execution_id}")
+        assert response.json()["resumed_nodes"] == 2
+        updates = await wait_for_completion(client, execution_id)
+
+    # The generator doesn't run again, the flaky sum gets the items it collected
+    assert updates["flaky"]["outputs"]["return"]["value"] == 10
+
+
+@pytest.mark.asyncio
+async def test_cancel_while_finishing_the_checkpoint(monkeypatch, checkpoint_dir):
+    finish = checkpoints.Checkpoint.finish
+    finishing = {"started": False}
+
+    def slow_finish(self, finished_all_nodes):
+        finishing["started"] = True
+        time.sleep(0.3)
+        finish(self, finished_all_nodes)
+
+    monkeypatch.setattr(checkpoints.Checkpoint, "finish", slow_finish)
+    FLAKY["fail"] = False
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/execution_submit", json=chain_graph())
+        execution_id = response.json()["execution_id"]
+        while not finishing["started"]:
+            await asyncio.sleep(0.01)
+
+        response = await client.post(f"/execution_cancel/{execution_id}")
+        assert response.json() == {"cancelled": True}
+        updates = await wait_for_completion(client, execution_id)
+
+    assert updates["sink"]["outputs"]["return"]["value"] == 31
+    # The checkpoint was still finished, every node had executed
+    assert not os.path.exists(os.path.join(checkpoint_dir, execution_id))
+
+
+@pytest.mark.asyncio
+async def test_resumed_execution_outlives_the_cleanup_of_its_first_run(monkeypatch):
+    monkeypatch.setattr(exec_async, "EXECUTION_CLEANUP_DELAY", 0.2)
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        execution_id, _ = await submit(client, chain_graph())
+
+        # Resumed without a restart, while the first run's cleanup is still pending
+        monkeypatch.setattr(exec_async, "EXECUTION_CLEANUP_DELAY", 10)
+        FLAKY["fail"] = False
+        await client.post(f"/execution_resume/{execution_id}")
+        updates = await wait_for_completion(client, execution_id)
+        await asyncio.sleep(0.3)
+
+        assert execution_id in EXECUTIONS
+        response = await client.get(f"/execution_update/{execution_id}")
+        assert response.status_code == 200
+
+    assert updates["sink"]["outputs"]["return"]["value"] == 31
@@ -0,0 +1,47 @@
+"""
+Tests that terminal output is attributed to the right node when nodes run concurrently.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from python_node_editor.execution.exec_utils import call_with_capture
+
+
+def chatty(name: str, lines: int, barrier: threading.Barrier) -> str:
+    barrier.wait()
+    for i in range(lines):
+        print(f"{name} line {i}")
+        print(f"{name} warning {i}", file=sys.stderr)
+        time.sleep(0.001)
+    return name
+
+
+def test_concurrent_nodes_capture_their_own_output():
+    num_nodes = 8
+    barrier = threading.Barrier(num_nodes)
+
+    with ThreadPoolExecutor(max_workers=num_nodes) as pool:
+        futures = [
+            pool.submit(call_with_capture, chatty, [f"node{i}", 20, barrier], {})
+            for i in range(num_nodes)
+        ]
+        outcomes = [future.result() for future in futures]
+
+    for i, (success, result, terminal_output) in enumerate(outcomes):
+        assert success
+        assert result == f"node{i}"
+        lines = terminal_output.splitlines()
+        assert len(lines) == 40
+        assert all(line.startswith(f"node{i} ") for line in lines)
+
+
+def test_output_outside_nodes_is_not_captured(capsys):
+    success, _, terminal_output = call_with_capture(print, ["inside"], {})
+    print("outside")
+
+    assert success
+    assert terminal_output == "inside\n"
+    assert capsys.readouterr().out.endswith("outside\n")
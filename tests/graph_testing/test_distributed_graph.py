@@ -0,0 +1,273 @@
+"""
+Tests for distributed execution with pne-worker processes on localhost: the server runs in
+a thread with uvicorn and two workers register with it over HTTP.
+"""
+
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+from fastapi import FastAPI
+
+import python_node_editor.server as server_module
+import python_node_editor.execution.exec_async as async_module
+from python_node_editor.analysis.utils import analyze_file_structure
+from python_node_editor.execution import distributed, result_cache
+from python_node_editor.execution.distributed import REGISTRY
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.execution.worker import run_worker
+from python_node_editor.schema import Edge, Graph
+from tests.assets.graph_utils import node_from_schema
+
+ASSET_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "worker_functions.py")
+TOKEN = "test-token"
+
+function_schemas, callables, types = analyze_file_structure([ASSET_PATH])
+schemas = {schema.name: schema for schema in function_schemas}
+
+app = FastAPI(title="Test Distributed Execution")
+app.include_router(async_router)
+app.include_router(distributed.router)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def cluster():
+    """A server with two registered workers, yields its URL and the workers' processes"""
+    server_module.CALLABLES.update(callables)
+    server_module.TYPES.update(types)
+    original_token = distributed.WORKER_TOKEN
+    distributed.WORKER_TOKEN = TOKEN
+    original_result_cache = result_cache.RESULT_CACHE_ENABLED
+    result_cache.RESULT_CACHE_ENABLED = False
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(
+            target=run_worker,
+            args=(url, TOKEN, [ASSET_PATH]),
+            kwargs={"name": f"worker{i}"},
+            daemon=True,
+        )
+        for i in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+
+    start_time = time.time()
+    while len(REGISTRY.workers) < 2:
+        assert time.time() - start_time < 30, "Workers did not register"
+        time.sleep(0.1)
+
+    yield url, workers
+
+    for worker in workers:
+        worker.kill()
+        worker.join()
+    server.should_exit = True
+    server_thread.join()
+    REGISTRY.clear()
+    distributed.WORKER_TOKEN = original_token
+    result_cache.RESULT_CACHE_ENABLED = original_result_cache
+
+
+def execute(url: str, graph: Graph) -> dict:
+    with httpx.Client(base_url=url) as client:
+        response = client.post("/execution_submit", json=graph.model_dump(by_alias=True))
+        execution_id = response.json()["execution_id"]
+
+        start_time = time.time()
+        while time.time() - start_time < 30:
+            data = client.get(f"/execution_update/{execution_id}").json()
+            if data.get("status") == "complete":
+                return data["nodeUpdates"]
+            time.sleep(0.05)
+    raise TimeoutError(f"Execution {execution_id} did not complete")
+
+
+def test_workers_require_the_token(cluster):
+    url, _ = cluster
+    with httpx.Client(base_url=url) as client:
+        response = client.post(
+            "/worker_register",
+            json={"name": "intruder", "callableIds": []},
+            headers={"X-Worker-Token": "wrong"},
+        )
+    assert response.status_code == 403
+
+
+def test_independent_nodes_run_on_both_workers(cluster):
+    url, workers = cluster
+    nodes = []
+    for i in range(4):
+        node = node_from_schema(f"node{i}", schemas["running_pid"], position={"x": i, "y": 0})
+        node.data.arguments["seconds"].value = 0.5
+        nodes.append(node)
+
+    updates = execute(url, Graph(nodes=nodes, edges=[]))
+
+    pids = {updates[f"node{i}"]["outputs"]["return"]["value"] for i in range(4)}
+    assert pids == {worker.pid for worker in workers}
+
+
+def test_cached_values_stay_on_the_worker(cluster):
+    url, _ = cluster
+    source = node_from_schema("source", schemas["blank_image"])
+    source.data.arguments["width"].value = 7
+    sink = node_from_schema("sink", schemas["image_width"], position={"x": 200, "y": 0})
+    edge = Edge(
+        id="edge1",
+        source="source",
+        source_handle="source:outputs:return:handle",
+        target="sink",
+        target_handle="sink:inputs:image:handle",
+    )
+
+    updates = execute(url, Graph(nodes=[source, sink], edges=[edge]))
+
+    assert updates["source"]["outputs"]["return"]["displayName"] == "Image(7x2, RGB)"
+    assert updates["sink"]["outputs"]["return"]["value"] == 7
+    assert "Image is 7 wide" in updates["sink"]["terminalOutput"]
+    # The server knows the image is in a worker's store
+    assert any(worker.store_keys for worker in REGISTRY.workers.values())
+
+
+def fan_out_graph(consumers: int) -> Graph:
+    """An image used by several nodes that take a while each"""
+    source = node_from_schema("source", schemas["blank_image"])
+    source.data.arguments["width"].value = 1000
+    nodes = [source]
+    edges = []
+    for i in range(consumers):
+        node = node_from_schema(
+            f"node{i}", schemas["image_holder_pid"], position={"x": 200, "y": i}
+        )
+        node.data.arguments["seconds"].value = 0.3
+        nodes.append(node)
+        edges.append(
+            Edge(
+                id=f"edge{i}",
+                source="source",
+                source_handle="source:outputs:return:handle",
+                target=f"node{i}",
+                target_handle=f"node{i}:inputs:image:handle",
+            )
+        )
+    return Graph(nodes=nodes, edges=edges)
+
+
+def execute_with_transfers(url: str, graph: Graph) -> tuple[dict, dict]:
+    updates = execute(url, graph)
+    with httpx.Client(base_url=url) as client:
+        execution_ids = list(async_module.EXECUTIONS)
+        transfers = client.get(f"/execution_transfers/{execution_ids[-1]}").json()
+    return updates, transfers
+
+
+def test_nodes_wait_for_the_worker_holding_their_inputs(cluster, monkeypatch):
+    url, _ = cluster
+    monkeypatch.setattr(distributed, "LOCALITY_MIN_BYTES", 1000)
+    monkeypatch.setattr(distributed, "LOCALITY_WAIT", 30.0)
+
+    updates, transfers = execute_with_transfers(url, fan_out_graph(3))
+
+    # The image never left the worker that made it, even with the other worker idle
+    pids = {updates[f"node{i}"]["outputs"]["return"]["value"] for i in range(3)}
+    assert len(pids) == 1
+    assert transfers["nodes"] == 4
+    assert transfers["bytesReused"] >= 3 * 6000
+    assert transfers["bytesSent"] < 6000
+
+
+def test_busy_worker_is_bypassed_after_waiting(cluster, monkeypatch):
+    url, workers = cluster
+    monkeypatch.setattr(distributed, "LOCALITY_MIN_BYTES", 1000)
+    monkeypatch.setattr(distributed, "LOCALITY_WAIT", 0.1)
+
+    updates, transfers = execute_with_transfers(url, fan_out_graph(4))
+
+    # The other worker got the image sent once and took over part of the nodes
+    pids = {updates[f"node{i}"]["outputs"]["return"]["value"] for i in range(4)}
+    assert pids == {worker.pid for worker in workers}
+    assert 6000 < transfers["bytesSent"] < 2 * 6000
+
+
+def test_cancelled_nodes_are_given_up_on(cluster):
+    url, _ = cluster
+    nodes = []
+    for i in range(3):
+        node = node_from_schema(f"node{i}", schemas["running_pid"], position={"x": i, "y": 0})
+        node.data.arguments["seconds"].value = 1
+        nodes.append(node)
+
+    with httpx.Client(base_url=url) as client:
+        response = client.post(
+            "/execution_submit",
+            json=Graph(nodes=nodes, edges=[]).model_dump(by_alias=True),
+        )
+        execution_id = response.json()["execution_id"]
+
+        # Both workers are running a node and the third one is queued
+        start_time = time.time()
+        while not (REGISTRY.queue and all(w.task for w in REGISTRY.workers.values())):
+            assert time.time() - start_time < 10, "Nodes were not dispatched"
+            time.sleep(0.02)
+        running = [worker.task for worker in REGISTRY.workers.values()]
+
+        client.post(f"/execution_cancel/{execution_id}")
+        start_time = time.time()
+        while (data := client.get(f"/execution_update/{execution_id}").json()).get(
+            "status"
+        ) != "complete":
+            assert time.time() - start_time < 10, "Execution did not complete"
+            time.sleep(0.02)
+        updates = data["nodeUpdates"]
+
+    assert {update["status"] for update in updates.values()} == {"cancelled"}
+    # The queued node is dropped and the workers are told to stop theirs,
+    # once the cancelled nodes' tasks get to run
+    start_time = time.time()
+    while REGISTRY.queue:
+        assert time.time() - start_time < 1, "Queued node was not dropped"
+        time.sleep(0.02)
+    assert all(task.cancel_requested for task in running)
+
+    # The workers finish their nodes before the next test
+    start_time = time.time()
+    while any(worker.task is not None for worker in REGISTRY.workers.values()):
+        assert time.time() - start_time < 10, "Workers did not become idle"
+        time.sleep(0.05)
+
+
+def test_node_of_a_dead_worker_is_reassigned(cluster, monkeypatch, tmp_path):
+    url, workers = cluster
+    monkeypatch.setattr(distributed, "WORKER_TIMEOUT", 1.0)
+
+    node = node_from_schema("node1", schemas["dies_once"])
+    node.data.arguments["marker_path"].value = str(tmp_path / "died")
+
+    updates = execute(url, Graph(nodes=[node], edges=[]))
+
+    assert updates["node1"]["status"] == "executed"
+    survivors = [worker for worker in workers if worker.is_alive()]
+    assert len(survivors) == 1
+    assert updates["node1"]["outputs"]["return"]["value"] == survivors[0].pid
+    assert len(REGISTRY.workers) == 1
@@ -0,0 +1,89 @@
+"""
+Tests for the server-wide execution queue: executions beyond the number of worker slots
+wait in a FIFO queue with their position exposed, and a full queue rejects new submissions.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import result_cache
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.execution.scheduler import SCHEDULER
+from python_node_editor.schema import Graph
+from tests.assets.functions_with_delays import quick_power
+from tests.assets.graph_utils import node_from_schema
+
+_, schema_power, _, types_power = analyze_function(quick_power)
+
+server_module.CALLABLES[schema_power.callable_id] = quick_power
+server_module.TYPES.update(types_power)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Execution Queue", lifespan=lifespan)
+app.include_router(async_router)
+
+
+@pytest.fixture
+def single_slot(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(SCHEDULER, "max_running", 1)
+    monkeypatch.setattr(SCHEDULER, "max_queued", 1)
+
+
+def power_graph(exponent: int) -> dict:
+    node1 = node_from_schema("node1", schema_power)
+    node1.data.arguments["base"].value = 2
+    node1.data.arguments["exponent"].value = exponent
+    return Graph(nodes=[node1], edges=[]).model_dump(by_alias=True)
+
+
+async def wait_until_complete(client: httpx.AsyncClient, execution_id: str) -> dict:
+    start_time = time.time()
+    while time.time() - start_time < 5:
+        data = (await client.get(f"/execution_update/{execution_id}")).json()
+        if data.get("status") == "complete":
+            return data
+        await asyncio.sleep(0.02)
+    raise TimeoutError(f"Execution {execution_id} did not complete")
+
+
+@pytest.mark.asyncio
+async def test_executions_beyond_capacity_are_queued_then_rejected(single_slot):
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        first = (await client.post("/execution_submit", json=power_graph(2))).json()
+        second = (await client.post("/execution_submit", json=power_graph(3))).json()
+
+        rejected = await client.post("/execution_submit", json=power_graph(4))
+        assert rejected.status_code == 429
+        assert rejected.headers["retry-after"] == "1"
+
+        queued = (await client.get(f"/execution_update/{second['execution_id']}")).json()
+        assert queued["status"] == "queued"
+        assert queued["queuePosition"] == 1
+
+        first_final = await wait_until_complete(client, first["execution_id"])
+        second_final = await wait_until_complete(client, second["execution_id"])
+
+        assert first_final["nodeUpdates"]["node1"]["outputs"]["return"]["value"] == 4
+        assert second_final["nodeUpdates"]["node1"]["outputs"]["return"]["value"] == 8
+        assert "queuePosition" not in second_final
+
+        # The queue drained, so new submissions are accepted again
+        accepted = await client.post("/execution_submit", json=power_graph(5))
+        assert accepted.status_code == 200
+        await wait_until_complete(client, accepted.json()["execution_id"])
@@ -0,0 +1,124 @@
+"""
+Tests for fused execution of linear chains: the nodes of a chain run one after the other
+in a single thread, only the last one publishes its outputs, and every node still gets
+its own status, output and timing.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import result_cache
+from python_node_editor.execution.exec_async import EXECUTIONS
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.schema import Edge, Graph
+from tests.assets.fusion_functions import at_most, increment
+from tests.assets.graph_utils import node_from_schema
+
+_, schema_increment, _, types_increment = analyze_function(increment)
+_, schema_at_most, _, types_at_most = analyze_function(at_most)
+
+server_module.CALLABLES[schema_increment.callable_id] = increment
+server_module.CALLABLES[schema_at_most.callable_id] = at_most
+server_module.TYPES.update(types_increment)
+server_module.TYPES.update(types_at_most)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Fused Chains", lifespan=lifespan)
+app.include_router(async_router)
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+
+
+def chain_graph(*schemas) -> dict:
+    """The nodes in a row, each one's output going into the x argument of the next"""
+    nodes = []
+    edges = []
+    for i, schema in enumerate(schemas):
+        node = node_from_schema(f"node{i}", schema, position={"x": i * 200, "y": 0})
+        node.data.arguments["x"].value = 0 if i == 0 else None
+        if "limit" in node.data.arguments:
+            node.data.arguments["limit"].value = 1
+        nodes.append(node)
+        if i > 0:
+            edges.append(
+                Edge(
+                    id=f"edge{i}",
+                    source=f"node{i - 1}",
+                    source_handle=f"node{i - 1}:outputs:return:handle",
+                    target=f"node{i}",
+                    target_handle=f"node{i}:inputs:x:handle",
+                )
+            )
+    return Graph(nodes=nodes, edges=edges).model_dump(by_alias=True)
+
+
+async def execute(graph: dict, **params) -> tuple[str, dict]:
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/execution_submit", json=graph, params=params)
+        execution_id = response.json()["execution_id"]
+
+        start_time = time.time()
+        while time.time() - start_time < 10:
+            data = (await client.get(f"/execution_update/{execution_id}")).json()
+            if data.get("status") == "complete":
+                return execution_id, data["nodeUpdates"]
+            await asyncio.sleep(0.02)
+    raise TimeoutError(f"Execution {execution_id} did not complete")
+
+
+@pytest.mark.asyncio
+async def test_chain_runs_fused_in_one_thread():
+    graph = chain_graph(*[schema_increment] * 4)
+
+    execution_id, updates = await execute(graph, fuse=True)
+
+    assert updates["node3"]["outputs"]["return"]["value"] == 4
+    for i in range(3):
+        assert updates[f"node{i}"]["status"] == "executed"
+        assert updates[f"node{i}"]["fusedInto"] == f"node{i + 1}"
+        # Intermediate values aren't published, not even as the next node's input
+        assert "outputs" not in updates[f"node{i}"]
+        assert "arguments" not in updates[f"node{i + 1}"]
+    threads = {updates[f"node{i}"]["terminalOutput"] for i in range(4)}
+    assert len(threads) == 1
+    assert set(EXECUTIONS[execution_id]._node_timings) == {f"node{i}" for i in range(4)}
+
+
+@pytest.mark.asyncio
+async def test_error_in_chain_is_reported_on_its_node():
+    graph = chain_graph(schema_increment, schema_increment, schema_at_most, schema_increment)
+
+    _, updates = await execute(graph, fuse=True, keep_going=True)
+
+    assert updates["node1"]["fusedInto"] == "node2"
+    assert updates["node2"]["status"] == "error"
+    assert "ValueError: 2 is above 1" in updates["node2"]["terminalOutput"]
+    assert updates["node3"]["status"] == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_nodes_publish_their_outputs_without_fuse():
+    graph = chain_graph(*[schema_increment] * 3)
+
+    _, updates = await execute(graph)
+
+    assert [updates[f"node{i}"]["outputs"]["return"]["value"] for i in range(3)] == [1, 2, 3]
+    assert not any("fusedInto" in update for update in updates.values())
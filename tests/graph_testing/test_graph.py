@@ -137,3 +137,24 @@ def test_two_connected_nodes_execute():
     node2_update = result["updates"][2]
     assert node2_update["nodeId"] == "node2"
     assert node2_update["outputs"]["return"]["value"] == 16
+
+
+def test_cyclic_graph_is_rejected():
+    node1 = node_from_schema("node1", schema_add)
+    node2 = node_from_schema("node2", schema_multiply, position={"x": 200, "y": 0})
+    edges = [
+        Edge(
+            id=f"edge_{source}_{target}",
+            source=source,
+            source_handle=f"{source}:outputs:return:handle",
+            target=target,
+            target_handle=f"{target}:inputs:a:handle",
+        )
+        for source, target in [("node1", "node2"), ("node2", "node1")]
+    ]
+    graph = Graph(nodes=[node1, node2], edges=edges)
+
+    response = client.post("/graph_execute", json=graph.model_dump(by_alias=True))
+
+    assert response.status_code == 400
+    assert "cycle" in response.json()["detail"]
@@ -0,0 +1,104 @@
+import pytest
+
+from python_node_editor.execution.exec_utils import propagate_outputs
+from python_node_editor.execution.graph_index import GraphIndex
+from python_node_editor.schema import (
+    DataWrapper,
+    Edge,
+    Graph,
+    NodeDataFromFrontend,
+    NodeFromFrontend,
+    NodeUpdate,
+)
+
+
+def make_node(node_id: str, x: float = 0) -> NodeFromFrontend:
+    return NodeFromFrontend(
+        id=node_id,
+        position={"x": x, "y": 0},
+        data=NodeDataFromFrontend(
+            callable_id="test",
+            arguments={"a": DataWrapper(type="int", value=None)},
+            outputs={"return": DataWrapper(type="int")},
+        ),
+    )
+
+
+def make_edge(source: str, target: str) -> Edge:
+    return Edge(
+        id=f"{source}-{target}",
+        source=source,
+        source_handle=f"{source}:outputs:return:handle",
+        target=target,
+        target_handle=f"{target}:inputs:a:handle",
+    )
+
+
+def test_handles_are_parsed_once():
+    graph = Graph(nodes=[make_node("n1"), make_node("n2")], edges=[make_edge("n1", "n2")])
+    index = GraphIndex(graph)
+
+    (edge,) = index.outgoing["n1"]
+    assert edge.output_name == "return"
+    assert edge.argument_name == "a"
+    assert index.incoming["n2"] == (edge,)
+    assert index.incoming["n1"] == ()
+
+
+def test_ready_nodes_are_ordered_by_x_position():
+    """Dependencies come first, otherwise the leftmost node on the canvas goes first"""
+    graph = Graph(
+        nodes=[make_node("right", x=300), make_node("sink", x=0), make_node("left", x=100)],
+        edges=[make_edge("right", "sink")],
+    )
+
+    order = [node.id for node in GraphIndex(graph).topological_order()]
+    assert order == ["left", "right", "sink"]
+
+
+def test_long_chain_orders_without_recursion():
+    """A chain far deeper than the recursion limit orders correctly"""
+    num_nodes = 5000
+    nodes = [make_node(f"n{i}", x=num_nodes - i) for i in range(num_nodes)]
+    edges = [make_edge(f"n{i}", f"n{i + 1}") for i in range(num_nodes - 1)]
+
+    order = [node.id for node in GraphIndex(Graph(nodes=nodes, edges=edges)).topological_order()]
+    assert order == [f"n{i}" for i in range(num_nodes)]
+
+
+def test_cycles_are_rejected():
+    graph = Graph(
+        nodes=[make_node("n1"), make_node("n2")],
+        edges=[make_edge("n1", "n2"), make_edge("n2", "n1")],
+    )
+
+    with pytest.raises(ValueError):
+        GraphIndex(graph).topological_order()
+
+
+def test_propagate_outputs_sets_downstream_arguments():
+    graph = Graph(
+        nodes=[make_node("n1"), make_node("n2"), make_node("n3")],
+        edges=[make_edge("n1", "n2"), make_edge("n1", "n3")],
+    )
+    index = GraphIndex(graph)
+
+    node_update = NodeUpdate(
+        node_id="n1",
+        status="executed",
+        outputs={"return": DataWrapper(type="int", value=7)},
+    )
+    downstream_updates = propagate_outputs(index, node_update)
+
+    assert [update.node_id for update in downstream_updates] == ["n2", "n3"]
+    assert index.nodes["n2"].data.arguments["a"].value == 7
+    assert index.nodes["n3"].data.arguments["a"].value == 7
+
+
+def test_downstream_closure():
+    graph = Graph(
+        nodes=[make_node(f"n{i}") for i in range(4)],
+        edges=[make_edge("n0", "n1"), make_edge("n1", "n2")],
+    )
+
+    assert GraphIndex(graph).downstream_closure({"n1"}) == {"n1", "n2"}
@@ -0,0 +1,170 @@
+"""
+Tests for incremental re-execution of graphs resubmitted within a session.
+The result cache is turned off so that only the session state decides what runs again.
+"""
+
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import result_cache, sessions
+from python_node_editor.execution.exec_sync import router as graph_router
+from python_node_editor.schema import Edge, Graph
+from tests.assets.cache_functions import CALLS, counted_add
+from tests.assets.graph_utils import node_from_schema
+from tests.assets.mutation_functions import append_every_time, make_numbers
+
+_, schema_add, _, types_add = analyze_function(counted_add)
+_, schema_numbers, _, types_numbers = analyze_function(make_numbers)
+_, schema_append, _, types_append = analyze_function(append_every_time)
+
+server_module.CALLABLES[schema_add.callable_id] = counted_add
+server_module.CALLABLES[schema_numbers.callable_id] = make_numbers
+server_module.CALLABLES[schema_append.callable_id] = append_every_time
+server_module.TYPES.update(types_add)
+server_module.TYPES.update(types_numbers)
+server_module.TYPES.update(types_append)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Python Node Editor - Incremental", lifespan=lifespan)
+app.include_router(graph_router)
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def fresh_sessions(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    sessions.SESSIONS.clear()
+    CALLS["counted_add"] = 0
+    yield
+    sessions.SESSIONS.clear()
+
+
+def diamond_graph(source_b: int = 1, sink_b: int = 100) -> Graph:
+    """source feeds left and right, which both feed sink"""
+    source = node_from_schema("source", schema_add)
+    source.data.arguments["a"].value = 1
+    source.data.arguments["b"].value = source_b
+
+    left = node_from_schema("left", schema_add, position={"x": 200, "y": 0})
+    left.data.arguments["a"].value = None
+    left.data.arguments["b"].value = 10
+
+    right = node_from_schema("right", schema_add, position={"x": 200, "y": 100})
+    right.data.arguments["a"].value = None
+    right.data.arguments["b"].value = 20
+
+    sink = node_from_schema("sink", schema_add, position={"x": 400, "y": 0})
+    sink.data.arguments["a"].value = None
+    sink.data.arguments["b"].value = sink_b
+
+    def edge(source_id: str, target_id: str, argument: str) -> Edge:
+        return Edge(
+            id=f"{source_id}-{target_id}",
+            source=source_id,
+            source_handle=f"{source_id}:outputs:return:handle",
+            target=target_id,
+            target_handle=f"{target_id}:inputs:{argument}:handle",
+        )
+
+    return Graph(
+        nodes=[source, left, right, sink],
+        edges=[
+            edge("source", "left", "a"),
+            edge("source", "right", "a"),
+            edge("left", "sink", "a"),
+        ],
+    )
+
+
+def execute(graph: Graph, session_id: str | None = "session1") -> dict:
+    params = {"session_id": session_id} if session_id else {}
+    response = client.post(
+        "/graph_execute", json=graph.model_dump(by_alias=True), params=params
+    )
+    assert response.status_code == 200
+    return {
+        update["nodeId"]: update
+        for update in response.json()["updates"]
+        if "status" in update
+    }
+
+
+def test_unchanged_resubmit_executes_nothing():
+    execute(diamond_graph())
+    assert CALLS["counted_add"] == 4
+
+    updates = execute(diamond_graph())
+    assert CALLS["counted_add"] == 4
+    assert updates["sink"]["status"] == "executed"
+    assert updates["sink"]["outputs"]["return"]["value"] == 112
+
+
+def test_sink_change_only_reruns_sink():
+    execute(diamond_graph())
+    updates = execute(diamond_graph(sink_b=200))
+
+    assert CALLS["counted_add"] == 5
+    assert updates["sink"]["outputs"]["return"]["value"] == 212
+    assert updates["right"]["outputs"]["return"]["value"] == 22
+
+
+def test_source_change_reruns_downstream_closure():
+    execute(diamond_graph())
+    updates = execute(diamond_graph(source_b=2))
+
+    assert CALLS["counted_add"] == 8
+    assert updates["sink"]["outputs"]["return"]["value"] == 113
+
+
+def test_edge_change_reruns_target():
+    execute(diamond_graph())
+
+    graph = diamond_graph()
+    graph.edges[2].source = "right"
+    graph.edges[2].source_handle = "right:outputs:return:handle"
+    updates = execute(graph)
+
+    assert CALLS["counted_add"] == 5
+    assert updates["sink"]["outputs"]["return"]["value"] == 122
+
+
+def test_sessions_are_independent():
+    execute(diamond_graph(), session_id="session1")
+    execute(diamond_graph(), session_id="session2")
+    execute(diamond_graph(), session_id=None)
+
+    assert CALLS["counted_add"] == 12
+
+
+def test_reused_outputs_are_not_changed_by_downstream_nodes():
+    numbers = node_from_schema("numbers", schema_numbers)
+    numbers.data.arguments["n"].value = 3
+    append = node_from_schema("append", schema_append, position={"x": 200, "y": 0})
+    append.data.arguments["numbers"].value = None
+    edge = Edge(
+        id="edge1",
+        source="numbers",
+        source_handle="numbers:outputs:return:handle",
+        target="append",
+        target_handle="append:inputs:numbers:handle",
+    )
+    graph = Graph(nodes=[numbers, append], edges=[edge])
+
+    # numbers is reused every time after the first, append always runs
+    for _ in range(3):
+        updates = execute(graph)
+        assert updates["append"]["outputs"]["return"]["value"] == 4
+
+    reused = sessions.SESSIONS["session1"].node_updates["numbers"]
+    assert reused.outputs["return"].value == [0, 1, 2]
@@ -0,0 +1,142 @@
+"""
+Tests for the keep_going policy: a failed node only skips its downstream closure
+while every independent branch still executes.
+The result cache is turned off so that only the session state decides what runs again.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import result_cache, sessions
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.execution.exec_sync import router as sync_router
+from python_node_editor.schema import Edge, Graph
+from tests.assets.cache_functions import CALLS, counted_add
+from tests.assets.graph_utils import node_from_schema
+
+_, schema_add, _, types_add = analyze_function(counted_add)
+
+server_module.CALLABLES[schema_add.callable_id] = counted_add
+server_module.TYPES.update(types_add)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Keep Going", lifespan=lifespan)
+app.include_router(sync_router)
+app.include_router(async_router)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    sessions.SESSIONS.clear()
+    CALLS["counted_add"] = 0
+
+
+def two_branch_graph(bad_a: int | None = None) -> dict:
+    """bad -> after_bad and good -> after_good, bad fails unless bad_a is given"""
+    nodes = []
+    for node_id, x, a in (
+        ("bad", 0, bad_a),
+        ("good", 10, 1),
+        ("after_bad", 200, None),
+        ("after_good", 210, None),
+    ):
+        node = node_from_schema(node_id, schema_add, position={"x": x, "y": 0})
+        node.data.arguments["a"].value = a
+        node.data.arguments["b"].value = 1
+        nodes.append(node)
+
+    edges = [
+        Edge(
+            id=f"{source}-{target}",
+            source=source,
+            source_handle=f"{source}:outputs:return:handle",
+            target=target,
+            target_handle=f"{target}:inputs:a:handle",
+        )
+        for source, target in (("bad", "after_bad"), ("good", "after_good"))
+    ]
+    return Graph(nodes=nodes, edges=edges).model_dump(by_alias=True)
+
+
+async def execute_sync(client: httpx.AsyncClient, graph: dict, **params) -> dict:
+    response = await client.post("/graph_execute", json=graph, params=params)
+    assert response.status_code == 200
+    return {
+        update["nodeId"]: update
+        for update in response.json()["updates"]
+        if "status" in update
+    }
+
+
+async def execute_async(client: httpx.AsyncClient, graph: dict, **params) -> dict:
+    response = await client.post("/execution_submit", json=graph, params=params)
+    execution_id = response.json()["execution_id"]
+
+    start_time = time.time()
+    while time.time() - start_time < 10:
+        data = (await client.get(f"/execution_update/{execution_id}")).json()
+        if data.get("status") == "complete":
+            return data["nodeUpdates"]
+        await asyncio.sleep(0.02)
+    raise TimeoutError(f"Execution {execution_id} did not complete")
+
+
+@pytest.mark.asyncio
+async def test_sync_stops_at_first_error_by_default():
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        updates = await execute_sync(client, two_branch_graph())
+
+    assert updates["bad"]["status"] == "error"
+    assert "good" not in updates
+    assert "after_bad" not in updates
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("execute", [execute_sync, execute_async])
+async def test_keep_going_finishes_independent_branches(execute):
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        updates = await execute(client, two_branch_graph(), keep_going=True)
+
+    assert updates["bad"]["status"] == "error"
+    assert updates["after_bad"]["status"] == "skipped"
+    assert "bad" in updates["after_bad"]["terminalOutput"]
+    assert updates["after_good"]["status"] == "executed"
+    assert updates["after_good"]["outputs"]["return"]["value"] == 3
+
+
+@pytest.mark.asyncio
+async def test_rerun_after_fix_reuses_finished_branches():
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        await execute_async(
+            client, two_branch_graph(), keep_going=True, session_id="session1"
+        )
+        assert CALLS["counted_add"] == 3
+
+        updates = await execute_async(
+            client, two_branch_graph(bad_a=5), keep_going=True, session_id="session1"
+        )
+
+    # Only the fixed branch runs again
+    assert CALLS["counted_add"] == 5
+    assert updates["after_bad"]["outputs"]["return"]["value"] == 7
+    assert updates["after_good"]["status"] == "executed"
@@ -0,0 +1,116 @@
+"""
+Tests for streaming the terminal output of nodes while they are still running.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import capture, exec_async, process_pool, result_cache
+from python_node_editor.execution.capture import LiveOutput
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.schema import Graph
+from tests.assets.graph_utils import node_from_schema
+from tests.assets.progress_functions import report_progress
+
+ASSET_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "assets", "progress_functions.py"
+)
+
+_, schema_progress, _, types_progress = analyze_function(report_progress)
+
+server_module.CALLABLES[schema_progress.callable_id] = report_progress
+server_module.TYPES.update(types_progress)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Live Terminal Output", lifespan=lifespan)
+app.include_router(async_router)
+
+
+@pytest.fixture(autouse=True)
+def fast_output_push(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(exec_async, "OUTPUT_PUSH_INTERVAL", 0.05)
+
+
+def progress_graph(steps: int, interval: float) -> dict:
+    node1 = node_from_schema("node1", schema_progress)
+    node1.data.arguments["steps"].value = steps
+    node1.data.arguments["interval"].value = interval
+    return Graph(nodes=[node1], edges=[]).model_dump(by_alias=True)
+
+
+async def collect_live_output(graph: dict) -> tuple[list[str], dict]:
+    """Polls an execution until it completes, returning the output chunks
+    received while the node was running and the final state"""
+    chunks = []
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/execution_submit", json=graph)
+        execution_id = response.json()["execution_id"]
+
+        start_time = time.time()
+        while time.time() - start_time < 10:
+            data = (await client.get(f"/execution_update/{execution_id}")).json()
+            node1 = data.get("nodeUpdates", {}).get("node1", {})
+            if "newTerminalOutput" in node1:
+                assert node1["status"] == "executing"
+                chunks.append(node1["newTerminalOutput"])
+            if data.get("status") == "complete":
+                return chunks, data
+            await asyncio.sleep(0.02)
+    raise TimeoutError(f"Execution {execution_id} did not complete")
+
+
+def assert_streamed_in_order(chunks: list[str], final: dict, steps: int):
+    # Output arrived in several pieces while the node ran, each line exactly once
+    assert len(chunks) > 1
+    streamed = "".join(chunks)
+    assert streamed == "".join(f"step {step}\n" for step in range(len(streamed.splitlines())))
+
+    node1 = final["nodeUpdates"]["node1"]
+    assert node1["status"] == "executed"
+    assert node1["terminalOutput"] == "".join(f"step {step}\n" for step in range(steps))
+    assert "newTerminalOutput" not in node1
+
+
+@pytest.mark.asyncio
+async def test_output_streams_while_node_runs():
+    chunks, final = await collect_live_output(progress_graph(8, 0.1))
+    assert_streamed_in_order(chunks, final, 8)
+
+
+@pytest.mark.asyncio
+async def test_output_streams_from_worker_process():
+    process_pool.start_process_pool(1, [ASSET_PATH])
+    try:
+        chunks, final = await collect_live_output(progress_graph(8, 0.1))
+        assert_streamed_in_order(chunks, final, 8)
+    finally:
+        process_pool.stop_process_pool()
+
+
+def test_live_output_is_bounded(monkeypatch):
+    monkeypatch.setattr(capture, "MAX_LIVE_OUTPUT", 10)
+
+    live_output = LiveOutput()
+    for i in range(10):
+        live_output.write(f"line {i}\n")
+
+    assert live_output.drain() == "[... 60 characters skipped ...]\n 8\nline 9\n"
+    assert not live_output.pending
+    assert live_output.drain() == ""
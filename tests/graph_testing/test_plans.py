@@ -0,0 +1,121 @@
+"""
+Tests for compiling graphs into execution plans and caching them by structure hash.
+"""
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution.graph_index import GraphIndex
+from python_node_editor.execution.plans import PLANS, clear_plans, get_plan
+from python_node_editor.schema import DataWrapper, Edge, Graph
+from tests.assets.cache_functions import counted_add
+from tests.assets.graph_utils import node_from_schema
+from tests.assets.stream_functions import count_up, slow_sum
+
+_, schema_add, _, types_add = analyze_function(counted_add)
+_, schema_count, _, types_count = analyze_function(count_up)
+_, schema_sum, _, types_sum = analyze_function(slow_sum)
+
+server_module.CALLABLES[schema_add.callable_id] = counted_add
+server_module.CALLABLES[schema_count.callable_id] = count_up
+server_module.CALLABLES[schema_sum.callable_id] = slow_sum
+server_module.TYPES.update(types_add)
+server_module.TYPES.update(types_count)
+server_module.TYPES.update(types_sum)
+
+
+def chain_graph(b: int = 2, sink_x: float = 200) -> Graph:
+    source = node_from_schema("source", schema_add)
+    source.data.arguments["a"].value = 1
+    source.data.arguments["b"].value = b
+
+    sink = node_from_schema("sink", schema_add, position={"x": sink_x, "y": 0})
+    sink.data.arguments["a"].value = None
+    sink.data.arguments["b"].value = 10
+
+    edge = Edge(
+        id="edge1",
+        source="source",
+        source_handle="source:outputs:return:handle",
+        target="sink",
+        target_handle="sink:inputs:a:handle",
+    )
+    return Graph(nodes=[source, sink], edges=[edge])
+
+
+def test_same_structure_with_new_values_reuses_the_plan():
+    clear_plans()
+    plan = get_plan(chain_graph(b=2))
+
+    assert get_plan(chain_graph(b=5)) is plan
+    assert len(PLANS) == 1
+    assert plan.order == ("source", "sink")
+    assert plan.output_hints["sink"]["return"] == ("int", DataWrapper)
+
+
+def test_structure_changes_get_a_new_plan():
+    clear_plans()
+    plan = get_plan(chain_graph())
+
+    moved = get_plan(chain_graph(sink_x=-100))
+    unwired = chain_graph()
+    unwired.edges = []
+
+    assert moved is not plan
+    assert get_plan(unwired).incoming["sink"] == ()
+    assert len(PLANS) == 3
+
+
+def test_replaced_callable_is_planned_again():
+    clear_plans()
+    plan = get_plan(chain_graph())
+
+    def replacement(a: int, b: int) -> int:
+        return a * b
+
+    server_module.CALLABLES[schema_add.callable_id] = replacement
+    try:
+        replanned = get_plan(chain_graph())
+    finally:
+        server_module.CALLABLES[schema_add.callable_id] = counted_add
+
+    assert replanned is not plan
+    assert replanned.callables[schema_add.callable_id] is replacement
+
+
+def test_plan_knows_stream_edges():
+    producer = node_from_schema("producer", schema_count)
+    consumer = node_from_schema("consumer", schema_sum, position={"x": 200, "y": 0})
+    edge = Edge(
+        id="edge1",
+        source="producer",
+        source_handle="producer:outputs:return:handle",
+        target="consumer",
+        target_handle="consumer:inputs:numbers:handle",
+    )
+    index = GraphIndex(Graph(nodes=[producer, consumer], edges=[edge]))
+
+    assert index.plan.generator_nodes == {"producer"}
+    assert index.plan.stream_edges == set(index.outgoing["producer"])
+
+
+def test_plan_finds_linear_chains():
+    # a -> b -> c, then c fans out to d and e
+    nodes = [
+        node_from_schema(node_id, schema_add, position={"x": x, "y": 0})
+        for x, node_id in enumerate("abcde")
+    ]
+    wiring = [("a", "b"), ("b", "c"), ("c", "d"), ("c", "e")]
+    edges = [
+        Edge(
+            id=f"{source}{target}",
+            source=source,
+            source_handle=f"{source}:outputs:return:handle",
+            target=target,
+            target_handle=f"{target}:inputs:a:handle",
+        )
+        for source, target in wiring
+    ]
+
+    plan = get_plan(Graph(nodes=nodes, edges=edges))
+
+    assert plan.chains == {"a": ("a", "b", "c")}
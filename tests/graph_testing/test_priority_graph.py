@@ -0,0 +1,156 @@
+"""
+Tests for the priority classes of executions: interactive executions are served before batch
+ones and don't wait for running batch executions, while batch work that waited too long
+still gets its turn.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import result_cache, scheduler
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.execution.scheduler import SCHEDULER, ExecutionScheduler
+from python_node_editor.schema import Edge, Graph
+from tests.assets.functions_with_delays import quick_add
+from tests.assets.graph_utils import node_from_schema
+
+_, schema_add, _, types_add = analyze_function(quick_add)
+
+server_module.CALLABLES[schema_add.callable_id] = quick_add
+server_module.TYPES.update(types_add)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Execution Priorities", lifespan=lifespan)
+app.include_router(async_router)
+
+
+@pytest.fixture
+def single_slot(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(SCHEDULER, "max_running", 1)
+
+
+def chain_graph(length: int) -> dict:
+    """quick_add nodes in a row, each one adding 1 to the previous result"""
+    nodes = []
+    edges = []
+    for i in range(length):
+        node = node_from_schema(f"node{i}", schema_add, position={"x": i * 200, "y": 0})
+        node.data.arguments["a"].value = 0 if i == 0 else None
+        node.data.arguments["b"].value = 1
+        nodes.append(node)
+        if i > 0:
+            edges.append(
+                Edge(
+                    id=f"edge{i}",
+                    source=f"node{i - 1}",
+                    source_handle=f"node{i - 1}:outputs:return:handle",
+                    target=f"node{i}",
+                    target_handle=f"node{i}:inputs:a:handle",
+                )
+            )
+    return Graph(nodes=nodes, edges=edges).model_dump(by_alias=True)
+
+
+async def wait_until_complete(client: httpx.AsyncClient, execution_id: str) -> dict:
+    start_time = time.time()
+    while time.time() - start_time < 10:
+        data = (await client.get(f"/execution_update/{execution_id}")).json()
+        if data.get("status") == "complete":
+            return data
+        await asyncio.sleep(0.02)
+    raise TimeoutError(f"Execution {execution_id} did not complete")
+
+
+@pytest.mark.asyncio
+async def test_interactive_execution_does_not_wait_for_batch(single_slot):
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        batch = await client.post(
+            "/execution_submit", json=chain_graph(4), params={"priority": "batch"}
+        )
+        batch_id = batch.json()["execution_id"]
+        await asyncio.sleep(0.1)
+
+        started_at = time.perf_counter()
+        edit = await client.post("/execution_submit", json=chain_graph(1))
+        edit_id = edit.json()["execution_id"]
+
+        depths = (await client.get("/execution_queue")).json()
+        assert depths == {
+            "interactive": {"running": 1, "queued": 0},
+            "batch": {"running": 1, "queued": 0},
+        }
+
+        edit_final = await wait_until_complete(client, edit_id)
+        edit_seconds = time.perf_counter() - started_at
+
+        # The batch execution held back its next node while the edit ran
+        batch_state = (await client.get(f"/execution_update/{batch_id}")).json()
+        assert batch_state["status"] == "running"
+        assert "node2" not in batch_state["nodeUpdates"]
+
+        batch_final = await wait_until_complete(client, batch_id)
+
+    assert edit_final["nodeUpdates"]["node0"]["outputs"]["return"]["value"] == 1
+    assert edit_seconds < 1
+    assert batch_final["nodeUpdates"]["node3"]["outputs"]["return"]["value"] == 4
+
+
+async def run_jobs(jobs: list[tuple[str, str]]) -> tuple[list[str], list[str]]:
+    """Submits jobs (name, priority) to a scheduler with one slot, returns the
+    queue right after submitting them and the order they started in"""
+    job_scheduler = ExecutionScheduler(max_running=1)
+    started = []
+    finished = asyncio.Event()
+
+    def job(name: str):
+        async def run():
+            started.append(name)
+            await asyncio.sleep(0.01)
+            if len(started) == len(jobs):
+                finished.set()
+
+        return run
+
+    for name, priority in jobs:
+        job_scheduler.submit(name, job(name), priority)
+    queued = job_scheduler.queued_ids()
+
+    await asyncio.wait_for(finished.wait(), timeout=5)
+    return queued, started
+
+
+@pytest.mark.asyncio
+async def test_queued_interactive_executions_go_first():
+    queued, started = await run_jobs(
+        [("first", "interactive"), ("report", "batch"), ("edit", "interactive")]
+    )
+
+    assert queued == ["edit", "report"]
+    assert started == ["first", "edit", "report"]
+
+
+@pytest.mark.asyncio
+async def test_batch_execution_that_waited_too_long_goes_first(monkeypatch):
+    monkeypatch.setattr(scheduler, "BATCH_MAX_WAIT", 0)
+
+    _, started = await run_jobs(
+        [("first", "interactive"), ("report", "batch"), ("edit", "interactive")]
+    )
+
+    assert started == ["first", "report", "edit"]
@@ -0,0 +1,122 @@
+"""
+Tests for the process pool execution backend.
+These tests start real worker processes that analyze the test assets on startup,
+and verify that nodes run outside the server process with their terminal output intact.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import process_pool, result_cache
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.schema import Edge, Graph
+from tests.assets.graph_utils import node_from_schema
+from tests.assets.process_functions import count_primes, worker_pid
+
+ASSET_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "process_functions.py")
+
+_, schema_pid, _, types_pid = analyze_function(worker_pid)
+_, schema_primes, _, types_primes = analyze_function(count_primes)
+
+server_module.CALLABLES[schema_pid.callable_id] = worker_pid
+server_module.CALLABLES[schema_primes.callable_id] = count_primes
+server_module.TYPES.update(types_pid)
+server_module.TYPES.update(types_primes)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Process Pool Python Node Editor", lifespan=lifespan)
+app.include_router(async_router)
+
+
+@pytest.fixture
+def worker_pool():
+    # Make sure every node actually goes to a worker instead of being a cache hit
+    result_cache.clear_result_cache()
+    pool = process_pool.start_process_pool(2, [ASSET_PATH])
+    yield pool
+    process_pool.stop_process_pool()
+
+
+async def run_graph(graph: Graph, timeout: float = 30.0) -> dict:
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/execution_submit", json=graph.model_dump(by_alias=True)
+        )
+        execution_id = response.json()["execution_id"]
+
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            data = (await client.get(f"/execution_update/{execution_id}")).json()
+            if data.get("status") == "complete":
+                return data
+            await asyncio.sleep(0.05)
+
+    raise TimeoutError(f"Execution {execution_id} did not complete within {timeout}s")
+
+
+@pytest.mark.asyncio
+async def test_nodes_run_in_worker_processes(worker_pool):
+    """Nodes should execute in a worker process and still report their printed output"""
+    node1 = node_from_schema("node1", schema_pid)
+    node1.data.arguments["x"].value = 1
+
+    final = await run_graph(Graph(nodes=[node1], edges=[]))
+
+    node1_update = final["nodeUpdates"]["node1"]
+    assert node1_update["status"] == "executed"
+
+    pid = node1_update["outputs"]["return"]["value"]
+    assert pid != os.getpid()
+    assert f"Running in process {pid} with input 1" in node1_update["terminalOutput"]
+
+
+@pytest.mark.asyncio
+async def test_results_cross_edges_between_workers(worker_pool):
+    """Outputs computed in one worker should feed nodes running in another"""
+    node1 = node_from_schema("node1", schema_primes)
+    node1.data.arguments["limit"].value = 100
+
+    node2 = node_from_schema("node2", schema_pid, position={"x": 200, "y": 0})
+    node2.data.arguments["x"].value = None
+
+    edge1 = Edge(
+        id="edge1",
+        source="node1",
+        source_handle="node1:outputs:return:handle",
+        target="node2",
+        target_handle="node2:inputs:x:handle",
+    )
+
+    final = await run_graph(Graph(nodes=[node1, node2], edges=[edge1]))
+
+    assert final["nodeUpdates"]["node1"]["outputs"]["return"]["value"] == 25
+    assert "with input 25" in final["nodeUpdates"]["node2"]["terminalOutput"]
+
+
+@pytest.mark.asyncio
+async def test_worker_errors_are_reported(worker_pool):
+    """Exceptions raised in a worker come back as a node error with the traceback"""
+    node1 = node_from_schema("node1", schema_primes)
+    node1.data.arguments["limit"].value = "not a number"
+
+    final = await run_graph(Graph(nodes=[node1], edges=[]))
+
+    node1_update = final["nodeUpdates"]["node1"]
+    assert node1_update["status"] == "error"
+    assert "TypeError" in node1_update["terminalOutput"]
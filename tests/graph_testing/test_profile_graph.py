@@ -0,0 +1,174 @@
+"""
+Tests for the performance profiles of executed nodes: every executed node's final update
+carries its profile, the execution's profiles are aggregated at /execution_profile and
+recent runs of every callable are summarized at /callable_profiles.
+"""
+
+import asyncio
+import pstats
+import tracemalloc
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import profiling, result_cache
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.execution.exec_sync import router as sync_router
+from python_node_editor.schema import Graph
+from tests.assets.graph_utils import node_from_schema
+from tests.assets.profile_functions import allocate, profiled_work, spin
+
+_, schema_spin, _, types_spin = analyze_function(spin)
+_, schema_allocate, _, types_allocate = analyze_function(allocate)
+_, schema_work, _, types_work = analyze_function(profiled_work)
+
+server_module.CALLABLES[schema_spin.callable_id] = spin
+server_module.CALLABLES[schema_allocate.callable_id] = allocate
+server_module.CALLABLES[schema_work.callable_id] = profiled_work
+server_module.TYPES.update(types_spin)
+server_module.TYPES.update(types_allocate)
+server_module.TYPES.update(types_work)
+
+app = FastAPI(title="Test Node Profiles")
+app.include_router(async_router)
+app.include_router(sync_router)
+
+
+def profiled_graph() -> dict:
+    spinner = node_from_schema("spinner", schema_spin)
+    spinner.data.arguments["seconds"].value = 0.2
+    allocator = node_from_schema("allocator", schema_allocate, position={"x": 0, "y": 200})
+    allocator.data.arguments["megabytes"].value = 20
+    return Graph(nodes=[spinner, allocator], edges=[]).model_dump(by_alias=True)
+
+
+async def execute_graph(client: httpx.AsyncClient, graph: dict) -> tuple[str, dict]:
+    response = await client.post("/execution_submit", json=graph)
+    execution_id = response.json()["execution_id"]
+    while True:
+        data = (await client.get(f"/execution_update/{execution_id}")).json()
+        if data.get("status") == "complete":
+            return execution_id, data["nodeUpdates"]
+        await asyncio.sleep(0.02)
+
+
+@pytest.fixture
+def trace_memory(monkeypatch):
+    monkeypatch.setattr(profiling, "TRACE_MEMORY", True)
+    yield
+    # Tracing slows down every allocation of the tests that follow
+    tracemalloc.stop()
+
+
+@pytest.mark.asyncio
+async def test_executed_nodes_carry_their_profile(monkeypatch, trace_memory):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        execution_id, updates = await execute_graph(client, profiled_graph())
+        profile = (await client.get(f"/execution_profile/{execution_id}")).json()
+
+    spinner = updates["spinner"]["profile"]
+    assert spinner["cpuSeconds"] >= 0.2
+    assert spinner["wallSeconds"] >= spinner["cpuSeconds"] * 0.9
+    assert spinner["outputBytes"] == len("Spinning\n")
+    assert spinner["serializationSeconds"] >= 0
+
+    allocator = updates["allocator"]["profile"]
+    assert allocator["peakMemoryBytes"] >= 20 * 1024 * 1024
+    assert allocator["cpuSeconds"] < allocator["wallSeconds"]
+
+    assert [node["nodeId"] for node in profile["nodes"]] == ["spinner", "allocator"]
+    # Nodes running at the same time share the peak, so the spinner may have seen it too
+    assert profile["totals"]["peakMemoryBytes"] == max(
+        spinner["peakMemoryBytes"], allocator["peakMemoryBytes"]
+    )
+    assert profile["totals"]["outputBytes"] == len("Spinning\n")
+
+
+@pytest.mark.asyncio
+async def test_callables_keep_rolling_stats(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(profiling, "ROLLING_WINDOW", 3)
+    profiling.clear_profiles()
+
+    graph = profiled_graph()
+    graph["nodes"][0]["data"]["arguments"]["seconds"]["value"] = 0.01
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        for _ in range(4):
+            await client.post("/graph_execute", json=graph)
+        stats = (await client.get("/callable_profiles")).json()
+
+    spin_stats = stats[schema_spin.callable_id]
+    assert spin_stats["name"] == "spin"
+    assert spin_stats["runs"] == 3
+    assert spin_stats["p50WallSeconds"] <= spin_stats["p95WallSeconds"]
+    # Memory is only traced when it's turned on
+    assert stats[schema_allocate.callable_id]["maxPeakMemoryBytes"] is None
+
+
+@pytest.mark.asyncio
+async def test_marked_callable_gets_a_call_profile(monkeypatch, tmp_path):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    work = node_from_schema("work", schema_work)
+    work.data.arguments["n"].value = 20000
+    graph = profiled_graph()
+    graph["nodes"].append(work.model_dump(by_alias=True))
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        _, updates = await execute_graph(client, graph)
+        call_profile_id = updates["work"]["profile"]["callProfileId"]
+        text = (await client.get(f"/call_profile/{call_profile_id}")).text
+        stats_file = await client.get(
+            f"/call_profile/{call_profile_id}", params={"format": "pstats"}
+        )
+        collapsed = await client.get(
+            f"/call_profile/{call_profile_id}", params={"format": "collapsed"}
+        )
+
+    # Only the marked callable was profiled
+    assert "callProfileId" not in updates["spinner"]["profile"]
+    assert "inner_loop" in text
+
+    path = tmp_path / "work.pstats"
+    path.write_bytes(stats_file.content)
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert {"profiled_work", "inner_loop"} <= functions
+    assert 'filename="profiled_work.pstats"' in stats_file.headers["content-disposition"]
+
+    # The sampled stacks start at the node's callable
+    stacks = [line.rsplit(" ", 1)[0] for line in collapsed.text.splitlines()]
+    assert stacks
+    assert all("execute_node" not in stack for stack in stacks)
+    assert any("profiled_work" in stack and "inner_loop" in stack for stack in stacks)
+
+
+@pytest.mark.asyncio
+async def test_execution_can_profile_every_node(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/graph_execute", json=profiled_graph(), params={"profile_nodes": True}
+        )
+        updates = response.json()["updates"]
+        call_profile_ids = [update["profile"]["callProfileId"] for update in updates]
+        texts = [
+            (await client.get(f"/call_profile/{call_profile_id}")).text
+            for call_profile_id in call_profile_ids
+        ]
+
+    assert len(call_profile_ids) == 2
+    assert any("spin" in text for text in texts)
@@ -0,0 +1,183 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import result_cache
+from python_node_editor.execution.exec_sync import router as graph_router
+from python_node_editor.schema import Edge, Graph
+from tests.assets.cache_functions import CALLS, counted_add, counted_impure
+from tests.assets.graph_utils import node_from_schema
+from tests.assets.mutation_functions import append_in_place, make_numbers
+from tests.assets.user_model import Point2D
+
+_, schema_add, _, types_add = analyze_function(counted_add)
+_, schema_impure, _, types_impure = analyze_function(counted_impure)
+_, schema_numbers, _, types_numbers = analyze_function(make_numbers)
+_, schema_append, _, types_append = analyze_function(append_in_place)
+
+server_module.CALLABLES[schema_add.callable_id] = counted_add
+server_module.CALLABLES[schema_impure.callable_id] = counted_impure
+server_module.TYPES.update(types_add)
+server_module.CALLABLES[schema_numbers.callable_id] = make_numbers
+server_module.CALLABLES[schema_append.callable_id] = append_in_place
+server_module.TYPES.update(types_impure)
+server_module.TYPES.update(types_numbers)
+server_module.TYPES.update(types_append)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Python Node Editor - Result Cache", lifespan=lifespan)
+app.include_router(graph_router)
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    result_cache.clear_result_cache()
+    for name in CALLS:
+        CALLS[name] = 0
+    yield
+    result_cache.clear_result_cache()
+
+
+def chain_graph(a: int, b: int, c: int) -> Graph:
+    node1 = node_from_schema("node1", schema_add)
+    node1.data.arguments["a"].value = a
+    node1.data.arguments["b"].value = b
+
+    node2 = node_from_schema("node2", schema_add, position={"x": 200, "y": 0})
+    node2.data.arguments["a"].value = None
+    node2.data.arguments["b"].value = c
+
+    edge1 = Edge(
+        id="edge1",
+        source="node1",
+        source_handle="node1:outputs:return:handle",
+        target="node2",
+        target_handle="node2:inputs:a:handle",
+    )
+    return Graph(nodes=[node1, node2], edges=[edge1])
+
+
+def execute(graph: Graph) -> dict:
+    response = client.post("/graph_execute", json=graph.model_dump(by_alias=True))
+    assert response.status_code == 200
+    return {update["nodeId"]: update for update in response.json()["updates"] if "status" in update}
+
+
+def test_resubmit_reuses_results():
+    """Resubmitting the same graph answers every node from the cache"""
+    first = execute(chain_graph(1, 2, 3))
+    second = execute(chain_graph(1, 2, 3))
+
+    assert CALLS["counted_add"] == 2
+    assert second["node2"]["status"] == "executed"
+    assert second["node2"]["outputs"]["return"]["value"] == 6
+    assert second["node1"]["terminalOutput"] == first["node1"]["terminalOutput"]
+
+
+def test_changing_sink_argument_only_reruns_sink():
+    execute(chain_graph(1, 2, 3))
+    updates = execute(chain_graph(1, 2, 10))
+
+    assert CALLS["counted_add"] == 3
+    assert updates["node2"]["outputs"]["return"]["value"] == 13
+
+
+def test_impure_functions_are_not_cached():
+    node1 = node_from_schema("node1", schema_impure)
+    node1.data.arguments["x"].value = 4
+    graph = Graph(nodes=[node1], edges=[])
+
+    execute(graph)
+    execute(graph)
+
+    assert CALLS["counted_impure"] == 2
+
+
+def test_errors_are_not_cached():
+    node1 = node_from_schema("node1", schema_add)
+    node1.data.arguments["a"].value = 1
+    node1.data.arguments["b"].value = "two"
+    graph = Graph(nodes=[node1], edges=[])
+
+    assert execute(graph)["node1"]["status"] == "error"
+    execute(graph)
+
+    assert CALLS["counted_add"] == 2
+    assert len(result_cache.RESULT_CACHE) == 0
+
+
+def test_cached_results_are_not_changed_by_downstream_nodes():
+    numbers = node_from_schema("numbers", schema_numbers)
+    numbers.data.arguments["n"].value = 3
+    append = node_from_schema("append", schema_append, position={"x": 200, "y": 0})
+    append.data.arguments["numbers"].value = None
+    edge = Edge(
+        id="edge1",
+        source="numbers",
+        source_handle="numbers:outputs:return:handle",
+        target="append",
+        target_handle="append:inputs:numbers:handle",
+    )
+    graph = Graph(nodes=[numbers, append], edges=[edge])
+
+    for _ in range(3):
+        updates = execute(graph)
+        assert updates["append"]["outputs"]["return"]["value"] == 4
+
+    cached = [
+        cached_update.outputs["return"].value
+        for cached_update in result_cache.RESULT_CACHE.values()
+    ]
+    assert [0, 1, 2] in cached
+
+
+def test_least_recently_used_results_are_evicted(monkeypatch):
+    node1 = node_from_schema("node1", schema_add)
+    node1.data.arguments["a"].value = 0
+    node1.data.arguments["b"].value = 0
+    execute(Graph(nodes=[node1], edges=[]))
+    # Room for two results like this one
+    monkeypatch.setattr(
+        result_cache, "RESULT_CACHE_MAX_BYTES", result_cache.cached_bytes() * 2
+    )
+
+    for a in range(1, 3):
+        node1.data.arguments["a"].value = a
+        execute(Graph(nodes=[node1], edges=[]))
+
+    assert len(result_cache.RESULT_CACHE) == 2
+    assert result_cache.cached_bytes() <= result_cache.RESULT_CACHE_MAX_BYTES
+    assert result_cache.cached_bytes() == sum(result_cache.RESULT_CACHE_SIZES.values())
+
+
+def test_large_results_are_measured_by_content():
+    small = result_cache.approximate_size([1, 2, 3])
+    large = result_cache.approximate_size(bytearray(1_000_000))
+
+    assert small < 1000
+    assert large >= 1_000_000
+
+
+def test_hash_value_is_content_based():
+    assert result_cache.hash_value(Point2D(x=1, y=2)) == result_cache.hash_value(
+        Point2D(x=1, y=2)
+    )
+    assert result_cache.hash_value(Point2D(x=1, y=2)) != result_cache.hash_value(
+        Point2D(x=2, y=1)
+    )
+    assert result_cache.hash_value([1, {"a": 2}]) == result_cache.hash_value(
+        [1, {"a": 2}]
+    )
+    assert result_cache.hash_value(1) != result_cache.hash_value(1.0)
+    assert result_cache.hash_value(1) != result_cache.hash_value("1")
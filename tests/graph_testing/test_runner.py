@@ -0,0 +1,112 @@
+"""
+Tests for executing saved graphs headlessly with pne-run.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+from PIL import Image
+
+import python_node_editor.server as server_module
+from examples._custom_datatypes.cached_image import CachedImageDataModel
+from python_node_editor import cli
+from python_node_editor.analysis.utils import analyze_file_structure
+from python_node_editor.execution.runner import RESULTS_FILENAME, write_cached_output
+from python_node_editor.schema import Edge, Graph
+from tests.assets.graph_utils import node_from_schema
+
+ASSET_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "cache_functions.py")
+
+function_schemas, _, _ = analyze_file_structure([ASSET_PATH])
+schema_add = next(schema for schema in function_schemas if schema.name == "counted_add")
+
+
+@pytest.fixture(autouse=True)
+def restore_server_state():
+    """pne-run loads its own copies of the callables, other tests need theirs back"""
+    callables = dict(server_module.CALLABLES)
+    types = dict(server_module.TYPES)
+    function_schemas = list(server_module.FUNCTION_SCHEMAS)
+    yield
+    server_module.CALLABLES.clear()
+    server_module.CALLABLES.update(callables)
+    server_module.TYPES.clear()
+    server_module.TYPES.update(types)
+    server_module.FUNCTION_SCHEMAS[:] = function_schemas
+
+
+def chain_graph(source_a: int | None = 1) -> Graph:
+    source = node_from_schema("source", schema_add)
+    source.data.arguments["a"].value = source_a
+    source.data.arguments["b"].value = 2
+
+    sink = node_from_schema("sink", schema_add, position={"x": 200, "y": 0})
+    sink.data.arguments["a"].value = None
+    sink.data.arguments["b"].value = 10
+
+    edge = Edge(
+        id="edge1",
+        source="source",
+        source_handle="source:outputs:return:handle",
+        target="sink",
+        target_handle="sink:inputs:a:handle",
+    )
+    return Graph(nodes=[source, sink], edges=[edge])
+
+
+def run_cli(monkeypatch, tmp_path, graph: Graph) -> str:
+    graph_path = tmp_path / "graph.json"
+    graph_path.write_text(graph.model_dump_json(by_alias=True))
+    output_dir = tmp_path / "out"
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["pne-run", ASSET_PATH, str(graph_path), "-o", str(output_dir)],
+    )
+    cli.run()
+    return str(output_dir)
+
+
+def read_results(output_dir: str) -> dict[str, dict]:
+    with open(os.path.join(output_dir, RESULTS_FILENAME)) as f:
+        records = [json.loads(line) for line in f]
+    return {record["nodeId"]: record for record in records}
+
+
+def test_run_writes_results_and_timings(monkeypatch, tmp_path, capsys):
+    output_dir = run_cli(monkeypatch, tmp_path, chain_graph())
+
+    results = read_results(output_dir)
+    assert results["source"]["outputs"] == {"return": 3}
+    assert results["sink"]["outputs"] == {"return": 13}
+    assert results["sink"]["status"] == "executed"
+    assert "Adding 3 and 10" in results["sink"]["terminalOutput"]
+    assert results["sink"]["seconds"] >= 0
+
+    printed = capsys.readouterr().out
+    assert "counted_add" in printed
+    assert "Executed 2 nodes" in printed
+
+
+def test_run_exits_with_error_when_a_node_fails(monkeypatch, tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        run_cli(monkeypatch, tmp_path, chain_graph(source_a=None))
+    assert exit_info.value.code == 1
+
+    results = read_results(str(tmp_path / "out"))
+    assert results["source"]["status"] == "error"
+    assert results["sink"]["status"] == "skipped"
+    assert "TypeError" in capsys.readouterr().out
+
+
+def test_cached_outputs_are_written_as_files(tmp_path):
+    image = Image.new("RGB", (4, 3), "red")
+    output = CachedImageDataModel(type="Image", value=image)
+
+    filename = write_cached_output(output, str(tmp_path / "node1.return"))
+
+    assert filename == "node1.return.png"
+    with Image.open(tmp_path / filename) as saved:
+        assert saved.size == (4, 3)
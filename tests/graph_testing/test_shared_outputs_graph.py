@@ -0,0 +1,150 @@
+"""
+Tests for passing outputs to downstream nodes by reference, copying them only for
+callables that change their inputs, and detecting the ones that do so undeclared.
+The result cache stays on, so that its interaction with shared outputs is covered.
+"""
+
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import exec_utils, result_cache, sessions
+from python_node_editor.execution.exec_sync import router as graph_router
+from python_node_editor.execution.exec_utils import propagate_outputs
+from python_node_editor.execution.graph_index import GraphIndex
+from python_node_editor.schema import DataWrapper, Edge, FunctionSchema, Graph, NodeUpdate
+from tests.assets.graph_utils import node_from_schema
+from tests.assets.mutation_functions import (
+    SEEN_IDS,
+    append_every_time,
+    append_in_place,
+    append_to_copy,
+    count_numbers,
+    make_numbers,
+)
+
+SCHEMAS: dict[str, FunctionSchema] = {}
+for function in (
+    make_numbers,
+    count_numbers,
+    append_in_place,
+    append_to_copy,
+    append_every_time,
+):
+    _, schema, _, found_types = analyze_function(function)
+    SCHEMAS[function.__name__] = schema
+    server_module.CALLABLES[schema.callable_id] = function
+    server_module.TYPES.update(found_types)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Shared Outputs", lifespan=lifespan)
+app.include_router(graph_router)
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    result_cache.clear_result_cache()
+    sessions.SESSIONS.clear()
+    SEEN_IDS.clear()
+    yield
+    result_cache.clear_result_cache()
+    sessions.SESSIONS.clear()
+
+
+def fan_out_graph(consumers: list[str], n: int = 1000) -> dict:
+    """make_numbers feeding each consumer, consumers run in the given order"""
+    producer = node_from_schema("producer", SCHEMAS["make_numbers"])
+    producer.data.arguments["n"].value = n
+
+    nodes = [producer]
+    edges = []
+    for i, name in enumerate(consumers):
+        node_id = f"consumer{i}"
+        node = node_from_schema(node_id, SCHEMAS[name], position={"x": 200 + i, "y": 0})
+        node.data.arguments["numbers"].value = None
+        nodes.append(node)
+        edges.append(
+            Edge(
+                id=f"edge{i}",
+                source="producer",
+                source_handle="producer:outputs:return:handle",
+                target=node_id,
+                target_handle=f"{node_id}:inputs:numbers:handle",
+            )
+        )
+    return Graph(nodes=nodes, edges=edges).model_dump(by_alias=True)
+
+
+def execute(graph: dict, **params) -> dict:
+    response = client.post("/graph_execute", json=graph, params=params)
+    assert response.status_code == 200
+    return {
+        update["nodeId"]: update
+        for update in response.json()["updates"]
+        if "status" in update
+    }
+
+
+def test_fan_out_shares_one_value(monkeypatch):
+    # Every consumer has to run, instead of all but the first being answered from the cache
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    updates = execute(fan_out_graph(["count_numbers"] * 20))
+
+    assert len(SEEN_IDS) == 20
+    assert len(set(SEEN_IDS)) == 1
+    assert updates["consumer19"]["outputs"]["return"]["value"] == 1000
+
+
+def test_propagation_passes_the_output_wrapper_itself():
+    index = GraphIndex(Graph.model_validate(fan_out_graph(["count_numbers"] * 5)))
+    output_type = index.nodes["producer"].data.outputs["return"].type
+    output = DataWrapper(type=output_type, value=list(range(1000)))
+
+    downstream_updates = propagate_outputs(
+        index, NodeUpdate(node_id="producer", status="executed", outputs={"return": output})
+    )
+
+    for i in range(5):
+        assert index.nodes[f"consumer{i}"].data.arguments["numbers"] is output
+    assert all(update.arguments["numbers"] is output for update in downstream_updates)
+
+
+def test_declared_mutation_gets_a_copy():
+    updates = execute(fan_out_graph(["append_to_copy", "count_numbers"], n=5))
+
+    assert updates["consumer0"]["outputs"]["return"]["value"] == 6
+    assert updates["consumer1"]["outputs"]["return"]["value"] == 5
+
+
+def test_undeclared_mutation_is_reported_in_check_mode(monkeypatch):
+    monkeypatch.setattr(exec_utils, "CHECK_INPUT_MUTATION", True)
+
+    updates = execute(
+        fan_out_graph(["append_in_place", "append_to_copy"], n=5), keep_going=True
+    )
+
+    assert updates["consumer0"]["status"] == "error"
+    assert "InputMutationError" in updates["consumer0"]["terminalOutput"]
+    assert updates["consumer1"]["status"] == "executed"
+
+
+@pytest.mark.parametrize("session_id", [None, "session1"])
+def test_reused_outputs_are_not_shared_across_executions(session_id):
+    params = {"session_id": session_id} if session_id else {}
+
+    # The producer is answered from the cache or the session after the first execution,
+    # the consumer changing its input runs every time
+    for _ in range(3):
+        updates = execute(fan_out_graph(["append_every_time"], n=5), **params)
+        assert updates["consumer0"]["outputs"]["return"]["value"] == 6
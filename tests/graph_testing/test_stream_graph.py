@@ -0,0 +1,337 @@
+"""
+Tests for generator nodes streaming their items into downstream nodes while they run.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import exec_async, result_cache, streams
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.execution.exec_sync import router as sync_router
+from python_node_editor.execution.graph_index import GraphIndex
+from python_node_editor.schema import Edge, Graph
+from python_node_editor.schema_base import StructDescr
+from tests.assets import stream_functions
+from tests.assets.graph_utils import node_from_schema
+
+SCHEMAS = {}
+for func in [
+    stream_functions.count_up,
+    stream_functions.square_each,
+    stream_functions.slow_sum,
+    stream_functions.total_of_list,
+    stream_functions.offset_sum,
+    stream_functions.first_item,
+    stream_functions.failing_count,
+    stream_functions.async_count_up,
+    stream_functions.async_sum,
+]:
+    _, schema, _, types = analyze_function(func)
+    server_module.CALLABLES[schema.callable_id] = func
+    server_module.TYPES.update(types)
+    SCHEMAS[func.__name__] = schema
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Streaming Nodes", lifespan=lifespan)
+app.include_router(async_router)
+app.include_router(sync_router)
+
+
+@pytest.fixture(autouse=True)
+def reset_progress(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(exec_async, "OUTPUT_PUSH_INTERVAL", 0.05)
+    stream_functions.PROGRESS.update(
+        produced=0, consumed=0, max_ahead=0, produced_at_first_item=None
+    )
+
+
+def make_node(node_id: str, function_name: str, x: int = 0, y: int = 0, **values):
+    node = node_from_schema(node_id, SCHEMAS[function_name], position={"x": x, "y": y})
+    for name, value in values.items():
+        node.data.arguments[name].value = value
+    return node
+
+
+def make_edge(source: str, target: str, argument_name: str) -> Edge:
+    return Edge(
+        id=f"{source}-{target}",
+        source=source,
+        source_handle=f"{source}:outputs:return:handle",
+        target=target,
+        target_handle=f"{target}:inputs:{argument_name}:handle",
+    )
+
+
+async def run_async(graph: Graph, on_poll=None) -> dict:
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/execution_submit", json=graph.model_dump(by_alias=True)
+        )
+        execution_id = response.json()["execution_id"]
+
+        start_time = time.time()
+        while time.time() - start_time < 10:
+            data = (await client.get(f"/execution_update/{execution_id}")).json()
+            if on_poll is not None:
+                on_poll(data)
+            if data.get("status") == "complete":
+                return data
+            await asyncio.sleep(0.01)
+    raise TimeoutError(f"Execution {execution_id} did not complete")
+
+
+def test_iterator_types_are_analyzed():
+    output_type = SCHEMAS["count_up"].outputs["return"].type
+    assert output_type == StructDescr(structure_type="iterator", items_type="int")
+
+    argument_type = SCHEMAS["slow_sum"].arguments["numbers"].type
+    assert argument_type == StructDescr(structure_type="iterator", items_type="int")
+
+    assert SCHEMAS["async_count_up"].is_async
+
+
+@pytest.mark.asyncio
+async def test_consumer_runs_while_producer_yields():
+    graph = Graph(
+        nodes=[
+            make_node("producer", "count_up", n=20, delay=0.02),
+            make_node("consumer", "slow_sum", x=200, delay=0.01),
+        ],
+        edges=[make_edge("producer", "consumer", "numbers")],
+    )
+
+    final = await run_async(graph)
+    assert final["nodeUpdates"]["consumer"]["outputs"]["return"]["value"] == sum(range(20))
+
+    # The consumer got its first item long before the producer was done
+    assert stream_functions.PROGRESS["produced_at_first_item"] < 5
+
+    producer = final["nodeUpdates"]["producer"]
+    assert producer["status"] == "executed"
+    assert producer["itemsProduced"] == 20
+    # Nothing needed the items all at once, so they weren't kept
+    assert "value" not in producer["outputs"]["return"]
+
+
+@pytest.mark.asyncio
+async def test_fast_producer_waits_for_slow_consumer():
+    graph = Graph(
+        nodes=[
+            make_node("producer", "count_up", n=200, delay=0),
+            make_node("consumer", "slow_sum", x=200, delay=0.001),
+        ],
+        edges=[make_edge("producer", "consumer", "numbers")],
+    )
+
+    final = await run_async(graph)
+    assert final["nodeUpdates"]["consumer"]["outputs"]["return"]["value"] == sum(range(200))
+    assert stream_functions.PROGRESS["max_ahead"] <= streams.STREAM_QUEUE_SIZE + 2
+
+
+@pytest.mark.asyncio
+async def test_pipeline_of_generator_nodes():
+    graph = Graph(
+        nodes=[
+            make_node("producer", "count_up", n=50, delay=0),
+            make_node("squares", "square_each", x=200),
+            make_node("consumer", "slow_sum", x=400, delay=0),
+        ],
+        edges=[
+            make_edge("producer", "squares", "numbers"),
+            make_edge("squares", "consumer", "numbers"),
+        ],
+    )
+
+    final = await run_async(graph)
+    assert final["nodeUpdates"]["consumer"]["outputs"]["return"]["value"] == sum(
+        i * i for i in range(50)
+    )
+    assert final["nodeUpdates"]["squares"]["itemsProduced"] == 50
+
+
+@pytest.mark.asyncio
+async def test_list_consumers_get_all_items():
+    graph = Graph(
+        nodes=[
+            make_node("producer", "count_up", n=10, delay=0),
+            make_node("streamed", "slow_sum", x=200, delay=0),
+            make_node("listed", "total_of_list", x=200, y=100),
+        ],
+        edges=[
+            make_edge("producer", "streamed", "numbers"),
+            make_edge("producer", "listed", "numbers"),
+        ],
+    )
+
+    final = await run_async(graph)
+    assert final["nodeUpdates"]["streamed"]["outputs"]["return"]["value"] == 45
+    assert final["nodeUpdates"]["listed"]["outputs"]["return"]["value"] == 45
+    assert final["nodeUpdates"]["producer"]["outputs"]["return"]["value"] == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_consumer_waiting_on_a_list_consumer_gets_a_list():
+    # The stream consumer also needs the list consumer's total, which needs every item
+    graph = Graph(
+        nodes=[
+            make_node("producer", "count_up", n=100, delay=0),
+            make_node("listed", "total_of_list", x=200, y=100),
+            make_node("offset", "offset_sum", x=400),
+        ],
+        edges=[
+            make_edge("producer", "listed", "numbers"),
+            make_edge("producer", "offset", "numbers"),
+            make_edge("listed", "offset", "offset"),
+        ],
+    )
+    index = GraphIndex(graph)
+    assert not index.plan.stream_edges
+
+    final = await run_async(graph)
+    assert final["nodeUpdates"]["offset"]["outputs"]["return"]["value"] == 2 * sum(range(100))
+
+
+@pytest.mark.asyncio
+async def test_failing_producer_fails_its_consumer():
+    graph = Graph(
+        nodes=[
+            make_node("producer", "failing_count", n=3),
+            make_node("consumer", "slow_sum", x=200, delay=0),
+        ],
+        edges=[make_edge("producer", "consumer", "numbers")],
+    )
+
+    final = await run_async(graph)
+    producer = final["nodeUpdates"]["producer"]
+    assert producer["status"] == "error"
+    assert "RuntimeError: Ran out of numbers" in producer["terminalOutput"]
+    # Only the generator's own frames are shown
+    assert "drain_generator" not in producer["terminalOutput"]
+
+    consumer = final["nodeUpdates"]["consumer"]
+    assert consumer["status"] == "error"
+    assert "StreamFailed" in consumer["terminalOutput"]
+
+
+@pytest.mark.asyncio
+async def test_producer_stops_when_consumer_stops_reading():
+    graph = Graph(
+        nodes=[
+            make_node("producer", "count_up", n=100_000, delay=0),
+            make_node("consumer", "first_item", x=200),
+        ],
+        edges=[make_edge("producer", "consumer", "numbers")],
+    )
+
+    final = await run_async(graph)
+    assert final["nodeUpdates"]["consumer"]["outputs"]["return"]["value"] == 0
+    assert final["nodeUpdates"]["producer"]["status"] == "executed"
+    assert stream_functions.PROGRESS["produced"] < 100
+
+
+@pytest.mark.asyncio
+async def test_async_generator_nodes():
+    graph = Graph(
+        nodes=[
+            make_node("producer", "async_count_up", n=100),
+            make_node("consumer", "async_sum", x=200),
+        ],
+        edges=[make_edge("producer", "consumer", "numbers")],
+    )
+
+    final = await run_async(graph)
+    assert final["nodeUpdates"]["consumer"]["outputs"]["return"]["value"] == sum(range(100))
+    assert final["nodeUpdates"]["producer"]["itemsProduced"] == 100
+
+
+@pytest.mark.asyncio
+async def test_item_progress_is_reported_while_running():
+    seen_counts = set()
+
+    def on_poll(data):
+        producer = data.get("nodeUpdates", {}).get("producer", {})
+        if producer.get("status") == "executing" and "itemsProduced" in producer:
+            seen_counts.add(producer["itemsProduced"])
+
+    graph = Graph(nodes=[make_node("producer", "count_up", n=10, delay=0.05)], edges=[])
+    final = await run_async(graph, on_poll)
+
+    assert any(0 < count < 10 for count in seen_counts)
+    assert final["nodeUpdates"]["producer"]["outputs"]["return"]["value"] == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_sync_execution_collects_items():
+    graph = Graph(
+        nodes=[
+            make_node("producer", "count_up", n=10, delay=0),
+            make_node("streamed", "slow_sum", x=200, delay=0),
+            make_node("listed", "total_of_list", x=200, y=100),
+        ],
+        edges=[
+            make_edge("producer", "streamed", "numbers"),
+            make_edge("producer", "listed", "numbers"),
+        ],
+    )
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/graph_execute", json=graph.model_dump(by_alias=True))
+
+    updates = {
+        update["nodeId"]: update
+        for update in response.json()["updates"]
+        if "status" in update
+    }
+    assert updates["streamed"]["outputs"]["return"]["value"] == 45
+    assert updates["listed"]["outputs"]["return"]["value"] == 45
+
+
+@pytest.mark.asyncio
+async def test_async_ends_are_woken_by_thread_ends(monkeypatch):
+    """Nothing polls on the event loop: an async end waiting on a thread end is woken by it"""
+    monkeypatch.setattr(streams, "STREAM_QUEUE_SIZE", 1)
+
+    # A thread producer feeding an async consumer
+    stream = streams.ItemStream("producer")
+
+    def produce():
+        for i in range(20):
+            time.sleep(0.001)
+            stream.put(i)
+        stream.put(streams._End)
+
+    producing = asyncio.create_task(asyncio.to_thread(produce))
+    assert [item async for item in stream] == list(range(20))
+    await producing
+
+    # An async producer waiting for room, made by a thread consumer
+    stream = streams.ItemStream("producer")
+    consuming = asyncio.create_task(asyncio.to_thread(lambda: list(stream)))
+    for i in range(20):
+        assert await stream.put_async(i)
+    await stream.put_async(streams._End)
+    assert await consuming == list(range(20))
+
+    # A consumer that stops reading releases the waiting producer
+    stream = streams.ItemStream("producer")
+    await stream.put_async(0)
+    asyncio.get_running_loop().call_later(0.05, stream.abandon)
+    assert not await asyncio.wait_for(stream.put_async(1), timeout=1)
@@ -0,0 +1,193 @@
+"""
+Tests for parameter sweeps through /sweep_submit, /sweep_update and /sweep_cancel.
+The result cache is turned off so that only the sweep decides which nodes are shared.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import result_cache
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.execution.sweep import router as sweep_router
+from python_node_editor.schema import Edge, Graph
+from tests.assets.cache_functions import CALLS, counted_add
+from tests.assets.cancellable_functions import cooperative_wait
+from tests.assets.graph_utils import node_from_schema
+
+_, schema_add, _, types_add = analyze_function(counted_add)
+_, schema_wait, _, types_wait = analyze_function(cooperative_wait)
+
+server_module.CALLABLES[schema_add.callable_id] = counted_add
+server_module.CALLABLES[schema_wait.callable_id] = cooperative_wait
+server_module.TYPES.update(types_add)
+server_module.TYPES.update(types_wait)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Parameter Sweeps", lifespan=lifespan)
+app.include_router(async_router)
+app.include_router(sweep_router)
+
+
+@pytest.fixture(autouse=True)
+def fresh_counts(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    CALLS["counted_add"] = 0
+
+
+def edge(source_id: str, target_id: str, argument: str) -> Edge:
+    return Edge(
+        id=f"{source_id}-{target_id}",
+        source=source_id,
+        source_handle=f"{source_id}:outputs:return:handle",
+        target=target_id,
+        target_handle=f"{target_id}:inputs:{argument}:handle",
+    )
+
+
+def chain_graph() -> dict:
+    """source (1 + 2) feeds scale, which feeds sink"""
+    source = node_from_schema("source", schema_add)
+    source.data.arguments["a"].value = 1
+    source.data.arguments["b"].value = 2
+
+    scale = node_from_schema("scale", schema_add, position={"x": 200, "y": 0})
+    scale.data.arguments["a"].value = None
+    scale.data.arguments["b"].value = 10
+
+    sink = node_from_schema("sink", schema_add, position={"x": 400, "y": 0})
+    sink.data.arguments["a"].value = None
+    sink.data.arguments["b"].value = 100
+
+    return Graph(
+        nodes=[source, scale, sink],
+        edges=[edge("source", "scale", "a"), edge("scale", "sink", "a")],
+    ).model_dump(by_alias=True)
+
+
+async def collect_results(client: httpx.AsyncClient, sweep_id: str) -> dict:
+    """Polls a sweep until it completes, gathering the results streamed along the way"""
+    collected = {"results": {}, "sharedUpdates": {}}
+    start_time = time.time()
+    while time.time() - start_time < 10:
+        data = (await client.get(f"/sweep_update/{sweep_id}")).json()
+        collected["sharedUpdates"].update(data.get("sharedUpdates", {}))
+        for result in data.get("results", []):
+            assert result["variant"] not in collected["results"]
+            collected["results"][result["variant"]] = result
+        if data.get("status") == "complete":
+            # Keep what was gathered rather than just the last poll's results
+            data.pop("results", None)
+            data.pop("sharedUpdates", None)
+            collected.update(data)
+            return collected
+        await asyncio.sleep(0.02)
+    raise TimeoutError(f"Sweep {sweep_id} did not complete")
+
+
+@pytest.mark.asyncio
+async def test_sweep_shares_common_nodes():
+    variants = [{"scale": {"b": b}} for b in range(20)]
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/sweep_submit", json={"graph": chain_graph(), "variants": variants}
+        )
+        assert response.status_code == 200
+        assert len(response.json()["execution_ids"]) == 20
+
+        data = await collect_results(client, response.json()["sweep_id"])
+
+    # source once, then scale and sink for every variant
+    assert CALLS["counted_add"] == 1 + 2 * 20
+    assert data["variantStatuses"] == ["executed"] * 20
+    assert data["sharedUpdates"]["source"]["outputs"]["return"]["value"] == 3
+
+    for b in range(20):
+        node_updates = data["results"][b]["nodeUpdates"]
+        assert "source" not in node_updates
+        assert node_updates["sink"]["outputs"]["return"]["value"] == 3 + b + 100
+
+
+@pytest.mark.asyncio
+async def test_sweep_overriding_source_runs_everything_per_variant():
+    variants = [{"source": {"a": 1}}, {"source": {"a": 2}, "sink": {"b": 0}}]
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/sweep_submit", json={"graph": chain_graph(), "variants": variants}
+        )
+        data = await collect_results(client, response.json()["sweep_id"])
+
+    assert CALLS["counted_add"] == 6
+    assert "sharedExecutionId" not in data
+    results = data["results"]
+    assert results[0]["nodeUpdates"]["sink"]["outputs"]["return"]["value"] == 113
+    assert results[1]["nodeUpdates"]["sink"]["outputs"]["return"]["value"] == 14
+
+
+@pytest.mark.asyncio
+async def test_sweep_rejects_bad_overrides():
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        for variants in (
+            [{"missing": {"a": 1}}],
+            [{"scale": {"c": 1}}],
+            # Fed by the edge from source
+            [{"scale": {"a": 1}}],
+        ):
+            response = await client.post(
+                "/sweep_submit", json={"graph": chain_graph(), "variants": variants}
+            )
+            assert response.status_code == 400
+
+    assert CALLS["counted_add"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_sweep():
+    node = node_from_schema("wait", schema_wait)
+    node.data.arguments["seconds"].value = 5.0
+    graph = Graph(nodes=[node], edges=[]).model_dump(by_alias=True)
+    variants = [{"wait": {"seconds": 5.0 + i}} for i in range(3)]
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/sweep_submit", json={"graph": graph, "variants": variants}
+        )
+        sweep_id = response.json()["sweep_id"]
+
+        while True:
+            data = (await client.get(f"/sweep_update/{sweep_id}")).json()
+            if "running" in data.get("variantStatuses", []):
+                break
+            await asyncio.sleep(0.02)
+
+        start_time = time.time()
+        response = await client.post(f"/sweep_cancel/{sweep_id}")
+        assert response.json() == {"cancelled": True}
+
+        data = await collect_results(client, sweep_id)
+
+    assert time.time() - start_time < 2
+    assert data["cancelled"] is True
+    assert data["variantStatuses"] == ["cancelled"] * 3
@@ -0,0 +1,102 @@
+"""
+Load test for /graph_execute: while a slow synchronous graph runs, health checks and
+polls of async executions should still be answered right away.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import result_cache
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.execution.exec_sync import router as sync_router
+from python_node_editor.schema import Edge, Graph
+from tests.assets.functions_with_delays import quick_add
+from tests.assets.graph_utils import node_from_schema
+
+_, schema_add, _, types_add = analyze_function(quick_add)
+
+server_module.CALLABLES[schema_add.callable_id] = quick_add
+server_module.TYPES.update(types_add)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Sync Execution Under Load", lifespan=lifespan)
+app.include_router(sync_router)
+app.include_router(async_router)
+
+
+@app.get("/health")
+async def health_check():
+    return {"status": "ok"}
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+
+
+def chain_graph(length: int) -> dict:
+    """quick_add nodes in a row, each one adding 1 to the previous result"""
+    nodes = []
+    edges = []
+    for i in range(length):
+        node = node_from_schema(f"node{i}", schema_add, position={"x": i * 200, "y": 0})
+        node.data.arguments["a"].value = 0 if i == 0 else None
+        node.data.arguments["b"].value = 1
+        nodes.append(node)
+        if i > 0:
+            edges.append(
+                Edge(
+                    id=f"edge{i}",
+                    source=f"node{i - 1}",
+                    source_handle=f"node{i - 1}:outputs:return:handle",
+                    target=f"node{i}",
+                    target_handle=f"node{i}:inputs:a:handle",
+                )
+            )
+    return Graph(nodes=nodes, edges=edges).model_dump(by_alias=True)
+
+
+@pytest.mark.asyncio
+async def test_requests_stay_responsive_during_sync_graph():
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/execution_submit", json=chain_graph(1))
+        execution_id = response.json()["execution_id"]
+
+        # About 1.5 seconds of node run time
+        sync_request = asyncio.create_task(
+            client.post("/graph_execute", json=chain_graph(5))
+        )
+
+        latencies = []
+        while not sync_request.done():
+            for url in ("/health", f"/execution_update/{execution_id}"):
+                started_at = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - started_at)
+                assert response.status_code == 200
+            await asyncio.sleep(0.02)
+
+        sync_response = (await sync_request).json()
+
+    assert sync_response["status"] == "success"
+    final = [update for update in sync_response["updates"] if update.get("status")]
+    assert final[-1]["outputs"]["return"]["value"] == 5
+
+    # Every node sleeps 0.3 seconds, so a blocked loop would show up as much slower requests
+    assert len(latencies) > 20
+    assert max(latencies) < 0.2
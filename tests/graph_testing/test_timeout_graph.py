@@ -0,0 +1,165 @@
+"""
+Tests for per-node timeouts and per-execution deadlines.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+import python_node_editor.server as server_module
+from python_node_editor.analysis.functions_analysis import analyze_function
+from python_node_editor.execution import exec_utils, process_pool, result_cache
+from python_node_editor.execution.exec_async import router as async_router
+from python_node_editor.execution.exec_sync import router as sync_router
+from python_node_editor.schema import Edge, Graph
+from tests.assets.cancellable_functions import (
+    cooperative_wait,
+    impatient_wait,
+    runaway_wait,
+)
+from tests.assets.graph_utils import node_from_schema
+
+ASSET_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "assets", "cancellable_functions.py"
+)
+
+_, schema_cooperative, _, types_cooperative = analyze_function(cooperative_wait)
+_, schema_runaway, _, types_runaway = analyze_function(runaway_wait)
+_, schema_impatient, _, types_impatient = analyze_function(impatient_wait)
+
+server_module.CALLABLES[schema_cooperative.callable_id] = cooperative_wait
+server_module.CALLABLES[schema_runaway.callable_id] = runaway_wait
+server_module.CALLABLES[schema_impatient.callable_id] = impatient_wait
+server_module.TYPES.update(types_cooperative)
+server_module.TYPES.update(types_runaway)
+server_module.TYPES.update(types_impatient)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+
+app = FastAPI(title="Test Node Timeouts", lifespan=lifespan)
+app.include_router(async_router)
+app.include_router(sync_router)
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+
+
+def chain_graph(schema, seconds: float) -> dict:
+    """A long running node followed by a node that should never run"""
+    node1 = node_from_schema("node1", schema)
+    node1.data.arguments["seconds"].value = seconds
+
+    node2 = node_from_schema("node2", schema, position={"x": 200, "y": 0})
+    node2.data.arguments["seconds"].value = None
+
+    edge1 = Edge(
+        id="edge1",
+        source="node1",
+        source_handle="node1:outputs:return:handle",
+        target="node2",
+        target_handle="node2:inputs:seconds:handle",
+    )
+    return Graph(nodes=[node1, node2], edges=[edge1]).model_dump(by_alias=True)
+
+
+async def run_async(graph: dict, deadline: float | None = None) -> dict:
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        params = {"deadline": deadline} if deadline is not None else {}
+        response = await client.post("/execution_submit", json=graph, params=params)
+        execution_id = response.json()["execution_id"]
+
+        start_time = time.time()
+        while time.time() - start_time < 10:
+            data = (await client.get(f"/execution_update/{execution_id}")).json()
+            if data.get("status") == "complete":
+                return data
+            await asyncio.sleep(0.02)
+    raise TimeoutError(f"Execution {execution_id} did not complete")
+
+
+@pytest.mark.asyncio
+async def test_default_node_timeout(monkeypatch):
+    monkeypatch.setattr(exec_utils, "DEFAULT_NODE_TIMEOUT", 0.2)
+
+    start_time = time.time()
+    final = await run_async(chain_graph(schema_cooperative, 5.0))
+    assert time.time() - start_time < 1.0
+
+    node1 = final["nodeUpdates"]["node1"]
+    assert node1["status"] == "error"
+    assert "TimeoutError" in node1["terminalOutput"]
+    assert "node2" not in final["nodeUpdates"]
+
+
+@pytest.mark.asyncio
+async def test_callable_timeout_overrides_default():
+    final = await run_async(chain_graph(schema_impatient, 5.0))
+    assert final["nodeUpdates"]["node1"]["status"] == "error"
+    assert "0.2 seconds" in final["nodeUpdates"]["node1"]["terminalOutput"]
+
+    final = await run_async(chain_graph(schema_impatient, 0.01))
+    assert final["nodeUpdates"]["node1"]["status"] == "executed"
+    assert final["nodeUpdates"]["node2"]["status"] == "executed"
+
+
+@pytest.mark.asyncio
+async def test_execution_deadline():
+    start_time = time.time()
+    final = await run_async(chain_graph(schema_cooperative, 5.0), deadline=0.3)
+    assert time.time() - start_time < 1.0
+    assert final["nodeUpdates"]["node1"]["status"] == "error"
+    assert "TimeoutError" in final["nodeUpdates"]["node1"]["terminalOutput"]
+
+
+@pytest.mark.asyncio
+async def test_sync_execution_respects_timeout(monkeypatch):
+    monkeypatch.setattr(exec_utils, "DEFAULT_NODE_TIMEOUT", 0.2)
+
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        graph = chain_graph(schema_cooperative, 5.0)
+        graph["edges"] = []
+        start_time = time.time()
+        response = await client.post("/graph_execute", json=graph)
+        assert time.time() - start_time < 1.0
+
+    updates = {
+        update["nodeId"]: update
+        for update in response.json()["updates"]
+        if "status" in update
+    }
+    assert updates["node1"]["status"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_timed_out_worker_is_replaced():
+    pool = process_pool.start_process_pool(1, [ASSET_PATH])
+
+    try:
+        (worker,) = pool._workers
+        start_time = time.time()
+        final = await run_async(chain_graph(schema_runaway, 60.0), deadline=0.5)
+        assert time.time() - start_time < 5.0
+        assert final["nodeUpdates"]["node1"]["status"] == "error"
+
+        # The hung worker was killed and a fresh one took its slot
+        assert not worker.process.is_alive()
+        assert len(pool._workers) == 1
+        assert pool._workers[0] is not worker
+    finally:
+        process_pool.stop_process_pool()